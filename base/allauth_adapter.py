@@ -8,6 +8,7 @@ from django.contrib.auth.models import User
 from base.classes.util.env_helper import Log, EnvHelper
 from django.contrib.sites.shortcuts import get_current_site
 from base.services import email_service, message_service
+from base.services import rate_limit_service as limiter
 
 log = Log()
 env = EnvHelper()
@@ -28,6 +29,10 @@ class BaseAccountAdapter(DefaultAccountAdapter):
 
     def send_mail(self, template_prefix: str, email: str, context: dict) -> None:
         log.trace()
+        # Account emails (verification, password reset) can be triggered without logging in
+        if not limiter.allow(f"account-email:{str(email).lower()}", per_minute=3, per_hour=10):
+            log.warning(f"Account email rate limit reached. Did not send {template_prefix}")
+            return
         request = env.request
         ctx = {
             "request": request,
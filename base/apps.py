@@ -5,6 +5,13 @@ from django.conf import settings
 _DEFAULTS = {
     'AUTHORIZE_GLOBAL': False,      # Allow authorizing for other apps?
 
+    # Audit/Error records are written in bulk at the end of the request (optionally by a Celery task)
+    'BUFFER_RECORD_WRITES': True,
+    'RECORD_WRITES_VIA_CELERY': False,
+
+    # Cache for rate limit counters (must be shared by every process, without a per-process tier)
+    'RATE_LIMIT_CACHE_ALIAS': 'default',
+
     # Admin Menu Items
     'BASE_ADMIN_LINKS': [
         {'url': "base:status", 'label': "Status Page", 'icon': "bi-heart-pulse"},
@@ -38,6 +45,10 @@ class BaseConfig(AppConfig):
             if mm not in settings.MIDDLEWARE:
                 settings.MIDDLEWARE.append(mm)
 
+        # Versions and admin links cannot change at runtime, so gather them once
+        from base.classes.util.app_registry import AppRegistry
+        AppRegistry.build()
+
     # Assign default setting values
     for key, value in _DEFAULTS.items():
         try:
@@ -0,0 +1,28 @@
+"""
+Compact session serializer
+
+    SESSION_SERIALIZER = 'base.backends.session_serializer.CompactSerializer'
+
+Uses orjson when it is installed (falling back to the standard json module), with no whitespace.
+The output is plain JSON, so sessions written by Django's JSONSerializer can still be read (and vice versa).
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class CompactSerializer:
+
+    def dumps(self, obj):
+        if orjson is not None:
+            # Same behavior as json: non-string keys become strings, datetimes are not serializable
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+        return json.dumps(obj, separators=(",", ":")).encode("latin-1")
+
+    def loads(self, data):
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data.decode("utf-8"))
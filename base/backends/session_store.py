@@ -0,0 +1,354 @@
+"""
+Cache-backed sessions with write-behind to the database
+
+    SESSION_ENGINE = 'base.backends.session_store'
+    SESSION_SERIALIZER = 'base.backends.session_serializer.CompactSerializer'
+    SESSION_CACHE_ALIAS = 'shared'        # A cache shared by every process (not TieredCache's local tier)
+    SESSION_WRITE_BEHIND_SECONDS = 10     # 0 writes to the database during the request (like cached_db)
+
+Like Django's cached_db engine, sessions are read from the cache and only fall back to the database
+when they are not cached. Sessions are stored in the cache as serialized bytes.
+
+The keys loaded with the session are compared with the keys being saved:
+  - No changes: the cache expiry is extended, and the database expiry is updated later
+  - Changed (i.e. bcsv~ variables): the cache is updated now, and the database is updated later
+  - New sessions, or changes to the authenticated user: the cache and database are both updated now
+
+Deferred database writes are coalesced per session, and written by a background thread in each process.
+They only update existing rows, so a session deleted meanwhile (i.e. logged out in another process) stays deleted.
+At most SESSION_WRITE_BEHIND_SECONDS of changes would be lost if a process (and the cache) were lost.
+"""
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.cache import caches
+from django.db import connections, router
+from crequest.middleware import CrequestMiddleware
+import atexit
+import logging
+import os
+import threading
+
+logger = logging.getLogger("base")
+
+KEY_PREFIX = "base.session:"
+
+# Changes to these keys are written to the database immediately
+auth_keys = (SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY)
+
+# Distinguishes a missing key from one set to None
+_missing = object()
+
+# Deferred database writes {session_key: (serialized session, or None if only the expiry changed, expire_date)}
+_pending = {}
+_pending_lock = threading.Lock()
+
+# Held while writing to (or deleting from) the database, so a deleted session cannot be re-written
+_write_lock = threading.Lock()
+
+# Background writer for this process
+_writer = {"thread": None, "pid": None, "wake": threading.Event()}
+
+# Session writes per route {route: {counter: value}}
+_metrics = {}
+
+
+class SessionStore(DBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        self._cache = caches[getattr(settings, "SESSION_CACHE_ALIAS", "default")]
+        self._snapshot = {}
+        super().__init__(session_key)
+
+    @property
+    def cache_key(self):
+        return self.cache_key_prefix + self._get_or_create_session_key()
+
+    #
+    # LOAD
+    # ##########################################################################
+
+    def load(self):
+        try:
+            serialized = self._cache.get(self.cache_key)
+        except Exception:
+            # Some backends raise an exception on invalid cache keys (treat as a new session)
+            serialized = None
+
+        if serialized is None:
+            session_key = self.session_key
+            s = self._get_session_from_db()
+            with _pending_lock:
+                pending = _pending.get(session_key) if s else _pending.pop(session_key, None)
+            if not s:
+                # New, expired, or deleted by another process (a deferred write must not bring it back)
+                self._snapshot = {}
+                return {}
+            if pending is not None and pending[0] is not None:
+                # Changes not written to the database yet
+                serialized, expire_date = pending
+            else:
+                serialized, expire_date = self.serializer().dumps(self.decode(s.session_data)), s.expire_date
+            self._cache_set(serialized, self.get_expiry_age(expiry=expire_date))
+
+        # Two copies: the session, and a snapshot to find changes when saving
+        serializer = self.serializer()
+        self._snapshot = serializer.loads(serialized)
+        return serializer.loads(serialized)
+
+    def exists(self, session_key):
+        if session_key and (self.cache_key_prefix + session_key) in self._cache:
+            return True
+        with _pending_lock:
+            if session_key in _pending:
+                return True
+        return super().exists(session_key)
+
+    #
+    # SAVE
+    # ##########################################################################
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+
+        data = self._get_session(no_load=must_create)
+        dirty_keys = self.dirty_keys(data)
+        serialized = self.serializer().dumps(data)
+        metrics = _route_metrics()
+        metrics["saves"] += 1
+        metrics["bytes"] += len(serialized)
+        metrics["max_bytes"] = max(metrics["max_bytes"], len(serialized))
+
+        if must_create or any(kk in dirty_keys for kk in auth_keys):
+            # Write to the database now (raises CreateError if the key is taken)
+            with _write_lock:
+                with _pending_lock:
+                    _pending.pop(self.session_key, None)
+                super().save(must_create=must_create)
+            metrics["db_writes"] += 1
+            self._cache_set(serialized, self.get_expiry_age())
+            metrics["cache_writes"] += 1
+
+        elif dirty_keys:
+            # A session deleted since this request loaded it (i.e. logout in another process) is not re-created
+            if not self._still_exists():
+                raise UpdateError
+            self._cache_set(serialized, self.get_expiry_age())
+            metrics["cache_writes"] += 1
+            self._write_behind(serialized)
+
+        else:
+            # Nothing changed, but the expiration still moves forward
+            metrics["unchanged"] += 1
+            try:
+                self._cache.touch(self.cache_key, self.get_expiry_age())
+            except Exception:
+                logger.exception(f"Error extending session expiry in cache ({self._cache})")
+            self._write_behind(None)
+
+        self._snapshot = self.serializer().loads(serialized)
+
+    def dirty_keys(self, data=None):
+        """
+        Keys that were added, changed, or removed since the session was loaded
+        """
+        data = self._session if data is None else data
+        snapshot = self._snapshot
+        dirty = [kk for kk, vv in data.items() if snapshot.get(kk, _missing) != vv]
+        dirty.extend(kk for kk in snapshot if kk not in data)
+        return dirty
+
+    def _still_exists(self):
+        """
+        Whether the session is still cached (extending its expiry), or in the database
+        """
+        try:
+            if self._cache.touch(self.cache_key, self.get_expiry_age()):
+                return True
+        except Exception:
+            logger.exception(f"Error extending session expiry in cache ({self._cache})")
+        return self.get_model_class().objects.filter(session_key=self.session_key).exists()
+
+    def _cache_set(self, serialized, timeout):
+        try:
+            self._cache.set(self.cache_key, serialized, timeout)
+        except Exception:
+            logger.exception(f"Error saving session to cache ({self._cache})")
+
+    def _write_behind(self, serialized):
+        """
+        Update the database row later (serialized is None when only the expiry needs to be updated)
+        """
+        update = {self.session_key: (serialized, self.get_expiry_date())}
+        delay = getattr(settings, "SESSION_WRITE_BEHIND_SECONDS", 10)
+        if not delay:
+            with _write_lock:
+                self._update_rows(update)
+            _route_metrics()["db_writes"] += 1
+            return
+
+        with _pending_lock:
+            _pending[self.session_key] = _merge(_pending.get(self.session_key), update[self.session_key])
+        _route_metrics()["deferred"] += 1
+        _start_writer(delay)
+
+    #
+    # DELETE
+    # ##########################################################################
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+
+        with _write_lock:
+            with _pending_lock:
+                _pending.pop(session_key, None)
+            super().delete(session_key)
+        self._cache.delete(self.cache_key_prefix + session_key)
+
+    def flush(self):
+        """
+        Remove the current session data from the database and regenerate the key
+        """
+        self.clear()
+        self.delete(self.session_key)
+        self._session_key = None
+        self._snapshot = {}
+
+    @classmethod
+    def write_pending(cls):
+        """
+        Write deferred sessions to the database (called by the background writer)
+        Returns the number of sessions written
+        """
+        with _write_lock:
+            with _pending_lock:
+                if not _pending:
+                    return 0
+                batch = dict(_pending)
+                _pending.clear()
+
+            try:
+                cls._update_rows(batch)
+            except Exception:
+                logger.exception(f"Error writing {len(batch)} sessions to the database (will retry)")
+                with _pending_lock:
+                    for kk, vv in batch.items():
+                        _pending[kk] = _merge(vv, _pending[kk]) if kk in _pending else vv
+                return 0
+        return len(batch)
+
+    @classmethod
+    def _update_rows(cls, batch):
+        """
+        Update existing database rows from {session_key: (serialized session or None, expire_date)}
+        Rows are never inserted: a session that was deleted (i.e. by logout) is not re-created
+        """
+        model = cls.get_model_class()
+        store = cls()
+        serializer = store.serializer()
+        changed = [
+            model(session_key=kk, session_data=store.encode(serializer.loads(serialized)), expire_date=expire_date)
+            for kk, (serialized, expire_date) in batch.items() if serialized is not None
+        ]
+        touched = [
+            model(session_key=kk, expire_date=expire_date)
+            for kk, (serialized, expire_date) in batch.items() if serialized is None
+        ]
+        objects = model.objects.using(router.db_for_write(model))
+        if changed:
+            objects.bulk_update(changed, ["session_data", "expire_date"], batch_size=100)
+        if touched:
+            objects.bulk_update(touched, ["expire_date"], batch_size=100)
+
+
+def _merge(earlier, later):
+    """
+    Combine two deferred writes for a session (an expiry-only update keeps the earlier changes)
+    """
+    if earlier is not None and later[0] is None:
+        return earlier[0], later[1]
+    return later
+
+
+#
+# BACKGROUND WRITER
+# ##########################################################################
+
+def _start_writer(delay):
+    # Threads do not survive a fork, so each worker process starts its own
+    pid = os.getpid()
+    if _writer["pid"] == pid and _writer["thread"].is_alive():
+        return
+    with _pending_lock:
+        if _writer["pid"] == pid and _writer["thread"].is_alive():
+            return
+        thread = threading.Thread(target=_write_loop, args=(delay,), name="session-write-behind", daemon=True)
+        _writer["thread"] = thread
+        _writer["pid"] = pid
+        thread.start()
+
+
+def _write_loop(delay):
+    while True:
+        _writer["wake"].wait(delay)
+        _writer["wake"].clear()
+        try:
+            SessionStore.write_pending()
+        except Exception:
+            logger.exception("Error in session write-behind")
+        finally:
+            # This thread's connection is not managed by a request
+            for connection in connections.all(initialized_only=True):
+                connection.close()
+
+
+@atexit.register
+def _write_pending_at_exit():
+    if _pending:
+        try:
+            SessionStore.write_pending()
+        except Exception:
+            logger.exception("Error writing sessions at exit")
+
+
+#
+# METRICS
+# ##########################################################################
+
+def _route_metrics():
+    """
+    Counters for the URL pattern of the current request
+    """
+    request = CrequestMiddleware.get_request()
+    if request is None:
+        route = "-"
+    else:
+        resolver_match = getattr(request, "resolver_match", None)
+        # Unresolved paths (i.e. 404s) share one counter, so scans cannot add routes without limit
+        route = resolver_match.route if resolver_match else "<unresolved>"
+    metrics = _metrics.get(route)
+    if metrics is None:
+        metrics = _metrics.setdefault(route, {
+            "saves": 0, "unchanged": 0, "cache_writes": 0, "db_writes": 0, "deferred": 0, "bytes": 0, "max_bytes": 0,
+        })
+    return metrics
+
+
+def stats():
+    """
+    Session writes per route (for this process), most-saved first
+    """
+    results = {}
+    for route, metrics in sorted(_metrics.items(), key=lambda i: -i[1]["saves"]):
+        results[route] = dict(metrics, avg_bytes=int(metrics["bytes"] / metrics["saves"]) if metrics["saves"] else 0)
+    return results
+
+
+def reset_stats():
+    _metrics.clear()
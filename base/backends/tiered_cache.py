@@ -0,0 +1,211 @@
+"""
+Tiered cache backend: a small per-process LRU in front of a shared (Redis) cache
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'base.backends.tiered_cache.TieredCache',
+            'LOCATION': 'redis://127.0.0.1:6379/1',
+            'VERSION': 1,                       # Bump to invalidate every key (CACHE_VERSION)
+            'OPTIONS': {
+                'LOCAL_MAX_ENTRIES': 1000,      # LRU size (per process)
+                'LOCAL_TIMEOUT': 5,             # Max seconds a process may serve a value without asking Redis
+                'RETRY_SECONDS': 30,            # After a Redis failure, use the fallback this long before retrying
+                'SHARED_BACKEND': 'django_redis.cache.RedisCache',
+                'SHARED_OPTIONS': {...},        # OPTIONS for the shared backend
+            }
+        }
+    }
+
+Writes and deletes go to Redis and this process's LRU. Other processes may serve their local copy
+for up to LOCAL_TIMEOUT seconds. Counters (incr/decr) are always handled by Redis, so they are atomic.
+When Redis is unavailable, a LocMem cache is used instead so the site keeps working (with per-process data).
+"""
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.module_loading import import_string
+from collections import OrderedDict
+import logging
+import pickle
+import threading
+import time
+
+logger = logging.getLogger("base")
+
+# Distinguishes "not in the LRU" from a cached None
+_missing = object()
+
+# Django creates a cache instance per thread, so the LRU (and its state) is shared by location, like LocMemCache
+_local_caches = {}
+_locks = {}
+_states = {}
+
+
+class TieredCache(BaseCache):
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        options = dict(params.get("OPTIONS") or {})
+        self._local_max_entries = int(options.get("LOCAL_MAX_ENTRIES", 1000))
+        self._local_timeout = float(options.get("LOCAL_TIMEOUT", 5))
+        self._retry_seconds = float(options.get("RETRY_SECONDS", 30))
+
+        # Shared and fallback caches use the same key prefix/version/function as this cache
+        shared_params = {kk: vv for kk, vv in params.items() if kk != "OPTIONS"}
+        shared_params["OPTIONS"] = options.get("SHARED_OPTIONS") or {}
+        shared_class = import_string(options.get("SHARED_BACKEND", "django_redis.cache.RedisCache"))
+        self._shared = shared_class(server, shared_params)
+
+        fallback_params = {kk: vv for kk, vv in params.items() if kk != "OPTIONS"}
+        self._fallback = LocMemCache(f"tiered-fallback|{server}", fallback_params)
+
+        name = f"{server}|{self.key_prefix}"
+        self._local = _local_caches.setdefault(name, OrderedDict())
+        self._lock = _locks.setdefault(name, threading.Lock())
+        self._state = _states.setdefault(name, {"shared_down_until": 0})
+        self.stats = self._state.setdefault(
+            "stats", {"local_hits": 0, "shared_hits": 0, "misses": 0, "shared_errors": 0}
+        )
+
+    #
+    # PER-PROCESS LRU
+    # ##########################################################################
+
+    def _local_get(self, local_key):
+        with self._lock:
+            entry = self._local.get(local_key)
+            if entry is None:
+                return _missing
+            expires, pickled = entry
+            if expires <= time.monotonic():
+                del self._local[local_key]
+                return _missing
+            self._local.move_to_end(local_key)
+        return pickle.loads(pickled)
+
+    def _local_set(self, local_key, value, timeout=DEFAULT_TIMEOUT):
+        local_timeout = self._local_timeout
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is not None:
+            local_timeout = min(local_timeout, timeout - time.time())
+        if local_timeout <= 0:
+            self._local_delete(local_key)
+            return
+
+        # Values are pickled so callers cannot modify the cached copy
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._local[local_key] = (time.monotonic() + local_timeout, pickled)
+            self._local.move_to_end(local_key)
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, local_key):
+        with self._lock:
+            self._local.pop(local_key, None)
+
+    def _local_clear(self):
+        with self._lock:
+            self._local.clear()
+
+    #
+    # SHARED CACHE (with fallback)
+    # ##########################################################################
+
+    @property
+    def shared_available(self):
+        down_until = self._state["shared_down_until"]
+        return not (down_until and time.monotonic() < down_until)
+
+    def _call_shared(self, method, *args, **kwargs):
+        """
+        Call a method on the shared cache, or on the LocMem fallback when the shared cache is down
+        """
+        if self.shared_available:
+            try:
+                result = getattr(self._shared, method)(*args, **kwargs)
+                if self._state["shared_down_until"]:
+                    # Recovered: anything cached locally while down may be out of date
+                    logger.info("Shared cache is available again")
+                    self._state["shared_down_until"] = 0
+                    self._local_clear()
+                    self._fallback.clear()
+                return result
+            except ValueError:
+                # i.e. incr() of a missing key: the shared cache is working
+                raise
+            except Exception as ee:
+                self.stats["shared_errors"] += 1
+                logger.warning(f"Shared cache unavailable, using local fallback for {self._retry_seconds} seconds: {ee}")
+                self._state["shared_down_until"] = time.monotonic() + self._retry_seconds
+        return getattr(self._fallback, method)(*args, **kwargs)
+
+    #
+    # CACHE API
+    # ##########################################################################
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self._local_get(local_key)
+        if value is not _missing:
+            self.stats["local_hits"] += 1
+            return value
+
+        value = self._call_shared("get", key, _missing, version=version)
+        if value is _missing:
+            self.stats["misses"] += 1
+            return default
+
+        self.stats["shared_hits"] += 1
+        self._local_set(local_key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self._call_shared("set", key, value, timeout=timeout, version=version)
+        self._local_set(local_key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        added = self._call_shared("add", key, value, timeout=timeout, version=version)
+        if added:
+            self._local_set(local_key, value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self._local_delete(local_key)
+        return self._call_shared("touch", key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self._local_delete(local_key)
+        return self._call_shared("delete", key, version=version)
+
+    def has_key(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        if self._local_get(local_key) is not _missing:
+            return True
+        return self._call_shared("has_key", key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        # Counters are not held locally, so every process sees the same (atomic) value
+        local_key = self.make_and_validate_key(key, version=version)
+        self._local_delete(local_key)
+        return self._call_shared("incr", key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        self._local_delete(local_key)
+        return self._call_shared("decr", key, delta, version=version)
+
+    def clear(self):
+        self._local_clear()
+        self._fallback.clear()
+        return self._call_shared("clear")
+
+    def close(self, **kwargs):
+        if self.shared_available:
+            try:
+                self._shared.close(**kwargs)
+            except Exception:
+                pass
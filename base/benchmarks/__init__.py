@@ -0,0 +1,19 @@
+"""
+Micro-benchmarks for hot code paths.
+
+These are not unit tests (the test runner will not discover them). Run one with:
+    python -m base.benchmarks.<module_name>
+"""
+import os
+
+
+def setup_django():
+    """Configure Django when a benchmark is run as a stand-alone script"""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "the_hangar_hub.settings")
+    import django
+    django.setup()
+
+
+def report(label, seconds, calls):
+    """Print per-call cost in microseconds"""
+    print(f"{label.ljust(50, '.')} {seconds / calls * 1_000_000:10.2f} us/call")
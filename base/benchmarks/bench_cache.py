@@ -0,0 +1,63 @@
+"""
+Per-call cost of cache reads: DatabaseCache (previous default) vs TieredCache (LRU in front of Redis)
+
+Uses a temporary test database for the DatabaseCache table, and fakeredis when no Redis server is given:
+    python -m base.benchmarks.bench_cache
+    python -m base.benchmarks.bench_cache redis://127.0.0.1:6379/15
+
+Note: the test database is SQLite and fakeredis runs in-process, so absolute numbers understate the
+network round trip that both the (Postgres) DatabaseCache and Redis pay in production.
+"""
+from base.benchmarks import setup_django, report
+import sys
+import timeit
+
+
+def _caches(redis_location=None):
+    from django.core.cache.backends.db import DatabaseCache
+    from django.core.management.commands.createcachetable import Command as CreateCacheTable
+    from base.backends.tiered_cache import TieredCache
+
+    create_cache_table = CreateCacheTable()
+    create_cache_table.verbosity = 0
+    create_cache_table.create_table("default", "bench_cache", dry_run=False)
+    db_cache = DatabaseCache("bench_cache", {})
+
+    shared_options = {}
+    if not redis_location:
+        import fakeredis
+        redis_location = "redis://bench/0"
+        shared_options = {"CONNECTION_POOL_KWARGS": {"connection_class": fakeredis.FakeConnection}}
+
+    def tiered(local_timeout):
+        return TieredCache(redis_location, {
+            "KEY_PREFIX": f"bench-{local_timeout}",
+            "OPTIONS": {"LOCAL_TIMEOUT": local_timeout, "SHARED_OPTIONS": shared_options},
+        })
+
+    # A zero local timeout means every read goes to redis (i.e. a cold LRU)
+    return {"DatabaseCache": db_cache, "TieredCache (redis only)": tiered(0), "TieredCache (local hit)": tiered(60)}
+
+
+def run(calls=2000, redis_location=None):
+    value = {"identifier": "KXYZ", "name": "Benchmark Airport", "hangars": list(range(50))}
+    for label, cache in _caches(redis_location).items():
+        cache.set("bench:key", value, 300)
+        print(label)
+        report("  get (hit)", timeit.timeit(lambda: cache.get("bench:key"), number=calls), calls)
+        report("  get (miss)", timeit.timeit(lambda: cache.get("bench:missing"), number=calls), calls)
+        report("  set", timeit.timeit(lambda: cache.set("bench:key", value, 300), number=calls), calls)
+
+
+if __name__ == "__main__":
+    setup_django()
+    from django.test.utils import setup_test_environment
+    from django.test.runner import DiscoverRunner
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        run(redis_location=sys.argv[1] if len(sys.argv) > 1 else None)
+    finally:
+        runner.teardown_databases(old_config)
@@ -0,0 +1,67 @@
+"""
+string_to_date cost per format: previous (pandas for every string) vs the tiered parser
+
+    python -m base.benchmarks.bench_dates
+
+"first parse" clears the remembered strings before every call; "repeated" is the same string again.
+Formats are the ones in base/tests/test_string_to_date.py, plus epoch seconds.
+"""
+from base.benchmarks import setup_django, report
+from datetime import timezone
+from zoneinfo import ZoneInfo
+import timeit
+
+formats = [
+    "31-JAN-2025",
+    "2025-01-31",
+    "1/31/2025",
+    "01/31/25",
+    "31/1/25",
+    "01/31/25 20:24:45",
+    "01/31/25 20:24",
+    "01/31/25 8:24 PM",
+    "01/31/2025 8:24 pm",
+    "January 31, 2025, 8:24 p.m.",
+    "Jan 31, 2025, 8:24 p.m.",
+    "2025-01-31T20:24:45.498076-05:00",
+    "2025-01-31T20:24:45.498076",
+    "2025-02-01T01:24:45.498076+00:00",
+    "2025-01-31T20:24",
+    "1738373085",
+]
+
+
+def _previous_string_to_date(date_string, source_timezone=None):
+    """string_to_date as it was before (pandas for every non-numeric string)"""
+    import pandas
+    if not date_string.isnumeric():
+        dt = pandas.to_datetime(date_string).to_pydatetime()
+    else:
+        from datetime import datetime
+        dt = datetime.fromtimestamp(int(date_string), timezone.utc)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=ZoneInfo(source_timezone or "UTC"))
+    return dt.astimezone(timezone.utc)
+
+
+def run():
+    from base.services import date_service
+
+    calls = 2000
+    for date_string in formats:
+        print(date_string)
+        seconds = timeit.timeit(lambda: _previous_string_to_date(date_string, "America/New_York"), number=calls)
+        report("  previous (pandas)", seconds, calls)
+
+        def first_parse():
+            date_service._parse_string.cache_clear()
+            date_service.string_to_date(date_string, "America/New_York")
+        report("  first parse", timeit.timeit(first_parse, number=calls), calls)
+
+        seconds = timeit.timeit(lambda: date_service.string_to_date(date_string, "America/New_York"), number=calls)
+        report("  repeated", seconds, calls)
+
+
+if __name__ == "__main__":
+    setup_django()
+    run()
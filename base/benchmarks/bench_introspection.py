@@ -0,0 +1,64 @@
+"""
+Per-call cost of caller introspection: inspect.stack() vs direct frame access
+
+    python -m base.benchmarks.bench_introspection
+"""
+from base.benchmarks import setup_django, report
+from inspect import getframeinfo, stack
+import logging
+import os
+import timeit
+
+
+def _stack_cache_key(ignore_levels=0):
+    """The cache key as it was built before (inspect.stack)"""
+    caller = getframeinfo(stack()[2 + ignore_levels][0])
+    return f"cache-{os.path.basename(caller.filename)[:-3]}-{caller.function}"
+
+
+def run(calls=2000):
+    from base.classes.util.env_helper import EnvHelper
+    from base.classes.util.request_memo import RequestMemo, request_memo
+    from base.classes.util.log import Log
+
+    env = EnvHelper()
+    log = Log()
+
+    def recall_stack():
+        return RequestMemo.get(_stack_cache_key())
+
+    def recall_frame():
+        return env.recall()
+
+    def recall_explicit():
+        return env.recall(key="bench.explicit")
+
+    @request_memo("bench.decorated")
+    def decorated():
+        return True
+
+    print("Cache key for store/recall")
+    report("  before: inspect.stack()", timeit.timeit(recall_stack, number=calls), calls)
+    report("  after:  sys._getframe()", timeit.timeit(recall_frame, number=calls), calls)
+    report("  after:  explicit key", timeit.timeit(recall_explicit, number=calls), calls)
+    report("  after:  @request_memo", timeit.timeit(decorated, number=calls), calls)
+
+    print("Log.trace()/Log.end() with DEBUG disabled")
+    level = log.logger.level
+    log.logger.setLevel(logging.INFO)
+
+    def traced_stack():
+        getframeinfo(stack()[1][0])
+
+    def traced():
+        log.trace()
+        log.end()
+
+    report("  before: inspect.stack() per call", timeit.timeit(traced_stack, number=calls) * 2, calls)
+    report("  after:  level check only", timeit.timeit(traced, number=calls), calls)
+    log.logger.setLevel(level)
+
+
+if __name__ == "__main__":
+    setup_django()
+    run()
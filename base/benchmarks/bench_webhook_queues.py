@@ -0,0 +1,151 @@
+"""
+Load test for partitioned Stripe webhook processing (webhook_service.event_queue)
+
+Replays an event stream through the real queue_stripe_event/process_stripe_event, with a local broker stand-in:
+process_stripe_event.apply_async is patched to append each task to a per-queue list. Event arrivals are interleaved
+with task runs, taken in order from a random queue (as the stripe_events_N workers run in parallel, one task at a
+time each). Events are saved as product events with their data, so the model is updated without calling the API.
+    python -m base.benchmarks.bench_webhook_queues                  # synthetic object lifecycles
+    python -m base.benchmarks.bench_webhook_queues events.json      # arrival order of a recorded stream
+
+A recorded stream can be exported with:
+    python manage.py dumpdata base_stripe.StripeWebhookEvent --output events.json
+
+Reports the throughput of 1 queue (i.e. a single --pool=solo worker) up to 8 queues, adding a simulated Stripe
+round trip to each task. Fails if any object's events were applied out of order, or if any model does not end
+up with the data of its last event.
+"""
+from base.benchmarks import setup_django
+import json
+import random
+import sys
+import time
+import zlib
+
+# Simulated cost of the Stripe API call made by each task (processing is otherwise real)
+latency_seconds = 0.005
+
+
+def synthetic_stream(objects=200, seed=1):
+    """
+    Events for many objects arriving interleaved (each object's events are in order)
+    """
+    rng = random.Random(seed)
+    pending = [[f"obj_{nn:06d}"] * rng.randint(1, 5) for nn in range(objects)]
+    stream = []
+    while pending:
+        events = rng.choice(pending)
+        stream.append({"object_id": events.pop()})
+        if not events:
+            pending.remove(events)
+    return stream
+
+
+def recorded_stream(path):
+    """
+    Events from a JSON file: dumpdata output, or a list of {"object_id": ...}
+    """
+    with open(path) as ff:
+        rows = json.load(ff)
+    return [row.get("fields", row) for row in rows]
+
+
+def replay(stream, partitions, seed=1):
+    """
+    Receive every event and run the queued tasks, then check the order events were applied in
+    Returns (tasks run, simulated seconds for the busiest queue)
+    """
+    from unittest.mock import patch
+    from django.test import override_settings
+    from base_stripe.models.events import StripeWebhookEvent
+    from base_stripe.models.product_models import StripeProduct
+    from the_hangar_hub import tasks
+
+    # Each object of the stream becomes a product, with a name and version that count its events
+    products = {}
+    counts = {}
+    events = []
+    for row in stream:
+        stripe_id = products.setdefault(row["object_id"], f"prod_bench{len(products):06d}")
+        counts[stripe_id] = counts.get(stripe_id, 0) + 1
+        events.append((stripe_id, counts[stripe_id]))
+
+    StripeWebhookEvent.objects.all().delete()
+    StripeProduct.objects.all().delete()
+    StripeProduct.objects.bulk_create([
+        StripeProduct(stripe_id=stripe_id, name="v0", active=True, synced_as_of=0) for stripe_id in products.values()
+    ])
+
+    queues = {}
+    applied = []
+    sync = StripeProduct.sync
+
+    def send_task(args, countdown=None, queue=None):
+        queues.setdefault(queue, []).append(args)
+
+    def record_sync(model, api_data=None, as_of=None, save=True):
+        applied.append((model.stripe_id, as_of))
+        return sync(model, api_data, as_of=as_of, save=save)
+
+    rng = random.Random(seed)
+    busy = {}
+    tasks_run = 0
+    received = 0
+    caches = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "bench-webhook"}}
+    with override_settings(CACHES=caches, STRIPE_EVENT_QUEUES=partitions), \
+            patch.object(tasks.process_stripe_event, "apply_async", side_effect=send_task), \
+            patch.object(StripeProduct, "sync", autospec=True, side_effect=record_sync):
+        while received < len(events) or any(queues.values()):
+            waiting = [queue for queue, queued in queues.items() if queued]
+            if received < len(events) and (not waiting or rng.random() < 0.5):
+                stripe_id, version = events[received]
+                data = {"id": stripe_id, "object": "product", "name": f"v{version}", "active": True}
+                tasks.queue_stripe_event(StripeWebhookEvent.objects.create(
+                    event_type="product.updated", event_id=f"evt_bench{received}", object_type="product",
+                    object_id=stripe_id, object_version=version,
+                    payload=zlib.compress(json.dumps(data).encode()),
+                ))
+                received += 1
+            else:
+                queue = rng.choice(waiting)
+                start = time.perf_counter()
+                tasks.process_stripe_event.apply(args=queues[queue].pop(0))
+                busy[queue] = busy.get(queue, 0) + time.perf_counter() - start + latency_seconds
+                tasks_run += 1
+
+    # Every object's events were applied oldest first, and its model has the data of its last event
+    last_applied = {}
+    for stripe_id, version in applied:
+        assert version > last_applied.get(stripe_id, 0), f"{stripe_id} version {version} applied out of order"
+        last_applied[stripe_id] = version
+    final = {stripe_id: version for stripe_id, version in events}
+    saved = {pp.stripe_id: (pp.name, pp.synced_as_of) for pp in StripeProduct.objects.all()}
+    for stripe_id, version in final.items():
+        assert saved[stripe_id] == (f"v{version}", version), f"{stripe_id} is {saved[stripe_id]}, expected v{version}"
+
+    return tasks_run, max(busy.values())
+
+
+def run(stream):
+    objects = len({row["object_id"] for row in stream})
+    print(f"{len(stream)} events for {objects} objects, {latency_seconds * 1000:.0f} ms Stripe round trip per task")
+    for partitions in [1, 2, 4, 8]:
+        tasks_run, seconds = replay(stream, partitions)
+        label = f"{partitions} queue{'s' if partitions > 1 else ''}"
+        print(f"{label.ljust(20, '.')} {len(stream) / seconds:8.0f} events/sec  ({tasks_run} tasks, in order)")
+
+
+if __name__ == "__main__":
+    setup_django()
+    import logging
+    from django.test.utils import setup_test_environment
+    from django.test.runner import DiscoverRunner
+
+    logging.disable(logging.WARNING)
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        run(recorded_stream(sys.argv[1]) if len(sys.argv) > 1 else synthetic_stream())
+    finally:
+        runner.teardown_databases(old_config)
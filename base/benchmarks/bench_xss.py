@@ -0,0 +1,65 @@
+"""
+XSS scanning time for large form fields: previous regex checks vs the single-pass scanner
+
+    python -m base.benchmarks.bench_xss
+
+Time per KB should stay flat as the field grows (linear time).
+The previous patterns backtrack over every '<' on a line, so they are only timed on single-line
+fields up to 10 KB (a 30 KB single-line blog post took ~14 seconds).
+"""
+from base.benchmarks import setup_django
+import re
+import timeit
+
+
+def _previous_contains_script(value):
+    """contains_script as it was before (four uncompiled searches)"""
+    string_value = str(value).strip()
+    for pattern in [r'<\s?script', r'<.*src\s?=\s?[\'"].*script.+', r'<.*on\w+\s?=\s?[\'"].*', r'<\s?iframe']:
+        if re.search(pattern, string_value, re.I):
+            return True
+    return False
+
+
+def _payloads(size):
+    """Realistic form fields of (about) the given size"""
+    # WYSIWYG blog post: many short lines of formatted HTML
+    paragraph = (
+        '<p>The new T-hangars at the <a href="https://example.com/airport">airport</a> are ready. '
+        '<img src="/media/hangar.jpg" alt="Hangar" style="width: 100%;"> Rent is due on the 1st.</p>\n'
+    )
+    # Editor output without line breaks (one very long line of markup)
+    single_line = paragraph.replace("\n", "")
+    # Message board post: plain text
+    plain_text = "Does anyone have a tow bar for a Cessna 172 I could borrow this weekend? Thanks!\n"
+    # Worst case for the previous patterns: many tags and attributes on one line, but no script
+    attributes = '<td src="x" data-on="y">onion soup, source code</td>'
+    return {
+        "blog post (multi-line HTML)": (paragraph * (size // len(paragraph)), False),
+        "blog post (single-line HTML)": (single_line * (size // len(single_line)), True),
+        "message (plain text)": (plain_text * (size // len(plain_text)), False),
+        "table (single-line attributes)": (attributes * (size // len(attributes)), True),
+    }
+
+
+def run():
+    from base.services.validation_service import contains_script
+
+    for size in [10_000, 100_000, 1_000_000]:
+        print(f"{size // 1000} KB fields (us per KB)")
+        for label, (payload, single_line) in _payloads(size).items():
+            calls = max(1, 1_000_000 // size)
+            kb = len(payload) / 1000
+            after = timeit.timeit(lambda: contains_script(payload), number=calls) / calls
+            if single_line and size > 10_000:
+                before = "too slow"
+            else:
+                calls = 1 if single_line else calls
+                before = timeit.timeit(lambda: _previous_contains_script(payload), number=calls) / calls
+                before = f"{before / kb * 1e6:10.2f}"
+            print(f"  {label.ljust(35, '.')} before: {before:>10}   after: {after / kb * 1e6:8.2f}")
+
+
+if __name__ == "__main__":
+    setup_django()
+    run()
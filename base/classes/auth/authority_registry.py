@@ -0,0 +1,90 @@
+"""
+Authority codes interned to bit positions, so a permission check is a single AND
+
+A user's authorities become an int bitset (UserProfile.authority_mask), and each authority-list
+argument (i.e. "admin,~security") is parsed once into a mask of acceptable authorities.
+Bit positions are assigned per process as codes are first seen, so masks must never be stored
+outside of the process (cache the authority codes instead).
+"""
+from base.classes.auth.dynamic_role import DynamicRole
+from base.services import utility_service
+from functools import lru_cache
+import threading
+
+
+class AuthorityRegistry:
+    _bits = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def bit(cls, authority_code):
+        """
+        Bit representing an authority code (assigned the first time a code is seen)
+        """
+        bit = cls._bits.get(authority_code)
+        if bit is None:
+            with cls._lock:
+                bit = cls._bits.setdefault(authority_code, 1 << len(cls._bits))
+        return bit
+
+    @classmethod
+    def mask(cls, authority_codes):
+        """
+        Bitset of the given (exact) authority codes, i.e. the codes a user has been granted
+        """
+        mask = 0
+        for authority_code in authority_codes or []:
+            mask |= cls.bit(authority_code)
+        return mask
+
+    @classmethod
+    def parse(cls, authority_list):
+        """
+        Bitset of authorities that satisfy an authority-list argument (any one is sufficient)
+          authority_list: Code, csv of codes, or list of codes. Dynamic roles (~role) are expanded.
+        """
+        if not authority_list:
+            return 0
+        if type(authority_list) is str:
+            return _parse_csv(authority_list)
+        return _parse_codes(tuple(authority_list))
+
+    @classmethod
+    def dynamic_role(cls, role_string):
+        """
+        Expanded (and lower-cased) authority codes for a dynamic role
+        """
+        return _dynamic_role(role_string)
+
+    @classmethod
+    def clear(cls):
+        """
+        Forget all parsed authority lists (i.e. if dynamic role definitions change)
+        """
+        _parse_csv.cache_clear()
+        _parse_codes.cache_clear()
+        _dynamic_role.cache_clear()
+
+
+@lru_cache(maxsize=1024)
+def _dynamic_role(role_string):
+    return tuple(code.lower() for code in DynamicRole.get(role_string))
+
+
+@lru_cache(maxsize=1024)
+def _parse_csv(authority_string):
+    if ',' in authority_string:
+        return _parse_codes(tuple(utility_service.csv_to_list(authority_string)))
+    return _parse_codes((authority_string,))
+
+
+@lru_cache(maxsize=1024)
+def _parse_codes(authority_codes):
+    mask = 0
+    for authority_code in authority_codes:
+        if authority_code.startswith('~'):
+            for code in _dynamic_role(authority_code):
+                mask |= AuthorityRegistry.bit(code)
+        else:
+            mask |= AuthorityRegistry.bit(authority_code.lower())
+    return mask
@@ -7,6 +7,8 @@ This is the definitive source of all authenticated user data
 from base.services import message_service
 from base.classes.auth.user_profile import UserProfile
 from base.classes.util.app_data import EnvHelper, Log, AppData
+from base.classes.util.request_memo import RequestMemo
+from base.classes.util.record_buffer import RecordBuffer
 from base.models.utility.audit import Audit
 from django.contrib.auth.models import User, AnonymousUser
 from django.utils.functional import SimpleLazyObject
@@ -22,6 +24,7 @@ class Auth:
     authenticated_user = None   # Actual user that logged in
     impersonated_user = None    # Pretending to be this user (i.e. nonprod testing)
     proxied_user = None         # Performing an action on behalf of this user
+    _initialized = False
 
     def is_logged_in(self):
         """
@@ -118,11 +121,29 @@ class Auth:
             crud_code, event_code, comments, reference_code, reference_id, previous_value, new_value
         )
 
+    def __new__(cls, resume=True):
+        """
+        One Auth instance is shared for the duration of the request (per authenticated user)
+        """
+        memo_key = f"auth.session:{cls._request_user_key()}"
+        auth = RequestMemo.get(memo_key)
+        if auth is None:
+            auth = super().__new__(cls)
+            RequestMemo.set(memo_key, auth)
+        return auth
+
     def __init__(self, resume=True):
         """
         Initializes the Auth object.
         User data is cached for the duration of request, so multiple calls will not result in repeated database lookups.
         """
+        # Auth() returns the same instance within a request, which only needs to be initialized once
+        if self._initialized:
+            return
+        self._initialize()
+        self._initialized = True
+
+    def _initialize(self):
         # Get Django.auth.User
         user_instance = env.request.user
 
@@ -150,6 +171,14 @@ class Auth:
     # Shortcuts above reference the functions below (just for browsability)
     # ==========================================================================
 
+    @classmethod
+    def _request_user_key(cls):
+        """Identify the Django user of the current request"""
+        user_instance = getattr(env.request, "user", None)
+        if user_instance is None or not user_instance.is_authenticated:
+            return "-"
+        return user_instance.pk
+
     @classmethod
     def _lookup_user_profile(cls, user_data, get_contact=False, get_authorities=False):
         if user_data is None:
@@ -158,7 +187,7 @@ class Auth:
             return user_data
 
         lookup_key = str(user_data)
-        user_map = env.recall() or {}
+        user_map = env.recall(key="auth.user_profiles") or {}
         found_user = user_map.get(lookup_key)
 
         if not found_user:
@@ -169,7 +198,7 @@ class Auth:
                 user_map[lookup_key] = user_instance
                 found_user = user_map.get(lookup_key)
                 # Store updated dict for duration of request
-                env.store(user_map)
+                env.store(user_map, key="auth.user_profiles")
 
         # If getting contact or authorities, lookup could have been previously cached without that data.
         # Calling the functions to get that data will not re-query if the data is already present
@@ -210,8 +239,8 @@ class Auth:
             audit.reference_id = reference_id
             audit.previous_value = previous_value
             audit.new_value = new_value
-            audit.save()
-            return audit
+            # Written when the request is complete
+            return RecordBuffer.add(audit)
         except Exception as ee:
             log.error(f"Could not audit: {ee}")
             return None
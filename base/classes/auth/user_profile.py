@@ -1,11 +1,12 @@
 from base.classes.util.env_helper import Log, EnvHelper
-from base.services import utility_service
+from base.services import cache_service
 from base.models.utility.error import Error
-from base.classes.auth.dynamic_role import DynamicRole
+from base.classes.auth.authority_registry import AuthorityRegistry
 from allauth.socialaccount.models import SocialAccount
 from django.contrib.auth.models import User, AnonymousUser
 from django.utils.functional import SimpleLazyObject
 from base.models.contact.contact import Contact
+from base.models.auth.permission import Permission
 from django.db.models import Q
 from datetime import datetime, timezone
 from allauth.account.models import EmailAddress
@@ -13,6 +14,9 @@ from allauth.account.models import EmailAddress
 log = Log()
 env = EnvHelper()
 
+# Seconds to keep a user's authorities in the shared cache (permission changes invalidate it sooner)
+authority_cache_timeout = 60 * 60
+
 
 class UserProfile:
 
@@ -75,6 +79,7 @@ class UserProfile:
     # Authentication/Authorization Data
     is_proxied = None
     authorities = None  # {"auth_code": "Auth Title", ...}
+    _authority_mask = None
 
     # Holders for other classes (only do DB query once per request)
     user = None
@@ -120,6 +125,15 @@ class UserProfile:
         return self.contact().phone_number()
 
 
+    @property
+    def authority_mask(self):
+        """
+        Bitset of this user's authorities (see AuthorityRegistry)
+        """
+        if self._authority_mask is None:
+            self._authority_mask = AuthorityRegistry.mask(self.authorities)
+        return self._authority_mask
+
     def has_authority(self, authority_list):
         """
         Does this user have the specified authority?
@@ -130,26 +144,7 @@ class UserProfile:
             if not self.authorities:
                 return False
 
-            # If not already a list, make it so
-            if type(authority_list) is not list:
-                if ',' in authority_list:
-                    authority_list = utility_service.csv_to_list(authority_list)
-                else:
-                    authority_list = [authority_list]
-
-            # Expand out any dynamic roles
-            master_list = []
-            for authority_code in authority_list:
-                if authority_code.startswith('~'):
-                    master_list.extend(DynamicRole().get(authority_code))
-                else:
-                    master_list.append(authority_code)
-            del authority_list
-
-            # Look for any one matching authority
-            for authority_code in master_list:
-                if authority_code.lower() in self.authorities:
-                    return True
+            return bool(self.authority_mask & AuthorityRegistry.parse(authority_list))
         except Exception as ee:
             Error.record(ee, "Error checking user authorities")
 
@@ -222,27 +217,53 @@ class UserProfile:
 
     def _make_anonymous(self):
         self.authorities = []
+        self._authority_mask = None
         self.user = AnonymousUser()
         self._cached_contact = None
 
     def populate_authorities(self, force=False):
         if force or self.authorities is None:
             self.authorities = {}
+            self._authority_mask = None
             if self.is_valid():
 
                 # SuperUsers get the developer role
                 if self.is_superuser:
                     self.authorities["developer"] = "Developer"
 
-                try:
-                    now = datetime.now(timezone.utc)
-                    permissions = self.user.permissions.filter(Q(effective_date__isnull=True) | Q(effective_date__lte=now))
-                    permissions = permissions.filter(Q(end_date__isnull=True) | Q(end_date__gt=now))
-                    if permissions:
-                        for pp in permissions:
-                            self.authorities[pp.authority.code] = pp.authority.title
-                except Exception as ee:
-                    Error.record(ee, f"Error retrieving permissions for {self.email}")
+                self.authorities.update(self._granted_authorities(force))
+
+    def _granted_authorities(self, force=False):
+        """
+        Authorities granted via permissions (cached across requests until permissions change)
+        """
+        cache_key = f"auth:authorities:{self.id}:{Permission.cache_version()}"
+        if not force:
+            authorities = cache_service.get(cache_key, namespace="auth")
+            if authorities is not None:
+                return authorities
+
+        authorities = {}
+        try:
+            # Include future permissions so the cached value can expire when one takes effect
+            now = datetime.now(timezone.utc)
+            next_change = None
+            permissions = self.user.permissions.filter(Q(end_date__isnull=True) | Q(end_date__gt=now))
+            for pp in permissions.select_related("authority"):
+                if pp.effective_date and pp.effective_date > now:
+                    next_change = min(next_change or pp.effective_date, pp.effective_date)
+                    continue
+                authorities[pp.authority.code] = pp.authority.title
+                if pp.end_date:
+                    next_change = min(next_change or pp.end_date, pp.end_date)
+
+            timeout = authority_cache_timeout
+            if next_change:
+                timeout = max(1, min(timeout, int((next_change - now).total_seconds())))
+            cache_service.set(cache_key, authorities, timeout)
+        except Exception as ee:
+            Error.record(ee, f"Error retrieving permissions for {self.email}")
+        return authorities
 
     def get_contact_instance(self):
         if self._cached_contact:
@@ -254,7 +275,7 @@ class UserProfile:
 
         # Get contact from User
         try:
-            self._cached_contact = self.user.contact
+            self._cached_contact = Contact.get_for_user(self.user)
         except:
             self._cached_contact = None
 
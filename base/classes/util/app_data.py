@@ -1,8 +1,7 @@
 from django.conf import settings
 from crequest.middleware import CrequestMiddleware
-from inspect import getmembers
 from base.classes.util.env_helper import EnvHelper, Log
-import sys
+from base.classes.util.app_registry import AppRegistry
 
 log = Log()
 env = EnvHelper()
@@ -31,7 +30,7 @@ class AppData:
         The app code is used to specify the current app in shared base tables
         The app code is also used for determining permissions
         """
-        app_code = env.recall()
+        app_code = env.recall(key="app.code")
         if app_code:
             return app_code
 
@@ -83,7 +82,7 @@ class AppData:
             }
             self.set_sub_app_info(sub_app_info)
 
-        return env.store(app_in_use)
+        return env.store(app_in_use, key="app.code")
 
     def is_in_primary_app(self):
         if self.sub_apps():
@@ -122,13 +121,9 @@ class AppData:
         Get the version of the current application or sub-application
         """
         # Try to get from current app's (or sub-app's) __init__ version
-        current_app_code = self.get_app_code().lower()
-        try:
-            for stuff in getmembers(sys.modules[current_app_code]):
-                if "__version__" in stuff:
-                    return stuff[1]
-        except Exception as ee:
-            log.debug(f"Cannot determine version of {current_app_code}")
+        version = AppRegistry.version(self.get_app_code())
+        if version is not None:
+            return version
 
         # Return version from settings if not found in __init__
         return env.get_setting("APP_VERSION")
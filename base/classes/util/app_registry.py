@@ -0,0 +1,98 @@
+"""
+Application data that cannot change while the server is running (versions, plugin admin links)
+
+Built once from BaseConfig.ready(), and read by the context processors and template tags.
+"""
+from django.conf import settings
+from importlib import import_module
+from types import MappingProxyType
+import sys
+
+
+class AppRegistry:
+    _versions = None             # {app_code (lower): version} for installed apps and the primary/sub apps
+    _installed_plugins = None    # {app_name: version} for installed custom plugins
+    _admin_links = None          # {app_code (lower): (link, ...)} sorted by label
+
+    @classmethod
+    def build(cls):
+        """
+        Gather versions and admin links of all installed apps (called from BaseConfig.ready)
+        """
+        app_codes = [settings.APP_CODE] + list(getattr(settings, "SUB_APPS", None) or [])
+        app_names = [name.lower() for name in app_codes]
+        versions = {}
+        for app_name in list(settings.INSTALLED_APPS) + app_names:
+            version = cls._module_version(app_name)
+            if version is not None:
+                versions[app_name.lower()] = version
+
+        installed_plugins = {
+            app_name: versions.get(app_name.lower(), "?.?.?")
+            for app_name in settings.INSTALLED_APPS if app_name.startswith("mjg")
+        }
+
+        # Admin links for the installed custom plugins plus the app (or sub-app) in use
+        admin_links = {}
+        for app_name in app_names:
+            links = []
+            for plugin in list(installed_plugins) + [app_name]:
+                if not plugin.lower().startswith("django"):
+                    links.extend(cls._plugin_admin_links(plugin))
+            admin_links[app_name] = tuple(
+                MappingProxyType(dict(link)) for link in sorted(links, key=lambda i: i['label'])
+            )
+
+        cls._versions = MappingProxyType(versions)
+        cls._installed_plugins = MappingProxyType(installed_plugins)
+        cls._admin_links = MappingProxyType(admin_links)
+
+    @classmethod
+    def _ensure_built(cls):
+        if cls._versions is None:
+            cls.build()
+
+    @classmethod
+    def version(cls, app_code):
+        """
+        Version (__version__) of an app, or None
+        """
+        cls._ensure_built()
+        return cls._versions.get(str(app_code).lower())
+
+    @classmethod
+    def installed_plugins(cls):
+        cls._ensure_built()
+        return cls._installed_plugins
+
+    @classmethod
+    def admin_links(cls, app_code):
+        """
+        Admin menu links (from installed plugins and the given app), sorted by label
+        """
+        cls._ensure_built()
+        return cls._admin_links.get(str(app_code).lower(), ())
+
+    @staticmethod
+    def _module_version(app_name):
+        module = sys.modules.get(app_name)
+        if module is None:
+            try:
+                module = import_module(app_name)
+            except Exception:
+                return None
+        return getattr(module, "__version__", None)
+
+    @staticmethod
+    def _plugin_admin_links(plugin):
+        """
+        Admin links from settings (i.e. THE_HANGAR_HUB_ADMIN_LINKS), or the plugin's _DEFAULTS
+        """
+        setting_name = f"{plugin.upper().replace('-', '_')}_ADMIN_LINKS"
+        links = getattr(settings, setting_name, None)
+        if links is None:
+            try:
+                links = import_module(plugin)._DEFAULTS[setting_name]
+            except Exception:
+                links = None
+        return list(links or [])
@@ -3,12 +3,16 @@
 #
 
 from base.classes.util.log import Log
-from inspect import getframeinfo, stack
+from collections import namedtuple
 import os
+import sys
 import traceback
 
 log = Log()
 
+# The parts of inspect's frame info that are used here (without loading source code for every frame)
+Caller = namedtuple("Caller", ["filename", "function", "lineno"])
+
 
 class CallerData:
     stacktrace = None
@@ -110,27 +114,25 @@ class CallerData:
             log.warning(f"Unable to get stacktrace: {ee}")
 
         try:
-            # Ignore this __inti__ function
-            depth = 1
+            # Ignore this __init__ function
+            frame = sys._getframe(1)
 
             # Get the info about the function that initialized this class
-            caller = getframeinfo(stack()[depth][0])
+            caller = self._caller(frame)
             self.caller = caller
             self.calling_file_path = caller.filename
             self.calling_file_name = os.path.basename(caller.filename)
             self.calling_function = caller.function
             self.calling_line = caller.lineno
 
+            # Walk back through the calling frames (until the middleware, or the top of the stack)
             fn_list = [self.format_caller(caller)]
-            try:
-                while not caller.filename.endswith("base_interceptor_middleware.py"):
-                    depth += 1
-                    caller = getframeinfo(stack()[depth][0])
-                    # Ignore Django core function. Only interested in custom code
-                    if "django/core" not in caller.filename:
-                        fn_list.append(self.format_caller(caller))
-            except Exception as ee:
-                log.warning(f"Code depth exceeded: {depth}")
+            while frame.f_back is not None and not caller.filename.endswith("base_middleware.py"):
+                frame = frame.f_back
+                caller = self._caller(frame)
+                # Ignore Django core function. Only interested in custom code
+                if "django/core" not in caller.filename:
+                    fn_list.append(self.format_caller(caller))
 
             # List in chronological order
             fn_list.reverse()
@@ -138,3 +140,7 @@ class CallerData:
 
         except Exception as ee:
             log.warning(f"Unable to determine calling code: {ee}")
+
+    @staticmethod
+    def _caller(frame):
+        return Caller(frame.f_code.co_filename, frame.f_code.co_name, frame.f_lineno)
@@ -1,9 +1,11 @@
 from base.services import date_service
 from base.classes.util.log import Log
-import arrow
+from base.classes.util.lazy_import import lazy_import
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
+arrow = lazy_import("arrow")
+
 log = Log()
 
 
@@ -1,7 +1,8 @@
 from django.conf import settings
 from crequest.middleware import CrequestMiddleware
-from inspect import getframeinfo, stack, getmembers
+from base.classes.util.app_registry import AppRegistry
 from base.classes.util.log import Log
+from base.classes.util.request_memo import RequestMemo
 import os
 import sys
 
@@ -9,6 +10,16 @@ log = Log()
 unit_test_session = {'modified': False, 'warned': False}
 session_prefix = 'bcsv~'  # Base Custom Session Variable
 
+# Flash variables set this request, and those set in the previous request (dicts in the session)
+flash_scope_var = "flash_scope"
+flashed_scope_var = "flashed_scope"
+
+# Page scope variables (dict memoized with the request)
+page_scope_key = "env.page_scope"
+
+# Distinguishes a missing session variable from one set to None
+unset_marker = object()
+
 class EnvHelper:
 
     #
@@ -76,7 +87,15 @@ class EnvHelper:
     def set_session_variable(self, var_name, value):
         # Prefix all custom session entries
         var = f"{session_prefix}{var_name}"
-        self.session[var] = value
+        session = self.session
+
+        # Re-setting an equal value would mark the session as modified (and save it) for nothing.
+        # The same object is always re-set, since it may have been changed in place.
+        current = session.get(var, unset_marker)
+        if current is not value and current == value:
+            return value
+
+        session[var] = value
         return value
 
     def get_session_variable(self, var_name, alt=None, reset=False):
@@ -112,25 +131,18 @@ class EnvHelper:
     # ##########################################################################
 
     def set_page_scope(self, var, val):
-        var_name = f"page_scope_{var}"
-        self.set_session_variable(var_name, val)
+        # Page scope only lasts for the request, so it is kept with the request (not the session)
+        page_scope = RequestMemo.get(page_scope_key)
+        if page_scope is None:
+            page_scope = RequestMemo.set(page_scope_key, {})
+        page_scope[var] = val
         return val
 
     def get_page_scope(self, var, alt=None):
-        var_name = f"page_scope_{var}"
-        return self.get_session_variable(var_name, alt)
+        return (RequestMemo.get(page_scope_key) or {}).get(var, alt)
 
     def clear_page_scope(self):
-        session = self.session
-        temp_vars = []
-        for kk in session.keys():
-            if kk.startswith(f'{session_prefix}page_scope_'):
-                temp_vars.append(kk)
-        # Remove the keys from the session
-        for kk in temp_vars:
-            del session[kk]
-
-        session['modified'] = True
+        RequestMemo.delete(page_scope_key)
 
 
     #
@@ -138,65 +150,56 @@ class EnvHelper:
     # ##########################################################################
 
     def set_flash_scope(self, var, val):
-        var_name = f"flash_scope_{var}"
-        self.set_session_variable(var_name, val)
+        # Re-assign the dict so the session is marked as modified
+        flash_scope = self.get_session_variable(flash_scope_var) or {}
+        flash_scope[var] = val
+        self.set_session_variable(flash_scope_var, flash_scope)
         return val
 
     def get_flash_scope(self, var, alt=None):
-        # Get the value saved in previous request
-        prev_var_name = f"flashed_scope_{var}"
-        previous_flash_value = self.get_session_variable(prev_var_name, alt)
-
         # Get new value if overwritten during the current request
-        new_var_name = f"flash_scope_{var}"
-        new_flash_value = self.get_session_variable(new_var_name, 'flash-variable-not-set')
+        flash_scope = self.get_session_variable(flash_scope_var) or {}
+        if var in flash_scope:
+            return flash_scope[var]
 
-        # return the more recent of the two
-        # (flash variable from last request can be overwritten this request)
-        if new_flash_value != 'flash-variable-not-set':
-            return new_flash_value
-        else:
-            return previous_flash_value
+        # Otherwise, get the value saved in previous request
+        return (self.get_session_variable(flashed_scope_var) or {}).get(var, alt)
 
     def cycle_flash_scope(self):
+        """
+        Remove flash variables from two requests ago. Shift flash variables from last request.
+        The session is only modified if there were flash variables to remove or shift.
+        """
         session = self.session
-        flash_vars = []
-        flashed_vars = []
-        for kk in session.keys():
-            if kk.startswith(f'{session_prefix}flash_scope_'):
-                flash_vars.append(kk)
-            elif kk.startswith(f'{session_prefix}flashed_scope_'):
-                flashed_vars.append(kk)
-        # Remove the keys from the flashed scope
-        for kk in flashed_vars:
-            del session[kk]
-        # Move flash vars to flashed scope
-        for kk in flash_vars:
-            new_kk = kk.replace('flash_scope_', 'flashed_scope_')
-            session[new_kk] = session[kk]
-            del session[kk]
-
-        session['modified'] = True
+        flash_key = f"{session_prefix}{flash_scope_var}"
+        flashed_key = f"{session_prefix}{flashed_scope_var}"
+        if flash_key in session:
+            session[flashed_key] = session[flash_key]
+            del session[flash_key]
+        elif flashed_key in session:
+            del session[flashed_key]
 
 
     #
     # STORE/RECALL
     # ##########################################################################
 
-    def store(self, value, ignore_levels=0):
+    def store(self, value, ignore_levels=0, key=None, ttl=None):
         """
         Store the result of a function for the duration of the request.
+        Values are kept in memory with the request (not in the session)
+          key: Explicit cache key (defaults to the calling file and function)
+          ttl: Optional number of seconds before the stored value expires
         Note: If the stored response is mutable, changes made to the returned value will affect the cached instance as well
         """
-        self.set_page_scope(self._get_cache_key(ignore_levels), value)
-        return value
+        return RequestMemo.set(key or self._get_cache_key(ignore_levels), value, ttl)
 
-    def recall(self, alt=None, ignore_levels=0):
+    def recall(self, alt=None, ignore_levels=0, key=None):
         """
         Retrieve a stored result from a function run earlier in the request
         Note: If the stored response is mutable, changes made to the returned value will affect the cached instance as well
         """
-        value = self.get_page_scope(self._get_cache_key(ignore_levels))
+        value = RequestMemo.get(key or self._get_cache_key(ignore_levels))
         if value is None:
             return alt
         return value
@@ -230,17 +233,20 @@ class EnvHelper:
         Private function
         Get the key used by store/recall functions above
         UPDATE: This is also used for remembering pagination sort/order
+
+        Prefer an explicit key (or the @request_memo decorator) in frequently-called code.
         """
         # Ignore this function, and the store/recall function that called it (and any additional specified)
         depth = 2 + ignore_levels
 
         # Get the info about the function that called the store/recall function
-        caller = getframeinfo(stack()[depth][0])
+        # (frame attributes are read directly, since inspect.stack() loads source for every frame)
+        caller = sys._getframe(depth).f_code
 
         # Use filename without .py extension
-        filename = os.path.basename(caller.filename)[:-3]
+        filename = os.path.basename(caller.co_filename)[:-3]
 
-        return f"cache-{filename}-{caller.function}"
+        return f"cache-{filename}-{caller.co_name}"
 
     def test_cache_key(self):
         """
@@ -303,19 +309,7 @@ class EnvHelper:
         """
         Get a dict of the installed custom plugins and their versions
         """
-        installed_apps = {}
-        for app_name in self.get_setting("INSTALLED_APPS"):
-            if app_name.startswith("mjg"):
-                version = "?.?.?"
-                try:
-                    for stuff in getmembers(sys.modules[f"{app_name}"]):
-                        if "__version__" in stuff:
-                            version = stuff[1]
-                except Exception as ee:
-                    log.debug(f"Cannot determine version of {app_name}")
-                installed_apps[app_name] = version
-
-        return installed_apps
+        return AppRegistry.installed_plugins()
 
 
     #
@@ -0,0 +1,18 @@
+#
+#  Defer importing heavy packages (stripe, PIL, magic, requests, arrow) until they are used,
+#  so workers that never touch them do not pay for them at startup (see: manage.py import_profile)
+#
+
+from django.utils.functional import SimpleLazyObject
+from importlib import import_module
+
+
+def lazy_import(module_name):
+    """
+    A stand-in for a module, which imports it when an attribute is first used
+
+    Example:
+        stripe = lazy_import("stripe")      # instead of: import stripe
+        stripe.api_key = ...                # stripe is imported here
+    """
+    return SimpleLazyObject(lambda: import_module(module_name))
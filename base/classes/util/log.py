@@ -1,9 +1,11 @@
 import logging
 from datetime import datetime, timezone
-from inspect import getframeinfo, stack
+import html
+import json
 import os
-from io import StringIO
-from html.parser import HTMLParser
+import re
+import sys
+import time
 
 
 class Log:
@@ -14,26 +16,41 @@ class Log:
         self.logger = logging.getLogger('base')
         self.fn_times = {}
 
-    def debug(self, msg, strip_html=False):
-        self.logger.debug(strip_tags(msg) if strip_html else msg)
+    # Messages may use %-style arguments (i.e. log.debug("Loaded %s rows", count)), which are only
+    # formatted if the level is enabled. stacklevel reports the calling function (not this class)
+    # as the record's funcName/lineno.
 
-    def info(self, msg, strip_html=False):
-        self.logger.info(strip_tags(msg) if strip_html else msg)
+    def debug(self, msg, *args, strip_html=False):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(strip_tags(msg) if strip_html else msg, *args, stacklevel=2)
 
-    def warn(self, msg, strip_html=False):
-        self.logger.warning(strip_tags(msg) if strip_html else msg)
+    def info(self, msg, *args, strip_html=False):
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(strip_tags(msg) if strip_html else msg, *args, stacklevel=2)
 
-    def warning(self, msg, strip_html=False):
-        self.logger.warning(strip_tags(msg) if strip_html else msg)
+    def warn(self, msg, *args, strip_html=False):
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(strip_tags(msg) if strip_html else msg, *args, stacklevel=2)
 
-    def error(self, msg, trace_error=True, strip_html=False):
-        filename, line, function = self.get_caller_data()
+    def warning(self, msg, *args, strip_html=False):
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(strip_tags(msg) if strip_html else msg, *args, stacklevel=2)
+
+    def error(self, msg, *args, trace_error=True, strip_html=False):
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
+        msg = strip_tags(msg) if strip_html else msg
         if trace_error:
-            self.logger.error(f"{strip_tags(msg) if strip_html else msg} -- encountered in function {function}() at {filename}:{line}")
-        else:
-            self.logger.error(f"{strip_tags(msg) if strip_html else msg}")
+            # The location is also in the record (funcName, lineno), but text logs only show the message
+            filename, line, function = self.get_caller_data()
+            msg = f"{msg} -- encountered in function {function}() at {filename}:{line}"
+        self.logger.error(msg, *args, stacklevel=2)
 
     def trace(self, parameters=None, function_name=None):
+        # Skip all introspection and formatting when DEBUG messages would be discarded
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+
         # If function name not specified, get it from the stack
         if function_name is None:
             function_name = self.get_calling_function()
@@ -51,6 +68,10 @@ class Log:
             del params
 
     def end(self, result=None, function_name=None):
+        # Skip all introspection and formatting when DEBUG messages would be discarded
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return result
+
         # If function name not specified, get it from the stack
         if function_name is None:
             function_name = self.get_calling_function()
@@ -75,6 +96,9 @@ class Log:
         return result
 
     def summary(self, result=None, parameters=None):
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+
         # Get function name from the stack
         function_name = self.get_calling_function()
 
@@ -107,48 +131,71 @@ class Log:
     def get_caller_data(include_full_path=False):
         """Return the calling code as (file-name, line-number, function-name)"""
 
-        # Ignore this function, and the Log.<function> that called it
-        depth = 3
-
-        # Get the info about the function that called the log wrapper
-        caller = getframeinfo(stack()[depth][0])
-
-        # In case of nested functions within this class, may need to look deeper
-        while caller.filename.endswith('Log.py'):
-            depth += 1
-            caller = getframeinfo(stack()[depth][0])
+        # Walk up the frames until leaving this file. Reading frame attributes directly
+        # avoids inspect.stack(), which loads source code for every frame in the stack.
+        frame = sys._getframe(1)
+        while frame.f_back and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
 
+        filename = frame.f_code.co_filename
         return (
-            caller.filename if include_full_path else os.path.basename(caller.filename),
-            caller.lineno,
-            caller.function
+            filename if include_full_path else os.path.basename(filename),
+            frame.f_lineno,
+            frame.f_code.co_name
         )
 
 
 # For removing HTML from messages prior to logging them
-class MLStripper(HTMLParser):
-    def error(self, message):
-        pass
-
-    def __init__(self):
-        super().__init__()
-        self.reset()
-        self.strict = False
-        self.convert_charrefs= True
-        self.text = StringIO()
-
-    def handle_data(self, d):
-        self.text.write(d)
-
-    def get_data(self):
-        return self.text.getvalue()
+html_tag_pattern = re.compile(r"<[^>]*>")
 
 
 def strip_tags(html_string):
+    html_string = str(html_string)
+    if "<" not in html_string and "&" not in html_string:
+        return html_string
+
     # replace br with \n
     for br in ['<br>', '<br />', '<br style="clear:both;" />']:
         if br in html_string:
             html_string = html_string.replace(br, '\n')
-    s = MLStripper()
-    s.feed(html_string)
-    return s.get_data()
+    return html.unescape(html_tag_pattern.sub("", html_string))
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, with the request id, path, user, and time since the request started
+
+        LOGGING = {'formatters': {'json': {'()': 'base.classes.util.log.JsonFormatter'}}, ...}
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "function": record.funcName,
+            "line": record.lineno,
+        }
+        entry.update(self.request_data())
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+    @staticmethod
+    def request_data():
+        from crequest.middleware import CrequestMiddleware
+        request = CrequestMiddleware.get_request()
+        if request is None:
+            return {}
+
+        data = {"request_id": getattr(request, "request_id", None), "path": request.path}
+        # Only if the user was already loaded (logging should not query the database)
+        user = getattr(request, "_cached_user", None)
+        if user is not None:
+            data["user"] = user.get_username() if user.is_authenticated else None
+        start_time = getattr(request, "start_time", None)
+        if start_time is not None:
+            data["elapsed_ms"] = round((time.monotonic() - start_time) * 1000, 1)
+        return data
@@ -0,0 +1,141 @@
+#
+#  Audit and Error rows are collected during the request, and written together once the response is ready
+#
+
+from crequest.middleware import CrequestMiddleware
+from django.apps import apps
+from django.utils import timezone
+from base.classes.util.log import Log
+from base.classes.util.env_helper import EnvHelper
+
+log = Log()
+env = EnvHelper()
+
+# Attribute name used to attach the buffer (list of unsaved instances) to the request
+request_attribute = "_base_record_buffer"
+
+
+class RecordBuffer:
+    """
+    Buffered inserts for log-like models (Audit, Error).
+
+    BaseMiddleware opens a buffer for each request and flushes it when the response is complete
+    (even if the view raised an exception), so each model is written with a single bulk_create.
+    Without an open buffer (Celery tasks, management commands, unit tests) rows are saved immediately.
+
+    Settings:
+        BUFFER_RECORD_WRITES: False to save every row immediately
+        RECORD_WRITES_VIA_CELERY: True to hand the rows to a Celery task (base.tasks.write_records)
+                                  rather than writing them before the response is returned
+    """
+
+    @staticmethod
+    def open(request):
+        if env.get_setting("BUFFER_RECORD_WRITES", True):
+            setattr(request, request_attribute, [])
+
+    @staticmethod
+    def add(instance):
+        """
+        Save the instance when the request is complete (or now, if there is no open buffer)
+        """
+        request = CrequestMiddleware.get_request()
+        buffer = getattr(request, request_attribute, None) if request is not None else None
+        if buffer is None:
+            instance.save()
+        else:
+            buffer.append(instance)
+        return instance
+
+    @classmethod
+    def flush(cls, request):
+        """
+        Write (or queue) everything buffered during the request
+        """
+        records = getattr(request, request_attribute, None)
+        setattr(request, request_attribute, None)
+        if not records:
+            return
+
+        if env.get_setting("RECORD_WRITES_VIA_CELERY", False):
+            try:
+                from base.tasks import write_records
+                write_records.delay(cls.serialize(records))
+                return
+            except Exception as ee:
+                # Broker unavailable: write them now rather than lose them
+                log.warning(f"Could not queue {len(records)} records. Writing them now: {ee}")
+
+        cls.write(records)
+
+    @staticmethod
+    def write(records, keep_created=False):
+        """
+        Insert records with one query per model. If that fails, save them one at a time, and log any
+        that still cannot be saved (so the details are not lost).
+
+        keep_created: Keep the records' auto_now_add values (the time of the request, for records written by
+                      the Celery task) rather than the time they are inserted (costs one more query per model)
+        """
+        by_model = {}
+        for record in records:
+            by_model.setdefault(type(record), []).append(record)
+
+        for model, rows in by_model.items():
+            created_fields = [
+                ff.attname for ff in model._meta.concrete_fields if keep_created and getattr(ff, "auto_now_add", False)
+            ]
+            created = [[getattr(row, name) for name in created_fields] for row in rows]
+            try:
+                model.objects.bulk_create(rows)
+                if created_fields:
+                    # auto_now_add is applied on insert, but not by bulk_update
+                    for row, values in zip(rows, created):
+                        for name, value in zip(created_fields, values):
+                            setattr(row, name, value)
+                    model.objects.bulk_update(rows, created_fields)
+                continue
+            except Exception as ee:
+                log.warning(f"Could not bulk insert {len(rows)} {model.__name__} records: {ee}")
+
+            for row, values in zip(rows, created):
+                try:
+                    if row.pk is None:
+                        row.save()
+                    if created_fields:
+                        for name, value in zip(created_fields, values):
+                            setattr(row, name, value)
+                        row.save(update_fields=created_fields)
+                except Exception as ee:
+                    fields = {ff.attname: getattr(row, ff.attname) for ff in model._meta.concrete_fields}
+                    log.error(f"{model.__name__} record was not saved ({ee}): {fields}", trace_error=False)
+
+    @staticmethod
+    def serialize(records):
+        """
+        JSON-friendly rows for the Celery task: [[model label, {field: value}], ...]
+        auto_now_add fields are sent as the time the request completed (ISO format), so the worker can keep them
+        """
+        now = timezone.now().isoformat()
+        rows = []
+        for record in records:
+            fields = {}
+            for ff in record._meta.concrete_fields:
+                if getattr(ff, "auto_now_add", False):
+                    value = getattr(record, ff.attname)
+                    fields[ff.attname] = value.isoformat() if value else now
+                elif not ff.primary_key:
+                    fields[ff.attname] = getattr(record, ff.attname)
+            rows.append([record._meta.label, fields])
+        return rows
+
+    @staticmethod
+    def deserialize(rows):
+        records = []
+        for label, fields in rows:
+            model = apps.get_model(label)
+            for ff in model._meta.concrete_fields:
+                if getattr(ff, "auto_now_add", False) and ff.attname in fields:
+                    fields[ff.attname] = ff.to_python(fields[ff.attname])
+            records.append(model(**fields))
+        return records
@@ -0,0 +1,209 @@
+#
+#  In-process storage for values that only need to live as long as the current request
+#
+
+from crequest.middleware import CrequestMiddleware
+from contextvars import ContextVar
+from django.db import connection
+from django.db.models import QuerySet
+from functools import wraps
+import inspect
+import time
+
+# Attribute name used to attach the memo dict to the request
+request_attribute = "_base_request_memo"
+
+# When there is no request (unit tests, celery tasks, management commands)
+_no_request_memo = ContextVar("base_request_memo", default=None)
+
+
+class RequestMemo:
+    """
+    Memoized values for the duration of a single request.
+
+    Values are kept in a plain dict attached to the request object (never the session),
+    so nothing is pickled or written to the session backend. Without a request, a
+    context-local dict is used instead.
+    """
+
+    @staticmethod
+    def _new_memo():
+        return {"entries": {}, "hits": 0, "misses": 0, "stores": 0, "queries_saved": 0}
+
+    @classmethod
+    def _memo(cls):
+        request = CrequestMiddleware.get_request()
+        if request is not None:
+            memo = getattr(request, request_attribute, None)
+            if memo is None:
+                memo = cls._new_memo()
+                setattr(request, request_attribute, memo)
+            return memo
+
+        memo = _no_request_memo.get()
+        if memo is None:
+            memo = cls._new_memo()
+            _no_request_memo.set(memo)
+        return memo
+
+    @classmethod
+    def get(cls, key, alt=None):
+        """
+        Get a memoized value (or alt if not present or expired)
+        Note: If the stored value is mutable, changes made to the returned value will affect the cached instance as well
+        """
+        memo = cls._memo()
+        entry = memo["entries"].get(key)
+        if entry is not None:
+            value, expires, queries = entry
+            if expires is None or expires > time.monotonic():
+                memo["hits"] += 1
+                memo["queries_saved"] += queries
+                return value
+            del memo["entries"][key]
+        memo["misses"] += 1
+        return alt
+
+    @classmethod
+    def set(cls, key, value, ttl=None, queries=0):
+        """
+        Memoize a value for the rest of the request
+          ttl: Optional number of seconds before the value expires (even if the request is still active)
+          queries: Number of DB queries it took to produce the value (counted as saved on each hit)
+        """
+        memo = cls._memo()
+        expires = time.monotonic() + ttl if ttl else None
+        memo["entries"][key] = (value, expires, queries)
+        memo["stores"] += 1
+        return value
+
+    @classmethod
+    def has(cls, key):
+        entry = cls._memo()["entries"].get(key)
+        return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    @classmethod
+    def delete(cls, key):
+        cls._memo()["entries"].pop(key, None)
+
+    @classmethod
+    def clear(cls):
+        """
+        Remove all memoized values and reset the counters
+        """
+        memo = cls._memo()
+        memo["entries"].clear()
+        memo["hits"] = memo["misses"] = memo["stores"] = memo["queries_saved"] = 0
+
+    @staticmethod
+    def reset():
+        """
+        Discard the memo used without a request, so values do not outlive the unit of work
+        (called before and after each Celery task: see base/tasks.py)
+        """
+        _no_request_memo.set(None)
+
+    @classmethod
+    def stats(cls):
+        """
+        Hit/miss counters for the current request
+        """
+        memo = cls._memo()
+        return {
+            "entries": len(memo["entries"]),
+            "hits": memo["hits"],
+            "misses": memo["misses"],
+            "stores": memo["stores"],
+            "queries_saved": memo["queries_saved"],
+        }
+
+    @classmethod
+    def header(cls):
+        """
+        Summary for the X-Request-Memo debug response header
+        """
+        stats = cls.stats()
+        return "; ".join(f"{kk.replace('_', '-')}={vv}" for kk, vv in stats.items())
+
+
+# Distinguishes "nothing memoized" from a memoized None
+_not_memoized = object()
+
+
+def request_memo(key, ttl=None):
+    """
+    Decorator: memoize a function's result for the duration of the request under an explicit key
+
+    Only calls without (non-None) arguments are memoized (i.e. "for the current user/airport").
+    Calls with arguments are passed straight through to the function.
+
+    Example:
+        @request_memo("airport.manages")
+        def manages_this_airport():
+            ...
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def _memoized(*args, **kwargs):
+            if any(a is not None for a in args) or any(v is not None for v in kwargs.values()):
+                return fn(*args, **kwargs)
+            value = RequestMemo.get(key, _not_memoized)
+            if value is _not_memoized:
+                value = _call_and_memoize(key, fn, (), {}, ttl)
+            return value
+        return _memoized
+    return decorator
+
+
+def per_request(key, ttl=None):
+    """
+    Decorator: memoize a function's result for the duration of the request, per set of arguments
+
+    The memo key is built from the given key plus the (default-applied) arguments, so f() and f(None)
+    share a result. Model instances are identified by their primary key.
+    QuerySet results are evaluated and memoized as lists, so they are only queried once.
+
+    Example:
+        @per_request(key="tenant.rental_agreements")
+        def get_rental_agreements(tenant_data, airport=None):
+            ...
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @wraps(fn)
+        def _memoized(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            memo_key = f"{key}:{','.join(_arg_key(vv) for vv in bound.arguments.values())}"
+            value = RequestMemo.get(memo_key, _not_memoized)
+            if value is _not_memoized:
+                value = _call_and_memoize(memo_key, fn, args, kwargs, ttl)
+            return value
+        return _memoized
+    return decorator
+
+
+def _arg_key(value):
+    """Identify an argument in a memo key"""
+    if value is None:
+        return "-"
+    if hasattr(value, "_meta") and hasattr(value, "pk"):
+        return f"{value._meta.label_lower}#{value.pk}"
+    return f"{type(value).__name__}:{value}"
+
+
+def _call_and_memoize(memo_key, fn, args, kwargs, ttl):
+    """Run the function (counting its DB queries) and memoize the result"""
+    query_count = [0]
+
+    def count_queries(execute, sql, params, many, context):
+        query_count[0] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_queries):
+        value = fn(*args, **kwargs)
+        if isinstance(value, QuerySet):
+            value = list(value)
+
+    return RequestMemo.set(memo_key, value, ttl, query_count[0])
@@ -0,0 +1,74 @@
+#
+#  Session variables with a fixed maximum size, so long sessions do not keep growing
+#
+
+from base.classes.util.env_helper import EnvHelper
+import time
+
+env = EnvHelper()
+
+
+class SessionLRUSet:
+    """
+    A set of values in a session variable, limited to the most recently added values.
+
+    Stored as {str(value): epoch seconds added}, oldest first. Values are compared as strings.
+      max_size: Number of values to keep (the least recently added are dropped)
+      max_age: Optional number of seconds to keep a value
+      refresh_seconds: Re-adding a value moves it to the end at most this often (avoids a session write
+                       every time the same value is added)
+    """
+
+    def __init__(self, var_name, max_size=200, max_age=None, refresh_seconds=60):
+        self.var_name = var_name
+        self.max_size = max_size
+        self.max_age = max_age
+        self.refresh_seconds = refresh_seconds
+
+    def _values(self):
+        values = env.get_session_variable(self.var_name)
+        if type(values) is list:
+            # Stored as a list before this was bounded
+            now = int(time.time())
+            values = {str(vv): now for vv in values[-self.max_size:]}
+        return values or {}
+
+    def add(self, value):
+        values = self._values()
+        key = str(value)
+        now = int(time.time())
+
+        added = values.get(key)
+        if added is not None and now - added < self.refresh_seconds:
+            return value
+
+        # Move to the end (most recent)
+        values.pop(key, None)
+        values[key] = now
+
+        # Values are in the order added, so only the oldest need to be checked
+        oldest_allowed = now - self.max_age if self.max_age else None
+        while values:
+            oldest_key = next(iter(values))
+            if len(values) > self.max_size or (oldest_allowed and values[oldest_key] < oldest_allowed):
+                del values[oldest_key]
+            else:
+                break
+
+        env.set_session_variable(self.var_name, values)
+        return value
+
+    def discard(self, value):
+        values = self._values()
+        if values.pop(str(value), None) is not None:
+            env.set_session_variable(self.var_name, values)
+
+    def __contains__(self, value):
+        added = self._values().get(str(value))
+        if added is None:
+            return False
+        return not (self.max_age and added < int(time.time()) - self.max_age)
+
+    def __len__(self):
+        return len(self._values())
+
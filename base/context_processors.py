@@ -1,7 +1,9 @@
 from .services import auth_service
 from .classes.breadcrumb import Breadcrumb
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 from base.classes.util.app_data import Log, EnvHelper, AppData
+from base.classes.util.app_registry import AppRegistry
 from datetime import datetime, timezone
 
 log = Log()
@@ -10,19 +12,15 @@ app = AppData()
 
 
 def util(request):
-    breadcrumbs = []
-    for bc in Breadcrumb.get():
-        breadcrumbs.append(Breadcrumb(bc))
-
-    app_code = app.get_app_code()
-    app_version = app.get_app_version()
-
+    """
+    Values that require a lookup are lazy (only computed if the template uses them)
+    """
     preferred_date_format = "m/d/Y"
     preferred_time_format = "h:i A"
 
-    model = {
-        'app_code': app_code,
-        'app_version': app_version,
+    return {
+        'app_code': SimpleLazyObject(app.get_app_code),
+        'app_version': SimpleLazyObject(app.get_app_version),
         'absolute_root_url': env.absolute_root_url,
 
         'support_email': env.get_setting("SUPPORT_EMAIL_ADDRESS"),
@@ -38,10 +36,10 @@ def util(request):
         'is_development': env.is_development,
 
         # Breadcrumbs (can be set in the view with utility_service functions)
-        'breadcrumbs': breadcrumbs,
+        'breadcrumbs': SimpleLazyObject(lambda: [Breadcrumb(bc) for bc in Breadcrumb.get()]),
 
         # Forms (submission errors will put a "prefill" dict in flash scope to pre-populate the form)
-        "prefill": env.get_flash_scope("prefill"),
+        "prefill": SimpleLazyObject(lambda: env.get_flash_scope("prefill")),
 
         # Posted messages at top of page by default. Setting option allows moving them to the bottom
         'posted_message_position': getattr(settings, 'POSTED_MESSAGE_POSITION', 'TOP').upper(),
@@ -49,35 +47,19 @@ def util(request):
         "now": datetime.now(timezone.utc),
         "preferred_date_format": preferred_date_format,
         "preferred_time_format": preferred_time_format,
-        "preferred_datetime_format": f"{preferred_date_format} {preferred_time_format}"
-    }
+        "preferred_datetime_format": f"{preferred_date_format} {preferred_time_format}",
 
-    # Get admin links for any installed custom plugins, and the current app
-    plugin_admin_links = []
-    apps = env.installed_plugins
-    apps.update({app_code.lower(): app_version})
-    for plugin, version in apps.items():
-        if plugin.lower().startswith("django"):
-            continue
-        setting_name = f"{plugin.upper().replace('-', '_')}_ADMIN_LINKS"
-        try:
-            this_link_list = getattr(settings, setting_name)
-            plugin_admin_links.extend(this_link_list)
-        except AttributeError as ee:
-            try:
-                exec(f"from {plugin} import _DEFAULTS as {plugin}_defaults")
-                these_links = eval(f"{plugin}_defaults['{setting_name}']")
-                if these_links:
-                    plugin_admin_links.extend(these_links)
-            except Exception as ee:
-                pass
-
-    model['plugin_admin_links'] = sorted(plugin_admin_links, key=lambda i: i['label'])
-    return model
+        # Admin links for any installed custom plugins, and the current app
+        'plugin_admin_links': SimpleLazyObject(lambda: AppRegistry.admin_links(app.get_app_code())),
+    }
 
 
 def auth(request):
-    auth_instance = auth_service.get_auth_instance()
+    """
+    Auth values are lazy, so pages that do not use them do not look up the user's profile
+    """
+    auth_instance = SimpleLazyObject(auth_service.get_auth_instance)
+    current_user = SimpleLazyObject(lambda: auth_instance.get_current_user_profile())
 
     socialauth_providers = env.get_setting("SOCIALACCOUNT_PROVIDERS")
     try:
@@ -86,17 +68,17 @@ def auth(request):
         google_client_id = None
 
     return {
-        'is_authenticated': auth_instance.is_logged_in(),
-        'is_logged_in': auth_instance.is_logged_in(),
-        'current_user': auth_instance.get_current_user_profile(),
-        'authenticated_user': auth_instance.authenticated_user,
-        'proxied_user': auth_instance.proxied_user,
-        'can_impersonate': auth_instance.can_impersonate(),
-        'is_impersonating': auth_instance.is_impersonating(),
-        'can_proxy': auth_instance.get_current_user_profile().has_authority('~proxy'),
-        'is_proxying': auth_instance.is_proxying(),
-        'is_developer': auth_service.has_authority("developer"),
-        'is_admin': auth_service.has_authority("admin"),
-        'avatar_url': auth_instance.get_current_user_profile().get_avatar_url(),
+        'is_authenticated': SimpleLazyObject(lambda: auth_instance.is_logged_in()),
+        'is_logged_in': SimpleLazyObject(lambda: auth_instance.is_logged_in()),
+        'current_user': current_user,
+        'authenticated_user': SimpleLazyObject(lambda: auth_instance.authenticated_user),
+        'proxied_user': SimpleLazyObject(lambda: auth_instance.proxied_user),
+        'can_impersonate': SimpleLazyObject(lambda: auth_instance.can_impersonate()),
+        'is_impersonating': SimpleLazyObject(lambda: auth_instance.is_impersonating()),
+        'can_proxy': SimpleLazyObject(lambda: current_user.has_authority('~proxy')),
+        'is_proxying': SimpleLazyObject(lambda: auth_instance.is_proxying()),
+        'is_developer': SimpleLazyObject(lambda: current_user.has_authority("developer")),
+        'is_admin': SimpleLazyObject(lambda: current_user.has_authority("admin")),
+        'avatar_url': SimpleLazyObject(lambda: current_user.get_avatar_url()),
         'google_client_id': google_client_id,
     }
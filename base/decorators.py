@@ -4,7 +4,9 @@ from functools import wraps
 from urllib.parse import urlparse
 from django.contrib.auth import REDIRECT_FIELD_NAME
 from django.shortcuts import resolve_url
+from django.http import HttpResponse
 from base.services import auth_service
+from base.services import rate_limit_service as limiter
 from base.models.utility.error import Error
 
 log = Log()
@@ -191,6 +193,39 @@ def require_non_production(redirect_url='/'):
         return _wrapped_view
     return decorator
 
+# ===               ===
+# === RATE LIMITING ===
+# ===               ===
+
+
+def rate_limit(per_second=None, per_minute=None, per_hour=None, methods=("POST",)):
+    """
+    Decorator for views that limits how often each user (or client IP) may call them
+
+    methods: Only requests with these methods are counted (i.e. form submissions)
+
+    Example:
+        from base.decorators import rate_limit
+
+        @rate_limit(per_minute=5, per_hour=20)
+        def submit_form(request):
+            pass
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if methods and request.method not in methods:
+                return view_func(request, *args, **kwargs)
+
+            key = f"view:{view_func.__module__}.{view_func.__name__}:{limiter.client_identity(request)}"
+            if limiter.allow(key, per_second, per_minute, per_hour):
+                return view_func(request, *args, **kwargs)
+
+            return HttpResponse("Too many attempts. Please wait a minute and try again.", status=429)
+        return _wrapped_view
+    return decorator
+
+
 #
 # REMAINING GENERIC CODE IS CALLED FROM THE DECORATORS ABOVE
 #
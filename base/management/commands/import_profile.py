@@ -0,0 +1,116 @@
+"""
+Import-time audit: what does it cost to start a worker, and which of our modules pull in the heavy packages?
+
+    python manage.py import_profile
+    python manage.py import_profile --urls             # Also import the URLconf (everything loaded by the first request)
+    python manage.py import_profile --module base_stripe.services.invoice_service
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import os
+import subprocess
+import sys
+
+# Python code run in a fresh interpreter with -X importtime
+profile_script = """
+import os, sys, importlib
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", {settings_module!r})
+import django
+django.setup()
+for module_name in sys.argv[1:]:
+    importlib.import_module(module_name)
+"""
+
+
+class Command(BaseCommand):
+    help = "Profile the time spent importing modules at startup (in a new Python process)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--urls", action="store_true", help="Also import the URLconf (and all views)")
+        parser.add_argument("--module", action="append", default=[], help="Also import this module")
+        parser.add_argument("--limit", type=int, default=20, help="Number of packages to list")
+
+    def handle(self, *args, **options):
+        modules = list(options["module"])
+        if options["urls"]:
+            modules.insert(0, settings.ROOT_URLCONF)
+
+        entries = self.profile(modules)
+        if not entries:
+            return
+
+        total = sum(ee["cumulative"] for ee in entries if ee["depth"] == 0)
+        self.stdout.write(f"Total import time: {total / 1000:.0f} ms ({len(entries)} modules)\n")
+
+        # Third-party packages (first import of each), slowest first
+        project_apps = self.project_apps()
+        packages = [
+            ee for ee in entries
+            if "." not in ee["name"] and ee["name"] not in project_apps and ee["name"] not in sys.stdlib_module_names
+        ]
+        packages.sort(key=lambda ee: -ee["cumulative"])
+
+        self.stdout.write(f"\n{'ms':>8}  package  <-  imported by")
+        for entry in packages[:options["limit"]]:
+            importer = self.project_importer(entry, project_apps) or "-"
+            self.stdout.write(f"{entry['cumulative'] / 1000:8.1f}  {entry['name']}  <-  {importer}")
+
+        # Our own modules with the most time spent in imports they started
+        ours = [ee for ee in entries if ee["name"].split(".")[0] in project_apps]
+        ours.sort(key=lambda ee: -ee["cumulative"])
+        self.stdout.write(f"\n{'ms':>8}  project module (including everything it imported)")
+        for entry in ours[:options["limit"]]:
+            self.stdout.write(f"{entry['cumulative'] / 1000:8.1f}  {entry['name']}")
+
+    def profile(self, modules):
+        """
+        Import Django (and the given modules) with -X importtime
+        Returns entries in import order: {name, depth, self, cumulative, parent} (times in microseconds)
+        """
+        script = profile_script.format(settings_module=os.environ.get("DJANGO_SETTINGS_MODULE"))
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", script] + modules,
+            capture_output=True, text=True, cwd=settings.BASE_DIR,
+        )
+        if result.returncode:
+            self.stderr.write(result.stderr[-2000:])
+            return None
+
+        # importtime lists children before their parent, indented two spaces per level
+        entries = []
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            depth = (len(name) - len(name.lstrip())) // 2 - 1
+            entries.append({
+                "name": name.strip(), "depth": depth, "self": int(self_us), "cumulative": int(cumulative_us),
+                "parent": None,
+            })
+
+        # Each entry's parent is the next entry with a smaller depth
+        pending = []
+        for entry in entries:
+            while pending and pending[-1]["depth"] > entry["depth"]:
+                pending.pop()["parent"] = entry
+            pending.append(entry)
+        return entries
+
+    @staticmethod
+    def project_apps():
+        return {
+            name.split(".")[0] for name in settings.INSTALLED_APPS
+            if os.path.isdir(os.path.join(settings.BASE_DIR, name.split(".")[0]))
+        }
+
+    @staticmethod
+    def project_importer(entry, project_apps):
+        """
+        The nearest of our modules that (directly or indirectly) imported this one
+        """
+        parent = entry["parent"]
+        while parent is not None:
+            if parent["name"].split(".")[0] in project_apps:
+                return parent["name"]
+            parent = parent["parent"]
+        return None
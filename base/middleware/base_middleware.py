@@ -2,6 +2,11 @@ from base.services import auth_service
 from django.urls import reverse
 from base.classes.util.app_data import Log, EnvHelper, AppData
 from base.classes.auth.session import Auth
+from base.classes.util.request_memo import RequestMemo
+from base.classes.util.record_buffer import RecordBuffer
+import logging
+import time
+import uuid
 
 log = Log()
 env = EnvHelper()
@@ -25,12 +30,18 @@ class BaseMiddleware:
         if posted_messages:
             log.debug("Processing 'Posted Messages'...")
 
+        # Identify this request in structured (JSON) logs
+        request.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+        request.start_time = time.monotonic()
+
         # In non-prod, make the start of a new request more visible in the log (console)
-        if not silence_logs:
+        if not silence_logs and log.logger.isEnabledFor(logging.DEBUG):
             w = 80
             sep = '='.ljust(w, '=')
             msg = f"{request.method} {request.path} @{auth_service.get_auth_instance()}"
             log.debug(f"\n{sep}\n{msg.center(w)}\n{sep}")
+
+        if not silence_logs:
             if auth_service.has_authority('~power_user'):
                 env.set_session_variable('allow_limited_features', True)
 
@@ -45,13 +56,24 @@ class BaseMiddleware:
         else:
             request.user_profile = None
 
+        # Audit and Error records are written together once the response is ready
+        RecordBuffer.open(request)
+
         # Render the response
-        response = self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            RecordBuffer.flush(request)
 
         # After the view has completed
         env.clear_page_scope()
 
+        # In debug mode, report request memo usage (including DB queries it avoided)
+        if env.get_setting("DEBUG"):
+            response["X-Request-Memo"] = RequestMemo.header()
+
         if not silence_logs:
+            log.debug("Request memo: %s", RequestMemo.stats())
             log.end(None, request.path)
 
         return response
@@ -79,13 +79,14 @@ def xss_prevention(get_response):
 
         # If not already loading the lock page (and not an AWS health check)
         if not (is_xss_lock or is_health_check or is_posted_messages):
-            auth = auth_service.get_auth_instance()
-            user_id = auth.authenticated_user.id
+            # The authenticated Django user (no need to build the Auth profile for this)
+            user = getattr(request, "user", None)
+            user_id = user.id if user is not None and user.is_authenticated else None
 
             # Locked out users may log out or stop impersonating
             if user_id and not(is_terminating_impersonation or is_logging_out):
-                # Count the number of un-reviewed XSS attempts for this user
-                attempts = len(XssAttempt.objects.filter(user_username=auth.authenticated_user.username, reviewer_username__isnull=True))
+                # Count the number of un-reviewed XSS attempts for this user (cached)
+                attempts = XssAttempt.unreviewed_count(user.username)
                 # After 3 attempts, user is locked out of site
                 if attempts >= 3:
                     return redirect('base:xss_lock')
@@ -2,10 +2,18 @@ from django.db import models
 from base.classes.util.log import Log
 from django.contrib.auth.models import User
 from base.models.auth.authority import Authority
+from base.services import cache_service
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from datetime import datetime, timezone
+import time
 
 log = Log()
 
+# Cached user authorities (see UserProfile) are keyed by this stamp, which changes whenever permissions change
+permission_version_key = "auth:permission-version"
+permission_version_timeout = 24 * 60 * 60
+
 
 class Permission(models.Model):
     """
@@ -37,3 +45,29 @@ class Permission(models.Model):
         else:
             self.end_date = datetime.now(timezone.utc)
             self.save()
+
+    @classmethod
+    def cache_version(cls):
+        """
+        Stamp identifying the current set of permissions (for cache keys)
+        """
+        version = cache_service.get(permission_version_key, namespace="auth")
+        if version is None:
+            version = cls.new_cache_version()
+        return version
+
+    @classmethod
+    def new_cache_version(cls):
+        """
+        Invalidate all cached authorities by changing the permission version stamp
+        """
+        return cache_service.set(permission_version_key, time.time_ns(), permission_version_timeout)
+
+
+# Cached authorities are out of date when permissions (or authority titles) change
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=Authority)
+@receiver(post_delete, sender=Authority)
+def clear_authority_cache(sender, instance, **kwargs):
+    Permission.new_cache_version()
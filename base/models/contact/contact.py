@@ -1,10 +1,15 @@
 from django.db import models
 from base.classes.util.log import Log
 from django.contrib.auth.models import User
-from base.services import message_service, validation_service
+from base.services import message_service, validation_service, cache_service
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 log = Log()
 
+# Seconds to keep a user's Contact in the shared cache (saves/deletes invalidate it sooner)
+contact_cache_timeout = 60 * 60
+
 
 class Contact(models.Model):
     """
@@ -140,3 +145,43 @@ class Contact(models.Model):
         except Exception as ee:
             log.error(f"Could not get contact: {ee}")
             return None
+
+    @staticmethod
+    def user_cache_key(user_id):
+        return f"contact:user:{user_id}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # User the Contact was loaded with (its cache entry must be cleared if the Contact moves to another user)
+        instance._loaded_user_id = instance.__dict__.get("user_id")
+        return instance
+
+    @classmethod
+    def get_for_user(cls, user):
+        """
+        Get the Contact linked to a User (cached across requests)
+        """
+        if not (user and user.id):
+            return None
+
+        def load():
+            try:
+                return user.contact
+            except cls.DoesNotExist:
+                return None
+
+        contact = cache_service.get_or_load(cls.user_cache_key(user.id), load, contact_cache_timeout, namespace="contact")
+        if contact:
+            contact.user = user
+        return contact
+
+
+# Remove the cached Contact when it is saved or deleted
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+def clear_contact_cache(sender, instance, **kwargs):
+    user_ids = {instance.user_id, getattr(instance, "_loaded_user_id", None)} - {None}
+    if user_ids:
+        cache_service.delete(*[Contact.user_cache_key(user_id) for user_id in user_ids])
+    instance._loaded_user_id = instance.user_id
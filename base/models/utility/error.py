@@ -1,6 +1,7 @@
 from django.db import models
 from base.classes.util.env_helper import EnvHelper, Log
 from base.classes.util.caller_data import CallerData
+from base.classes.util.record_buffer import RecordBuffer
 from django.utils.html import mark_safe
 from base.services import validation_service, message_service
 import traceback
@@ -183,7 +184,8 @@ class Error(models.Model):
             ee.error_system = str(error_system)[:128] if error_system else error_system
             ee.debug_info = str(debug_info)[:128] if debug_info else debug_info
             ee.stacktrace = stacktrace
-            ee.save()
+            # Written when the request is complete
+            RecordBuffer.add(ee)
         except Exception as ee:
             log.warning(f"Unexpected error was not saved in database: {str(ee)}")
 
@@ -114,7 +114,7 @@ class Feature(models.Model):
         """
         Get a map of features and whether they are enabled
         """
-        toggles = env.recall()
+        toggles = env.recall(key="feature.toggles")
         if toggles and not force_query:
             return toggles
 
@@ -131,7 +131,7 @@ class Feature(models.Model):
                 toggles[ff.feature_code] = ff.current_status() == 'Y'
         del features
 
-        return env.store(toggles)
+        return env.store(toggles, key="feature.toggles")
 
     @classmethod
     def get(cls, feature_info):
@@ -2,10 +2,16 @@ from django.db import models
 from base.classes.util.log import Log
 from django.contrib.auth.models import User
 from django.contrib.sessions.models import Session
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from base.services import cache_service
 from datetime import datetime, timezone
 
 log = Log()
 
+# Seconds to keep a user's count of un-reviewed attempts in the shared cache
+lockout_cache_timeout = 60 * 60
+
 
 class XssAttempt(models.Model):
     """Potential XSS attempts"""
@@ -78,3 +84,37 @@ class XssAttempt(models.Model):
         except Exception as ee:
             log.error(f"Could not get XssAttempt: {ee}")
             return None
+
+    @staticmethod
+    def lockout_cache_key(username):
+        return f"xss:unreviewed:{username}"
+
+    @classmethod
+    def unreviewed_count(cls, username):
+        """
+        Number of un-reviewed attempts by a user (cached, and kept current as attempts are created/reviewed)
+        """
+        return cache_service.get_or_load(
+            cls.lockout_cache_key(username),
+            lambda: cls.objects.filter(user_username=username, reviewer_username__isnull=True).count(),
+            lockout_cache_timeout, namespace="xss"
+        )
+
+
+# Keep the cached lockout counter current
+@receiver(post_save, sender=XssAttempt)
+def update_xss_lockout_counter(sender, instance, created, **kwargs):
+    if not instance.user_username:
+        return
+    if created and not instance.reviewer_username:
+        # If the counter is not cached, it will be counted from the database when next needed
+        cache_service.incr(XssAttempt.lockout_cache_key(instance.user_username))
+    else:
+        # Reviewed (or otherwise changed): recount when next needed
+        cache_service.delete(XssAttempt.lockout_cache_key(instance.user_username))
+
+
+@receiver(post_delete, sender=XssAttempt)
+def reset_xss_lockout_counter(sender, instance, **kwargs):
+    if instance.user_username:
+        cache_service.delete(XssAttempt.lockout_cache_key(instance.user_username))
@@ -0,0 +1,110 @@
+"""
+Shared (cross-process) read-through caching
+
+Values are read from the default cache (a per-process LRU in front of Redis, see base.backends.tiered_cache),
+and otherwise loaded from the source (usually the database) and written back to the cache.
+If the cache is unavailable, lookups fall through to the loader rather than failing.
+"""
+from django.core.cache import cache
+from base.classes.util.log import Log
+
+log = Log()
+
+# Per-process hit/miss counters, by namespace
+_stats = {}
+
+
+def _count(namespace, counter):
+    ns = _stats.setdefault(namespace, {"local_hits": 0, "shared_hits": 0, "misses": 0})
+    ns[counter] += 1
+
+
+def _shared_hits():
+    """Shared-tier hit count from the tiered backend (if that is the configured backend)"""
+    return (getattr(cache, "stats", None) or {}).get("shared_hits", 0)
+
+
+def get(key, namespace="default"):
+    """
+    Get a cached value (or None if not cached)
+    """
+    shared_before = _shared_hits()
+    try:
+        value = cache.get(key)
+    except Exception as ee:
+        log.warning(f"Unable to read cache key {key}: {ee}")
+        value = None
+
+    if value is None:
+        _count(namespace, "misses")
+    elif _shared_hits() > shared_before:
+        _count(namespace, "shared_hits")
+    else:
+        _count(namespace, "local_hits")
+    return value
+
+
+def set(key, value, timeout=None):
+    """
+    Cache a value
+      timeout: Seconds to keep the value (None uses the cache default)
+    """
+    try:
+        cache.set(key, value, timeout) if timeout else cache.set(key, value)
+    except Exception as ee:
+        log.warning(f"Unable to cache key {key}: {ee}")
+    return value
+
+
+def get_or_load(key, loader, timeout=None, namespace="default"):
+    """
+    Read-through: get a cached value, or call loader() and cache its (non-None) result
+    """
+    value = get(key, namespace)
+    if value is None:
+        value = loader()
+        if value is not None:
+            set(key, value, timeout)
+    return value
+
+
+def incr(key, delta=1):
+    """
+    Atomically increment a cached counter
+    Returns the new value, or None if the counter is not cached (so it can be rebuilt from the source)
+    """
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        return None
+    except Exception as ee:
+        log.warning(f"Unable to increment cache key {key}: {ee}")
+        return None
+
+
+def delete(*keys):
+    """
+    Remove values from the cache
+    """
+    try:
+        cache.delete_many(keys)
+    except Exception as ee:
+        log.warning(f"Unable to delete cache keys {keys}: {ee}")
+
+
+def stats(namespace=None):
+    """
+    Hit/miss counts and hit ratio (for this process), by namespace
+    """
+    result = {}
+    for ns, counts in _stats.items():
+        if namespace and ns != namespace:
+            continue
+        lookups = counts["local_hits"] + counts["shared_hits"] + counts["misses"]
+        hits = counts["local_hits"] + counts["shared_hits"]
+        result[ns] = dict(counts, lookups=lookups, hit_ratio=round(hits / lookups, 3) if lookups else None)
+    return result.get(namespace) if namespace else result
+
+
+def reset_stats():
+    _stats.clear()
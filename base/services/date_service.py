@@ -2,18 +2,29 @@ import math
 from datetime import datetime, timezone, timedelta
 from base.fixtures.timezones import timezones
 from base.classes.util.log import Log
+from functools import lru_cache
 from zoneinfo import ZoneInfo
-import pandas
-import arrow
+import re
 
 log = Log()
 
+# Common formats that can be parsed without pandas (4-digit years only, since pandas
+# and strptime disagree on the century of some 2-digit years), by the pattern that selects them
+fast_formats = [
+    (re.compile(r"\d{1,2}/\d{1,2}/\d{4}(?: |$)"), ["%m/%d/%Y", "%m/%d/%Y %H:%M", "%m/%d/%Y %H:%M:%S", "%m/%d/%Y %I:%M %p"]),
+    (re.compile(r"\d{1,2}-[A-Za-z]{3}-\d{4}$"), ["%d-%b-%Y"]),
+]
+
 
 def string_to_date(date_string, source_timezone=None):
     """
     Convert any reasonable date string into a date.
     The resulting dates will be UTC
-    If no source timezone is given, and date string has no offset, assume New York
+    If no source timezone is given, and date string has no offset, assume UTC
+
+    ISO-8601 strings, epoch seconds, and a few common formats are parsed directly. Anything else
+    is parsed by pandas (only imported when needed). Parsed strings are remembered, since the same
+    strings tend to be converted over and over (i.e. while looping through Stripe data).
     """
     if date_string is None:
         return None
@@ -29,35 +40,64 @@ def string_to_date(date_string, source_timezone=None):
     elif date_string.lower() == "tomorrow":
         return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
 
-    dt = None
     try:
-        # Use pandas to convert date string
         if isinstance(date_string, str) and not date_string.isnumeric():
-            try:
-                dt = pandas.to_datetime(date_string).to_pydatetime()
-            except Exception as ee:
-                log.warning(f"Pandas cannot convert string to date ({ee})")
+            # Datetimes are immutable, so the remembered instance can be shared
+            return _parse_string(date_string, source_timezone)
 
         elif isinstance(date_string, datetime):
-            dt = date_string
+            return _to_utc(date_string, source_timezone)
 
         elif str(date_string).isnumeric():
-            dt = datetime.fromtimestamp(int(date_string), timezone.utc)
+            return datetime.fromtimestamp(int(date_string), timezone.utc)
 
         else:
             log.warning(f"String to date received a non-string: {type(date_string)}")
+            return None
+    except Exception as ee:
+        log.error(f"Error converting string to date: {ee}")
+        return None
 
-        if dt and dt.tzinfo is None:
-            tz = ZoneInfo(source_timezone or "UTC")
-            dt = dt.replace(tzinfo=tz)
 
-        return dt.astimezone(timezone.utc) if dt else None
+@lru_cache(maxsize=2048)
+def _parse_string(date_string, source_timezone):
+    dt = None
+    try:
+        dt = datetime.fromisoformat(date_string)
+    except ValueError:
+        for pattern, date_formats in fast_formats:
+            if not pattern.match(date_string):
+                continue
+            for date_format in date_formats:
+                try:
+                    dt = datetime.strptime(date_string, date_format)
+                    break
+                except ValueError:
+                    continue
+            break
+
+    if dt is None:
+        dt = _parse_with_pandas(date_string)
+    return _to_utc(dt, source_timezone) if dt else None
+
+
+def _parse_with_pandas(date_string):
+    import pandas
+    try:
+        return pandas.to_datetime(date_string).to_pydatetime()
     except Exception as ee:
-        log.error(f"Error converting string to date: {ee}")
+        log.warning(f"Pandas cannot convert string to date ({ee})")
         return None
 
 
+def _to_utc(dt, source_timezone):
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=ZoneInfo(source_timezone or "UTC"))
+    return dt.astimezone(timezone.utc)
+
+
 def humanize(datetime_instance):
+    import arrow
     return arrow.get(datetime_instance).humanize()
 
 
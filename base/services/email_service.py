@@ -1,5 +1,6 @@
 from . import auth_service
-from . import message_service, date_service
+from . import message_service
+from . import rate_limit_service as limiter
 from base.models.utility.error import Error
 from django.template.loader import render_to_string
 from django.core.mail import EmailMultiAlternatives
@@ -7,7 +8,6 @@ from django.core.mail import EmailMultiAlternatives
 from ..context_processors import util as util_context, auth as auth_context
 from django.urls import reverse
 from base.classes.util.caller_data import CallerData
-from datetime import datetime, timezone
 from base.classes.util.app_data import Log, EnvHelper, AppData
 
 log = Log()
@@ -66,7 +66,7 @@ def send(
     # RATE LIMITING
     # ----------------------------------------------------------------
     # Rate limited was requested by security team after a pen test in July 2024
-    # Rate is limited per session based on the line of code that calls the send function
+    # Rate is limited per user (or client IP) based on the line of code that calls the send function
     # A given line of code may not call send() more than X|Y|Z number of times per second|minute|hour
     # An excessive overage (10x) will result in a ban on the session from sending anything
     # A single request can still send multiple DIFFERENT emails (not in a loop) without hitting limits.
@@ -76,8 +76,7 @@ def send(
     #   Setting hour and minute limits to 0 would allow unlimited emails, as long as limit_per_second is not exceeded
     # ----------------------------------------------------------------
 
-    # current send attempts are stored in the session
-    session_limits = env.get_session_variable("email_rate_limits") or {}
+    # current send attempts are counted in the shared cache (per second/minute/hour), and bans are stored in the session
     is_banned = env.get_session_variable("email_rate_limit_ban")
 
     # Limits apply only to the file.function and line of code that called send()
@@ -88,91 +87,55 @@ def send(
         log.warning("Session is banned from sending emails")
         return False
 
-    # Grab the time that this email attempt was initiated
-    now = datetime.now(timezone.utc)
-    now_str = now.strftime("%Y-%m-%dT%H:%M:%S.%f")
-
-    # If there are no attempts yet, initialize the list of attempts
-    if caller not in session_limits:
-        session_limits[caller] = [now_str]
-        rate_exceeded = False
+    # If email is not sent, should it still count toward rate limit?
+    # I'm going with yes, because if it's running in a loop, it would otherwise continue to send
+    # occasional emails as the previously-sent ones age out of the second/minute/hour timeframes
+    # Counted per user (or client IP), so limits also hold across sessions and server processes
+    rate_key = f"email:{caller}:{limiter.client_identity()}"
+    sent_s, sent_m, sent_h = limiter.hit(rate_key)
+    if sent_h:
+        log.info(f"Emails sent by caller in past Hour/Minute/Second: {sent_h}/{sent_m}/{sent_s}")
 
-    # If there have been previous send attempts, evaluate timestamps
+    # Has the rate been met/exceeded?
+    if limit_per_second and sent_s >= limit_per_second:
+        rate_exceeded = f"S:{sent_s}/{limit_per_second}"
+
+    elif limit_per_minute and sent_m >= limit_per_minute:
+        rate_exceeded = f"M:{sent_m}/{limit_per_minute}"
+
+        # If the per-minute limit is reached without exceeding the per-second limit, it may be an
+        # impatient user trying to resend an email a bunch of times.
+        # Post an info message asking them to be patient
+        if sent_m == limit_per_minute:
+            message_service.post_info(f"""
+            bi-envelope-exclamation <b>{subject}</b><br>
+            There have been too many attempts to send this email in the past minute.<br>
+            Emails may take a couple of minutes to appear in your inbox.
+            If you have not yet received a copy of this email, please wait a minute and check again.
+            """)
+
+    elif limit_per_hour and sent_h >= limit_per_hour:
+        rate_exceeded = f"H:{sent_h}/{limit_per_hour}"
     else:
-        # Compare timestamps and group by second/minute/hour
-        in_h = []
-        in_m = []
-        in_s = []
-        for date_str in session_limits[caller]:
-            this_date = date_service.string_to_date(date_str)
-            seconds_ago = (now - this_date).seconds
-            if seconds_ago > 60*60:
-                continue
-            elif seconds_ago > 60:
-                in_h.append(date_str)
-            elif seconds_ago > 1:
-                in_m.append(date_str)
-            else:
-                in_s.append(date_str)
-
-        # Add up how many have been sent in the last hour/min/second
-        sent_s = len(in_s)
-        sent_m = sent_s + len(in_m)
-        sent_h = sent_m + len(in_h)
-        log.info(f"Emails sent by caller in past Hour/Minute/Second: {sent_h}/{sent_m}/{sent_s}")
+        # Rate not met/exceeded
+        rate_exceeded = False
 
-        # Has the rate been met/exceeded?
-        if limit_per_second and sent_s >= limit_per_second:
-            rate_exceeded = f"S:{sent_s}/{limit_per_second}"
-
-        elif limit_per_minute and sent_m >= limit_per_minute:
-            rate_exceeded = f"M:{sent_m}/{limit_per_minute}"
-
-            # If the per-minute limit is reached without exceeding the per-second limit, it may be an
-            # impatient user trying to resend an email a bunch of times.
-            # Post an info message asking them to be patient
-            if sent_m == limit_per_minute:
-                message_service.post_info(f"""
-                bi-envelope-exclamation <b>{subject}</b><br>
-                There have been too many attempts to send this email in the past minute.<br>
-                Emails may take a couple of minutes to appear in your inbox.
-                If you have not yet received a copy of this email, please wait a minute and check again.
-                """)
-
-        elif limit_per_hour and sent_h >= limit_per_hour:
-            rate_exceeded = f"H:{sent_h}/{limit_per_hour}"
+    # At some point, just ban the session from sending anything
+    if rate_exceeded:
+        # How about if a limit is exceeded by 10x, they get banned?
+        if limit_per_second and sent_s >= limit_per_second*10:
+            ban = True
+        elif limit_per_minute and sent_m >= limit_per_minute*10:
+            ban = True
+        elif limit_per_hour and sent_h >= limit_per_hour*10:
+            ban = True
         else:
-            # Rate not met/exceeded
-            rate_exceeded = False
-
-        # If email is not sent, should it still count toward rate limit?
-        # I'm going with yes, because if it's running in a loop, it would otherwise continue to send
-        # occasional emails as the previously-sent ones age out of the second/minute/hour timeframes
-        in_s.append(now_str)
-
-        # Reconstruct the session_limits list
-        session_limits[caller] = in_h + in_m + in_s
-
-        # Of course, this could put a huge list of timestamps in the session.
-        # At some point, just ban the session from sending anything
-        if rate_exceeded:
-            # How about if a limit is exceeded by 10x, they get banned?
-            if limit_per_second and sent_s >= limit_per_second*10:
-                ban = True
-            elif limit_per_minute and sent_m >= limit_per_minute*10:
-                ban = True
-            elif limit_per_hour and sent_h >= limit_per_hour*10:
-                ban = True
-            else:
-                ban = False
-            if ban:
-                log.error(f"Session has been banned from sending emails due to excessive send attempts ({sent_h})")
-                env.set_session_variable("email_rate_limit_ban", True)
-                # Ban overrides attempt counts, so may as well free up the memory
-                session_limits[caller] = None
-
-    # Save updated rate limit stats
-    env.set_session_variable("email_rate_limits", session_limits)
+            ban = False
+        if ban:
+            log.error(f"Session has been banned from sending emails due to excessive send attempts ({sent_h})")
+            env.set_session_variable("email_rate_limit_ban", True)
+            # Ban overrides attempt counts, so may as well free up the memory
+            limiter.reset(rate_key)
 
     # if blocked by rate limit
     if rate_exceeded:
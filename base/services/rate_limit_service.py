@@ -0,0 +1,122 @@
+"""
+Rate limiting shared by every process (sliding-window counters in Redis: settings.RATE_LIMIT_CACHE_ALIAS)
+
+    from base.services import rate_limit_service as limiter
+
+    if not limiter.allow(f"enhancement:{limiter.client_identity()}", per_minute=5, per_hour=20):
+        ...
+
+Each window keeps a counter for the current and previous fixed periods (epoch ints). The previous count
+is weighted by how much of it still overlaps the sliding window (rounded up), so each check is a couple
+of cache operations regardless of how many attempts have been made. Denied attempts are also counted.
+The counters must not be read from a per-process copy (i.e. TieredCache's local tier), or attempts made
+in other processes would not be counted. If the cache is unavailable, attempts are allowed.
+"""
+from django.core.cache import caches
+from base.classes.util.log import Log
+from base.classes.util.env_helper import EnvHelper
+import hashlib
+import math
+import time
+
+log = Log()
+env = EnvHelper()
+
+key_prefix = "ratelimit"
+
+
+def allow(key, per_second=None, per_minute=None, per_hour=None):
+    """
+    Count an attempt, and return True if it is within the given limits (None or 0 means no limit)
+    """
+    limits = {1: per_second, 60: per_minute, 60*60: per_hour}
+    windows = tuple(window for window, limit in limits.items() if limit)
+    if not windows:
+        return True
+
+    for window, count in zip(windows, hit(key, windows)):
+        if count >= limits[window]:
+            log.warning(f"Rate limit reached for {key}: {count}/{limits[window]} per {window}s")
+            return False
+    return True
+
+
+def hit(key, windows=(1, 60, 60*60)):
+    """
+    Count an attempt, and return the number of previous attempts in each window (not including this one)
+      windows: Window lengths, in seconds
+    """
+    now = time.time()
+    cache_key = _cache_key(key)
+    counts = []
+    try:
+        previous_keys = [f"{cache_key}:{window}:{int(now // window) - 1}" for window in windows]
+        previous_counts = _cache().get_many(previous_keys)
+        for window, previous_key in zip(windows, previous_keys):
+            current = _increment(f"{cache_key}:{window}:{int(now // window)}", window) - 1
+            previous = previous_counts.get(previous_key) or 0
+            elapsed = (now % window) / window
+            counts.append(math.ceil(current + previous * (1 - elapsed)))
+    except Exception as ee:
+        log.warning(f"Unable to check rate limit for {key}: {ee}")
+        return [0 for ww in windows]
+    return counts
+
+
+def reset(key, windows=(1, 60, 60*60)):
+    """
+    Forget recent attempts (i.e. after a successful login)
+    """
+    now = time.time()
+    cache_key = _cache_key(key)
+    keys = []
+    for window in windows:
+        period = int(now // window)
+        keys.extend([f"{cache_key}:{window}:{period}", f"{cache_key}:{window}:{period - 1}"])
+    try:
+        _cache().delete_many(keys)
+    except Exception as ee:
+        log.warning(f"Unable to reset rate limit for {key}: {ee}")
+
+
+def client_identity(request=None):
+    """
+    Who is making the request: the authenticated user, or the client IP address
+    """
+    request = request or env.request
+    if request is None:
+        return "-"
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user-{user.pk}"
+
+    # The load balancer appends the address it received the request from (earlier entries can be spoofed)
+    forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
+    if forwarded_for:
+        return f"ip-{forwarded_for.split(',')[-1].strip()}"
+    return f"ip-{request.META.get('REMOTE_ADDR')}"
+
+
+def _increment(cache_key, window):
+    """
+    Atomically increment a period's counter (kept long enough to be the previous period)
+    """
+    cache = _cache()
+    try:
+        return cache.incr(cache_key)
+    except ValueError:
+        # First attempt this period (if another process added it first, increment theirs)
+        if cache.add(cache_key, 1, window * 2 + 1):
+            return 1
+        return cache.incr(cache_key)
+
+
+def _cache():
+    return caches[env.get_setting("RATE_LIMIT_CACHE_ALIAS", "default")]
+
+
+def _cache_key(key):
+    key = str(key)
+    if len(key) > 100 or not key.isprintable() or " " in key:
+        key = hashlib.sha1(key.encode()).hexdigest()
+    return f"{key_prefix}:{key}"
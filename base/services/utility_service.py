@@ -3,7 +3,7 @@ from base.models.utility.feature import Feature, FeatureToggle
 from base.models.utility.error import Error
 import re
 import hashlib
-import requests
+from base.classes.util.lazy_import import lazy_import
 import base64
 from io import StringIO
 from html.parser import HTMLParser
@@ -14,6 +14,8 @@ import secrets
 from django.urls import reverse
 from decimal import Decimal
 
+requests = lazy_import("requests")
+
 log = Log()
 env = EnvHelper()
 app = AppData()
@@ -27,6 +27,14 @@ def only_word_chars(string):
     return bool(re.match(r'^\w+$', string))
 
 
+# Script/iframe tags and quoted attributes, in a single pass. Each attribute name is matched once, as a whole
+# word (possessive, so it is never backtracked), then checked for "src" (at the end) or "on" followed by a letter
+_script_scan = re.compile(r"<\s?(?:script|iframe)|(?P<attribute>(?<!\w)\w++)\s?=\s?['\"]", re.I)
+
+# A src attribute containing a script (i.e. javascript:) later on the same line
+_script_word = re.compile(r"script.", re.I)
+
+
 def contains_script(value):
     """Does the given value appear to contain a script tag (generic XSS checking)?"""
 
@@ -37,30 +45,44 @@ def contains_script(value):
     # Get value as a string and strip whitespace for comparisons
     string_value = str(value).strip()
 
-    # Empty strings cannot have scripts
-    if value == '':
+    # Every pattern requires a tag, so most values can be skipped without a regex
+    if '<' not in string_value:
         return False
 
-    # Look for an obvious script tag
-    script_tag = r'<\s?script'
-
-    # Look for a src="javascript:..." tag
-    script_src = r'<.*src\s?=\s?[\'"].*script.+'
-
-    # Look for an on* event
-    script_evt = r'<.*on\w+\s?=\s?[\'"].*'
-
-    # Look for an iframe tag
-    iframe_tag = r'<\s?iframe'
-
-    if re.search(script_tag, string_value, re.I):
-        return True
-    if re.search(script_src, string_value, re.I):
-        return True
-    if re.search(script_evt, string_value, re.I):
-        return True
-    if re.search(iframe_tag, string_value, re.I):
-        return True
+    # Attributes only count if a '<' precedes them on the same line. The line is tracked as the
+    # scan moves forward, so each character is only examined a constant number of times.
+    scanned = 0
+    line_start = 0
+    line_has_tag = False
+    src_checked_line = -1
+    for match in _script_scan.finditer(string_value):
+        start = match.start()
+        if string_value[start] == '<':
+            return True
+
+        newline = string_value.rfind('\n', scanned, start)
+        if newline != -1:
+            line_start = newline + 1
+            line_has_tag = string_value.find('<', line_start, start) != -1
+        elif not line_has_tag:
+            line_has_tag = string_value.find('<', scanned, start) != -1
+        scanned = start
+        if not line_has_tag:
+            continue
+
+        # on* event attribute (as matched by on\w+, which may be within a longer word)
+        attribute = match.group("attribute").lower()
+        if "on" in attribute[:-1]:
+            return True
+        if not attribute.endswith("src"):
+            continue
+
+        # src attribute followed by "script" on the same line (only needs to be searched once per line)
+        if src_checked_line != line_start:
+            src_checked_line = line_start
+            line_end = string_value.find('\n', match.end())
+            if _script_word.search(string_value, match.end(), len(string_value) if line_end == -1 else line_end):
+                return True
 
     return False
 
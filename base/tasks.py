@@ -0,0 +1,34 @@
+from celery import shared_task
+from celery.signals import task_prerun, task_postrun
+from base.classes.util.record_buffer import RecordBuffer
+from base.classes.util.request_memo import RequestMemo
+from base.classes.util.log import Log
+
+log = Log()
+
+
+@task_prerun.connect
+@task_postrun.connect
+def reset_request_memo(**kwargs):
+    """
+    Each task gets its own memo (as each request does), rather than one that lives as long as the worker
+    """
+    RequestMemo.reset()
+
+
+@shared_task(acks_late=True)
+def write_records(rows):
+    """
+    Write Audit/Error records buffered during a request (see RecordBuffer), dated when the request completed
+
+    Records that cannot be bulk inserted are saved individually, and any that still fail are written
+    to the log, so a bad row does not cause the rest to be lost. The task is not retried.
+    """
+    try:
+        records = RecordBuffer.deserialize(rows)
+    except Exception as ee:
+        log.error(f"Could not read buffered records ({ee}): {rows}", trace_error=False)
+        return 0
+
+    RecordBuffer.write(records, keep_created=True)
+    return len(records)
@@ -0,0 +1,23 @@
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from the_hangar_hub.models.airport import Airport
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-airport"}})
+class AirportCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_identifier_loads_current_row(self):
+        airport = Airport.objects.create(display_name="Portland", identifier="KPDX", city="Portland", state="OR")
+        self.assertEqual(Airport.get("kpdx").pk, airport.pk)
+
+        # Changes made without signals (i.e. by another process's update) are still seen
+        Airport.objects.filter(pk=airport.pk).update(display_name="Portland International")
+        with self.assertNumQueries(1):
+            self.assertEqual(Airport.get("KPDX").display_name, "Portland International")
+
+        # A changed identifier does not return the airport by its old one
+        Airport.objects.filter(pk=airport.pk).update(identifier="KXXX")
+        self.assertIsNone(Airport.get("KPDX"))
+        self.assertEqual(Airport.get("KXXX").pk, airport.pk)
@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase, override_settings
+from base.classes.util.app_registry import AppRegistry
+from base.classes.util.app_data import AppData
+from the_hangar_hub import __version__
+
+
+class AppRegistryTestCase(SimpleTestCase):
+
+    def tearDown(self):
+        AppRegistry.build()
+
+    def test_app_version(self):
+        self.assertEqual(AppRegistry.version("THE_HANGAR_HUB"), __version__)
+        self.assertEqual(AppData().get_app_version(), __version__)
+
+    @override_settings(THE_HANGAR_HUB_ADMIN_LINKS=[
+        {'url': "base:status", 'label': "Status"}, {'url': "base:features", 'label': "Features"}
+    ])
+    def test_admin_links(self):
+        AppRegistry.build()
+        links = AppRegistry.admin_links("the_hangar_hub")
+        self.assertEqual([ll["label"] for ll in links], ["Features", "Status"])
+        with self.assertRaises(TypeError):
+            links[0]["label"] = "Changed"
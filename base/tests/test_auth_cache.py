@@ -0,0 +1,68 @@
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from base.classes.auth.user_profile import UserProfile
+from base.classes.util.request_memo import RequestMemo
+from base.models.auth.authority import Authority
+from base.models.auth.permission import Permission
+from base.models.contact.contact import Contact
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+import time
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-auth"}})
+class AuthorityCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        RequestMemo.clear()
+        self.user = User.objects.create(username="pilot", email="pilot@example.com", first_name="Amelia", last_name="Earhart")
+        self.authority = Authority.objects.create(code="hangar_admin", title="Hangar Admin")
+
+    def test_authorities_cached_across_requests(self):
+        Permission.objects.create(user=self.user, authority=self.authority)
+        self.assertTrue(UserProfile(self.user).has_authority("hangar_admin"))
+
+        # A later request re-uses the cached authorities and contact
+        with self.assertNumQueries(0):
+            profile = UserProfile(self.user)
+        self.assertTrue(profile.has_authority("hangar_admin"))
+
+    def test_permission_change_invalidates(self):
+        self.assertFalse(UserProfile(self.user).has_authority("hangar_admin"))
+        pp = Permission.objects.create(user=self.user, authority=self.authority)
+        self.assertTrue(UserProfile(self.user).has_authority("hangar_admin"))
+        pp.delete()
+        self.assertFalse(UserProfile(self.user).has_authority("hangar_admin"))
+
+    def test_future_permission_limits_timeout(self):
+        Permission.objects.create(
+            user=self.user, authority=self.authority, effective_date=datetime.now(timezone.utc) + timedelta(seconds=30)
+        )
+        self.assertFalse(UserProfile(self.user).has_authority("hangar_admin"))
+
+        # Cached until the permission becomes effective, rather than for the full authority_cache_timeout
+        now = time.time()
+        with patch("django.core.cache.backends.locmem.time.time", return_value=now + 20):
+            with self.assertNumQueries(0):
+                UserProfile(self.user)
+        with patch("django.core.cache.backends.locmem.time.time", return_value=now + 31):
+            with CaptureQueriesContext(connection) as queries:
+                UserProfile(self.user)
+            self.assertTrue(queries.captured_queries)
+
+    def test_contact_moved_to_another_user(self):
+        Contact.objects.create(user=self.user, first_name="Amelia", last_name="Earhart", email="pilot@example.com")
+        other = User.objects.create(username="copilot", email="copilot@example.com")
+        self.assertIsNotNone(Contact.get_for_user(self.user))
+        self.assertIsNone(Contact.get_for_user(other))
+
+        contact = Contact.objects.get(user=self.user)
+        contact.user = other
+        contact.save()
+
+        # As loaded by later requests
+        self.assertIsNone(Contact.get_for_user(User.objects.get(pk=self.user.pk)))
+        self.assertEqual(Contact.get_for_user(User.objects.get(pk=other.pk)).pk, contact.pk)
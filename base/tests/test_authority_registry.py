@@ -0,0 +1,28 @@
+from django.test import SimpleTestCase
+from base.classes.auth.authority_registry import AuthorityRegistry
+from base.classes.auth.user_profile import UserProfile
+
+
+class AuthorityRegistryTestCase(SimpleTestCase):
+
+    def profile(self, *authority_codes):
+        profile = UserProfile(None)
+        profile.authorities = {code: code.title() for code in authority_codes}
+        return profile
+
+    def test_parse(self):
+        self.assertEqual(AuthorityRegistry.parse("admin"), AuthorityRegistry.bit("admin"))
+        self.assertEqual(AuthorityRegistry.parse("Admin, infotext"), AuthorityRegistry.parse(["admin", "infotext"]))
+        self.assertEqual(AuthorityRegistry.parse("~power_user"), AuthorityRegistry.mask(["developer", "admin"]))
+        self.assertEqual(AuthorityRegistry.parse(None), 0)
+
+    def test_has_authority(self):
+        admin = self.profile("admin")
+        self.assertTrue(admin.has_authority("admin"))
+        self.assertTrue(admin.has_authority("ADMIN"))
+        self.assertTrue(admin.has_authority("developer,admin"))
+        self.assertTrue(admin.has_authority(["infotext", "admin"]))
+        self.assertTrue(admin.has_authority("~power_user"))
+        self.assertFalse(admin.has_authority("~superuser"))
+        self.assertFalse(admin.has_authority("infotext"))
+        self.assertFalse(self.profile().has_authority("admin"))
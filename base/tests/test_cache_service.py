@@ -0,0 +1,34 @@
+from django.test import TestCase
+from base.services import cache_service
+
+
+class CacheServiceTestCase(TestCase):
+    def setUp(self):
+        cache_service.delete("unit:cached")
+        cache_service.reset_stats()
+
+    def test_read_through(self):
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return {"value": 42}
+
+        self.assertEqual(cache_service.get_or_load("unit:cached", loader, namespace="unit"), {"value": 42})
+        self.assertEqual(cache_service.get_or_load("unit:cached", loader, namespace="unit"), {"value": 42})
+        self.assertEqual(len(loads), 1, "Second lookup should be served from the cache")
+
+        stats = cache_service.stats("unit")
+        self.assertEqual(stats["lookups"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_delete(self):
+        cache_service.set("unit:cached", "value")
+        self.assertEqual(cache_service.get("unit:cached"), "value")
+        cache_service.delete("unit:cached")
+        self.assertIsNone(cache_service.get("unit:cached"))
+
+    def test_none_not_cached(self):
+        self.assertIsNone(cache_service.get_or_load("unit:cached", lambda: None))
+        self.assertIsNone(cache_service.get("unit:cached"))
@@ -0,0 +1,46 @@
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.template import engines
+from django.contrib.auth.models import User
+from django.contrib.sessions.backends.cache import SessionStore
+from crequest.middleware import CrequestMiddleware
+from base.classes.util.request_memo import RequestMemo
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-context"},
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-context-sessions"},
+})
+class LazyContextProcessorTestCase(TestCase):
+    """
+    Context processors should not query the database for values the template does not use
+    """
+
+    def setUp(self):
+        RequestMemo.clear()
+        self.user = User.objects.create(username="pilot", email="pilot@example.com", first_name="Amelia", last_name="Earhart")
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+        self.request.session = SessionStore()
+        self.request.airport = None
+        CrequestMiddleware.set_request(self.request)
+
+    def tearDown(self):
+        CrequestMiddleware.del_request()
+
+    def render(self, template_string):
+        return engines["django"].from_string(template_string).render(request=self.request)
+
+    def test_minimal_template(self):
+        with self.assertNumQueries(0):
+            self.render("{{ support_email }} {{ is_production }}")
+
+    def test_values_computed_on_use(self):
+        with CaptureQueriesContext(connection) as minimal:
+            self.render("{{ support_email }}")
+        with CaptureQueriesContext(connection) as full:
+            content = self.render("{{ current_user.display_name }}|{{ open_applications }}|{{ amenity_reviews }}")
+        self.assertEqual(content, "Amelia Earhart|0|0")
+        self.assertEqual(len(minimal), 0)
+        self.assertGreater(len(full), 0, "Lazy values should be computed when used")
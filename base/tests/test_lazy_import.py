@@ -0,0 +1,13 @@
+from django.test import SimpleTestCase
+from base.classes.util.lazy_import import lazy_import
+import sys
+
+
+class LazyImportTestCase(SimpleTestCase):
+
+    def test_imported_on_first_use(self):
+        sys.modules.pop("colorsys", None)
+        colorsys = lazy_import("colorsys")
+        self.assertNotIn("colorsys", sys.modules)
+        self.assertEqual(colorsys.rgb_to_hsv(1, 0, 0), (0, 1, 1))
+        self.assertIn("colorsys", sys.modules)
@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase, RequestFactory
+from crequest.middleware import CrequestMiddleware
+from base.classes.util.log import Log, JsonFormatter, strip_tags
+import json
+import logging
+
+log = Log()
+
+
+class LogTestCase(SimpleTestCase):
+
+    def tearDown(self):
+        CrequestMiddleware.set_request(None)
+
+    def test_json_lines(self):
+        request = RequestFactory().get("/unit/path")
+        request.request_id = "unit-request"
+        CrequestMiddleware.set_request(request)
+
+        with self.assertLogs("base", level="INFO") as logs:
+            log.info("Loaded %s rows", 3)
+        entry = json.loads(JsonFormatter().format(logs.records[0]))
+        self.assertEqual(entry["message"], "Loaded 3 rows")
+        self.assertEqual(entry["function"], "test_json_lines", "Caller of Log.info (not Log itself)")
+        self.assertEqual(entry["request_id"], "unit-request")
+        self.assertEqual(entry["path"], "/unit/path")
+
+    def test_disabled_level_is_not_formatted(self):
+        class Explodes:
+            def __str__(self):
+                raise AssertionError("Formatted a disabled message")
+
+        level = log.logger.level
+        log.logger.setLevel(logging.INFO)
+        try:
+            log.debug("Value: %s", Explodes())
+        finally:
+            log.logger.setLevel(level)
+
+    def test_strip_tags(self):
+        self.assertEqual(strip_tags("<b>Saved</b> &amp; sent<br>Done"), "Saved & sent\nDone")
@@ -0,0 +1,56 @@
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from django.core.cache import cache, caches
+from base.services import rate_limit_service as limiter
+from unittest.mock import patch
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-default"},
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-rate-limit"},
+    },
+    RATE_LIMIT_CACHE_ALIAS="shared",
+)
+class RateLimitServiceTestCase(SimpleTestCase):
+
+    def tearDown(self):
+        caches["shared"].clear()
+        cache.clear()
+
+    def test_allow(self):
+        # Second-aligned, so the per-second window does not roll over mid-test
+        with patch("base.services.rate_limit_service.time.time", return_value=6000.0):
+            self.assertTrue(limiter.allow("unit", per_second=2, per_minute=3))
+            self.assertTrue(limiter.allow("unit", per_second=2, per_minute=3))
+            self.assertFalse(limiter.allow("unit", per_second=2, per_minute=3))
+            self.assertTrue(limiter.allow("other", per_second=2, per_minute=3))
+
+        # A couple of seconds later, only the per-minute limit still applies
+        with patch("base.services.rate_limit_service.time.time", return_value=6002.5):
+            self.assertFalse(limiter.allow("unit", per_second=2, per_minute=3))
+            self.assertTrue(limiter.allow("unit", per_second=2))
+
+    def test_sliding_window(self):
+        with patch("base.services.rate_limit_service.time.time", return_value=6000.0):
+            for ii in range(10):
+                limiter.hit("unit", windows=(60,))
+
+        # Half of the previous minute still overlaps the window
+        with patch("base.services.rate_limit_service.time.time", return_value=6090.0):
+            self.assertEqual(limiter.hit("unit", windows=(60,)), [5])
+
+        with patch("base.services.rate_limit_service.time.time", return_value=6090.0):
+            limiter.reset("unit", windows=(60,))
+            self.assertEqual(limiter.hit("unit", windows=(60,)), [0])
+
+    def test_counted_in_shared_cache(self):
+        with patch("base.services.rate_limit_service.time.time", return_value=6000.0):
+            limiter.hit("unit", windows=(60,))
+            cache.clear()
+            self.assertEqual(limiter.hit("unit", windows=(60,)), [1])
+            caches["shared"].clear()
+            self.assertEqual(limiter.hit("unit", windows=(60,)), [0])
+
+    def test_client_identity(self):
+        request = RequestFactory().get("/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="1.1.1.1, 2.2.2.2")
+        self.assertEqual(limiter.client_identity(request), "ip-2.2.2.2")
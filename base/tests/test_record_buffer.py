@@ -0,0 +1,51 @@
+from django.test import TestCase, RequestFactory
+from crequest.middleware import CrequestMiddleware
+from base.classes.util.record_buffer import RecordBuffer
+from base.models.utility.audit import Audit
+from base.tasks import write_records
+from django.utils import timezone
+from datetime import timedelta
+from unittest.mock import patch
+import json
+
+
+def audit(event_code):
+    return Audit(app_code="UNIT", crud_code="C", event_code=event_code)
+
+
+class RecordBufferTestCase(TestCase):
+
+    def tearDown(self):
+        CrequestMiddleware.set_request(None)
+
+    def test_saved_immediately_without_request(self):
+        RecordBuffer.add(audit("unit-immediate"))
+        self.assertEqual(Audit.objects.filter(event_code="unit-immediate").count(), 1)
+
+    def test_written_together_at_end_of_request(self):
+        request = RequestFactory().get("/")
+        CrequestMiddleware.set_request(request)
+        RecordBuffer.open(request)
+        for ii in range(5):
+            RecordBuffer.add(audit("unit-buffered"))
+        self.assertEqual(Audit.objects.filter(event_code="unit-buffered").count(), 0)
+
+        with self.assertNumQueries(1):
+            RecordBuffer.flush(request)
+        self.assertEqual(Audit.objects.filter(event_code="unit-buffered").count(), 5)
+
+        # Buffer is closed after flushing
+        RecordBuffer.add(audit("unit-after"))
+        self.assertEqual(Audit.objects.filter(event_code="unit-after").count(), 1)
+
+    def test_celery_task(self):
+        rows = RecordBuffer.serialize([audit("unit-task"), audit("unit-task")])
+        requested = timezone.now()
+
+        # Written by the worker later on: still dated when the request completed
+        with patch("django.utils.timezone.now", return_value=requested + timedelta(minutes=10)):
+            self.assertEqual(write_records.run(json.loads(json.dumps(rows))), 2)
+        dates = Audit.objects.filter(event_code="unit-task").values_list("date_created", flat=True)
+        self.assertEqual(len(dates), 2)
+        for date_created in dates:
+            self.assertLess(abs(date_created - requested), timedelta(seconds=5))
@@ -0,0 +1,72 @@
+from django.test import TestCase
+from base.classes.util.env_helper import EnvHelper
+from base.classes.util.request_memo import RequestMemo, per_request
+from base.tasks import reset_request_memo
+from django.contrib.auth.models import User
+import time
+
+
+session = EnvHelper()
+
+
+class RequestMemoTestCase(TestCase):
+    def setUp(self):
+        RequestMemo.clear()
+
+    def test_explicit_keys(self):
+        self.assertIsNone(RequestMemo.get("unit.test"))
+        RequestMemo.set("unit.test", [1, 2, 3])
+        self.assertEqual(RequestMemo.get("unit.test"), [1, 2, 3])
+        self.assertTrue(RequestMemo.has("unit.test"))
+        RequestMemo.delete("unit.test")
+        self.assertFalse(RequestMemo.has("unit.test"))
+        self.assertEqual(RequestMemo.get("unit.test", "alt"), "alt")
+
+    def test_ttl(self):
+        RequestMemo.set("unit.ttl", "short-lived", ttl=0.01)
+        self.assertEqual(RequestMemo.get("unit.ttl"), "short-lived")
+        time.sleep(0.02)
+        self.assertIsNone(RequestMemo.get("unit.ttl"))
+
+    def test_counters(self):
+        RequestMemo.set("unit.count", 1)
+        RequestMemo.get("unit.count")
+        RequestMemo.get("unit.count")
+        RequestMemo.get("unit.missing")
+        stats = RequestMemo.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["stores"], 1)
+
+    def test_store_recall_not_in_session(self):
+        session.test_store_recall("not-in-session")
+        self.assertEqual(session.test_store_recall(), "not-in-session")
+        self.assertFalse([kk for kk in session.session.keys() if "cache-" in kk])
+
+    def test_per_request(self):
+        calls = []
+
+        @per_request(key="unit.users")
+        def users_named(username=None):
+            calls.append(username)
+            return User.objects.filter(username=username)
+
+        User.objects.create(username="memo_tester")
+        first = users_named("memo_tester")
+        self.assertIs(type(first), list, "QuerySet should be materialized")
+        self.assertEqual(len(first), 1)
+
+        # Same arguments (positional or keyword) are served from the memo without querying
+        with self.assertNumQueries(0):
+            self.assertIs(users_named(username="memo_tester"), first)
+
+        # Default-applied arguments share one key
+        users_named()
+        users_named(None)
+        self.assertEqual(calls, ["memo_tester", None])
+        self.assertEqual(RequestMemo.stats()["queries_saved"], 2)
+
+    def test_reset_between_tasks(self):
+        RequestMemo.set("unit.task", "value")
+        reset_request_memo()
+        self.assertFalse(RequestMemo.has("unit.task"))
@@ -0,0 +1,26 @@
+from django.test import SimpleTestCase
+from base.classes.util.env_helper import EnvHelper
+from base.classes.util.session_collections import SessionLRUSet
+
+env = EnvHelper()
+
+
+class SessionCollectionsTestCase(SimpleTestCase):
+
+    def tearDown(self):
+        env.set_session_variable("unit_lru_set", None)
+
+    def test_lru_set_is_bounded(self):
+        allowed = SessionLRUSet("unit_lru_set", max_size=3)
+        for ii in range(10):
+            allowed.add(ii)
+        self.assertEqual(len(allowed), 3)
+        self.assertNotIn(6, allowed)
+        self.assertIn(9, allowed)
+        self.assertIn("9", allowed)
+
+    def test_lru_set_reads_old_list(self):
+        env.set_session_variable("unit_lru_set", [1, 2, 3])
+        allowed = SessionLRUSet("unit_lru_set", max_size=2)
+        self.assertIn(3, allowed)
+        self.assertNotIn(1, allowed)
@@ -1,4 +1,6 @@
-from django.test import TestCase
+from django.test import TestCase, RequestFactory
+from django.contrib.sessions.backends.cache import SessionStore
+from crequest.middleware import CrequestMiddleware
 from base.classes.util.env_helper import EnvHelper
 
 
@@ -41,6 +43,29 @@ class SessionHelperTestCase(TestCase):
             "Regular session mistakenly cleared",
         )
 
+    def test_flash_scope(self):
+        request = RequestFactory().get("/")
+        request.session = SessionStore()
+        CrequestMiddleware.set_request(request)
+        try:
+            session.set_flash_scope("prefill", {"code": "unit"})
+            self.assertEqual(session.get_flash_scope("prefill"), {"code": "unit"})
+
+            # Next request: value is still available
+            session.cycle_flash_scope()
+            self.assertEqual(session.get_flash_scope("prefill"), {"code": "unit"})
+
+            # Request after that: value is gone
+            session.cycle_flash_scope()
+            self.assertIsNone(session.get_flash_scope("prefill"))
+
+            # Requests without flash variables do not modify the session
+            request.session.modified = False
+            session.cycle_flash_scope()
+            self.assertFalse(request.session.modified, "Session modified without flash data")
+        finally:
+            CrequestMiddleware.del_request()
+
     def test_cache_keys(self):
         key = session.test_cache_key()
         self.assertTrue(type(key) is str)
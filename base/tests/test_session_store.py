@@ -0,0 +1,149 @@
+from django.test import TestCase, RequestFactory, override_settings
+from crequest.middleware import CrequestMiddleware
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.models import Session
+from base.backends import session_store
+from base.backends.session_store import SessionStore
+from base.backends.session_serializer import CompactSerializer
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-default"},
+        "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-session-store"},
+    },
+    SESSION_SERIALIZER="base.backends.session_serializer.CompactSerializer",
+    SESSION_WRITE_BEHIND_SECONDS=60,
+)
+class SessionStoreTestCase(TestCase):
+
+    def setUp(self):
+        session_store.reset_stats()
+        session_store._pending.clear()
+
+    def tearDown(self):
+        session_store._pending.clear()
+
+    def test_serializer_is_compact_json(self):
+        data = {"bcsv~sort": {"col": "name", "dir": "asc"}, "ids": [1, 2, 3]}
+        serialized = CompactSerializer().dumps(data)
+        self.assertNotIn(b" ", serialized)
+        self.assertEqual(CompactSerializer().loads(serialized), data)
+
+    def test_changes_are_written_behind(self):
+        session = SessionStore()
+        session["bcsv~airport"] = "KPDX"
+        session.create()
+        key = session.session_key
+        self.assertTrue(Session.objects.filter(session_key=key).exists())
+
+        # A changed variable is cached now, and written to the database later
+        session = SessionStore(key)
+        session["bcsv~airport"] = "KSEA"
+        self.assertEqual(session.dirty_keys(), ["bcsv~airport"])
+        session.save()
+        self.assertIn(key, session_store._pending)
+        self.assertEqual(SessionStore(key)["bcsv~airport"], "KSEA")
+
+        db_session = Session.objects.get(session_key=key)
+        self.assertEqual(SessionStore().decode(db_session.session_data)["bcsv~airport"], "KPDX")
+
+        self.assertEqual(SessionStore.write_pending(), 1)
+        db_session = Session.objects.get(session_key=key)
+        self.assertEqual(SessionStore().decode(db_session.session_data)["bcsv~airport"], "KSEA")
+
+    def test_unchanged_session_is_not_rewritten(self):
+        session = SessionStore()
+        session["bcsv~airport"] = "KPDX"
+        session.create()
+
+        session = SessionStore(session.session_key)
+        session["bcsv~airport"] = "KPDX"
+        session.save()
+        self.assertEqual(session_store.stats()["-"]["unchanged"], 1)
+        self.assertEqual(session_store.stats()["-"]["cache_writes"], 1)
+
+    def test_auth_changes_are_written_now(self):
+        session = SessionStore()
+        session.create()
+        session = SessionStore(session.session_key)
+        session["_auth_user_id"] = "1"
+        session.save()
+        self.assertNotIn(session.session_key, session_store._pending)
+        db_session = Session.objects.get(session_key=session.session_key)
+        self.assertEqual(SessionStore().decode(db_session.session_data)["_auth_user_id"], "1")
+
+    def test_deleted_session_is_not_written(self):
+        session = SessionStore()
+        session.create()
+        key = session.session_key
+        session["bcsv~airport"] = "KPDX"
+        session.save()
+        session.flush()
+        self.assertEqual(SessionStore.write_pending(), 0)
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+        self.assertFalse(SessionStore().exists(key))
+
+    def test_session_deleted_elsewhere_is_not_recreated(self):
+        session = SessionStore()
+        session.create()
+        key = session.session_key
+        session["bcsv~airport"] = "KPDX"
+        session.save()
+
+        # Logged out by another process: its row and cache entry are gone, but this process has a deferred write
+        Session.objects.filter(session_key=key).delete()
+        session._cache.delete(session.cache_key)
+        self.assertEqual(SessionStore.write_pending(), 1)
+        self.assertFalse(Session.objects.filter(session_key=key).exists())
+
+        # Later changes are rejected, and a deferred write queued before the logout is not used to restore it
+        session["bcsv~airport"] = "KSEA"
+        with self.assertRaises(UpdateError):
+            session.save()
+        session_store._pending[key] = (CompactSerializer().dumps({"bcsv~airport": "KSEA"}), session.get_expiry_date())
+        self.assertEqual(dict(SessionStore(key).items()), {})
+        self.assertNotIn(key, session_store._pending)
+
+    def test_unchanged_session_only_updates_expiry(self):
+        session = SessionStore()
+        session["bcsv~airport"] = "KPDX"
+        session.create()
+        Session.objects.filter(session_key=session.session_key).update(session_data="unchanged")
+
+        session = SessionStore(session.session_key)
+        session["bcsv~airport"] = "KPDX"
+        session.save()
+        serialized, expire_date = session_store._pending[session.session_key]
+        self.assertIsNone(serialized)
+        SessionStore.write_pending()
+        db_session = Session.objects.get(session_key=session.session_key)
+        self.assertEqual(db_session.session_data, "unchanged")
+        self.assertEqual(db_session.expire_date, expire_date)
+
+    def test_change_after_logout_elsewhere_is_rejected(self):
+        session = SessionStore()
+        session["_auth_user_id"] = "1"
+        session.create()
+        key = session.session_key
+
+        # A request that loaded the session before it was deleted (logout in another process)
+        request_session = SessionStore(key)
+        self.assertEqual(request_session["_auth_user_id"], "1")
+        SessionStore(key).delete()
+
+        request_session["bcsv~airport"] = "KPDX"
+        with self.assertRaises(UpdateError):
+            request_session.save()
+        self.assertFalse(SessionStore().exists(key))
+        self.assertNotIn(key, session_store._pending)
+
+    def test_unresolved_paths_share_metrics(self):
+        for path in ["/wp-login.php", "/.env", "/admin/config.php"]:
+            CrequestMiddleware.set_request(RequestFactory().get(path))
+            try:
+                session_store._route_metrics()["saves"] += 1
+            finally:
+                CrequestMiddleware.del_request()
+        self.assertEqual(session_store.stats()["<unresolved>"]["saves"], 3)
+        self.assertEqual(len(session_store.stats()), 1)
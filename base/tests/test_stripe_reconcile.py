@@ -0,0 +1,90 @@
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+from base_stripe.models.events import StripeWebhookEvent
+from base_stripe.models.product_models import StripeProduct
+from base_stripe.services import reconcile_service
+import json
+import zlib
+
+
+def product_event(stripe_id, version, name):
+    data = {"id": stripe_id, "object": "product", "name": name, "active": True}
+    return StripeWebhookEvent.objects.create(
+        event_type="product.updated", event_id=f"evt_{stripe_id}", object_type="product", object_id=stripe_id,
+        object_version=version, payload=zlib.compress(json.dumps(data).encode()),
+    )
+
+
+def fake_sync(model, api_data=None, as_of=None, save=True):
+    model.name = api_data["name"]
+    model.active = api_data["active"]
+    model.synced_as_of = as_of
+    return True
+
+
+@override_settings(STRIPE_RECONCILE_AFTER_SECONDS=0)
+class StripeReconcileTestCase(TestCase):
+
+    def test_reconcile(self):
+        StripeProduct.objects.create(stripe_id="prod_old", name="Old", active=True, synced_as_of=100)
+        StripeProduct.objects.create(stripe_id="prod_current", name="Current", active=True, synced_as_of=500)
+        product_event("prod_old", 150, "Older")
+        product_event("prod_old", 200, "Updated")
+        product_event("prod_new", 200, "New")
+        product_event("prod_current", 200, "Stale")
+        StripeWebhookEvent.objects.create(event_type="charge.updated", object_type="charge", object_id="ch_1")
+
+        with patch.object(StripeProduct, "sync", autospec=True, side_effect=fake_sync) as sync:
+            metrics = reconcile_service.reconcile()
+        self.assertEqual(sync.call_count, 2)
+
+        self.assertEqual(metrics["events"], 4)
+        self.assertEqual(metrics["ignored"], 1)
+        self.assertEqual(metrics["objects"], 3)
+        self.assertEqual(metrics["from_webhook"], 2)
+        self.assertEqual(metrics["current"], 1)
+        self.assertEqual((metrics["updated"], metrics["created"]), (1, 1))
+        self.assertEqual(metrics["list_requests"], 0)
+
+        names = dict(StripeProduct.objects.values_list("stripe_id", "name"))
+        self.assertEqual(names, {"prod_old": "Updated", "prod_new": "New", "prod_current": "Current"})
+        self.assertFalse(StripeWebhookEvent.objects.filter(refreshed=False).exists())
+        self.assertFalse(StripeWebhookEvent.objects.filter(claimed_by__isnull=False).exists())
+
+    def test_changes_made_meanwhile_are_kept(self):
+        StripeProduct.objects.create(stripe_id="prod_webhook", name="Old", active=True, synced_as_of=100)
+        StripeProduct.objects.create(stripe_id="prod_edited", name="Old", active=True, synced_as_of=100)
+        product_event("prod_webhook", 200, "From reconcile")
+        product_event("prod_edited", 200, "From reconcile")
+
+        def sync_while_webhook_runs(model, api_data=None, as_of=None, save=True):
+            # A webhook task saves newer data for one product, and another field of the other
+            if model.stripe_id == "prod_webhook":
+                StripeProduct.objects.filter(stripe_id="prod_webhook").update(name="From webhook", synced_as_of=300)
+            else:
+                StripeProduct.objects.filter(stripe_id="prod_edited").update(description="Edited")
+            return fake_sync(model, api_data, as_of, save)
+
+        with patch.object(StripeProduct, "sync", autospec=True, side_effect=sync_while_webhook_runs):
+            metrics = reconcile_service.reconcile()
+        self.assertEqual((metrics["current"], metrics["updated"]), (1, 1))
+
+        webhook = StripeProduct.objects.get(stripe_id="prod_webhook")
+        self.assertEqual((webhook.name, webhook.synced_as_of), ("From webhook", 300))
+        edited = StripeProduct.objects.get(stripe_id="prod_edited")
+        self.assertEqual((edited.name, edited.description), ("From reconcile", "Edited"))
+        self.assertFalse(StripeWebhookEvent.objects.filter(refreshed=False).exists())
+
+    def test_same_version_retrieved(self):
+        # Two events in the same second (object has no "updated" time): either could have the latest data
+        StripeProduct.objects.create(stripe_id="prod_tied", name="Old", active=True, synced_as_of=100)
+        product_event("prod_tied", 200, "First")
+        product_event("prod_tied", 200, "Second")
+
+        def retrieve(model, api_data=None, as_of=None, save=True):
+            return fake_sync(model, api_data or {"name": "From API", "active": True}, as_of or 300, save)
+
+        with patch.object(StripeProduct, "sync", autospec=True, side_effect=retrieve):
+            metrics = reconcile_service.reconcile()
+        self.assertEqual((metrics["from_webhook"], metrics["retrieved"]), (0, 1))
+        self.assertEqual(StripeProduct.objects.get(stripe_id="prod_tied").name, "From API")
@@ -0,0 +1,121 @@
+from celery.exceptions import Retry, MaxRetriesExceededError
+from django.db import connection, OperationalError
+from django.test import TransactionTestCase, override_settings
+from unittest.mock import patch
+from base_stripe.models.events import StripeWebhookEvent
+from base_stripe.services import webhook_service
+from the_hangar_hub.tasks import process_stripe_event, requeue_stripe_events
+from django.utils import timezone
+from datetime import timedelta
+import threading
+import time
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-claim"}},
+)
+class StripeWebhookClaimTestCase(TransactionTestCase):
+
+    def test_claimed_once(self):
+        event = StripeWebhookEvent.objects.create(
+            event_type="charge.updated", event_id="evt_claim", object_type="charge", object_id="ch_claim",
+            object_version=100,
+        )
+        self.assertEqual(len(webhook_service.claim_events(event)), 1)
+        self.assertEqual(webhook_service.claim_events(event), [])
+
+        # Released (unprocessed) events can be claimed again
+        event.refresh_from_db()
+        webhook_service.release_events([event])
+        self.assertEqual(len(webhook_service.claim_events(event)), 1)
+
+    def test_concurrent_workers(self):
+        event = StripeWebhookEvent.objects.create(
+            event_type="charge.updated", event_id="evt_workers", object_type="charge", object_id="ch_workers",
+            object_version=100,
+        )
+        workers = 5
+        start = threading.Barrier(workers)
+        refreshes = []
+        results = []
+
+        def slow_refresh(webhook_event_instance):
+            refreshes.append(webhook_event_instance.id)
+            time.sleep(0.05)
+            return True
+
+        def worker():
+            # The shared in-memory SQLite test database raises "table is locked" rather than waiting for
+            # other connections, so retry (as Celery would). Workers that find the event claimed retry later.
+            try:
+                start.wait()
+                for attempt in range(50):
+                    try:
+                        results.append(process_stripe_event(event.id))
+                        return
+                    except OperationalError:
+                        time.sleep(0.01)
+                    except Retry:
+                        time.sleep(0.5)
+            finally:
+                connection.close()
+
+        with patch.object(webhook_service, "stripe_model_refresh", slow_refresh):
+            threads = [threading.Thread(target=worker) for ii in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(results), workers)
+        self.assertEqual(refreshes, [event.id])
+        event.refresh_from_db()
+        self.assertTrue(event.processed)
+        self.assertIsNone(event.claimed_by)
+
+    def test_expired_claims_requeued(self):
+        long_ago = timezone.now() - timedelta(hours=1)
+        for ii, claimed_at in enumerate([long_ago, long_ago, timezone.now()]):
+            StripeWebhookEvent.objects.create(
+                event_type="invoice.updated", event_id=f"evt_lost_{ii}", object_type="invoice",
+                object_id="in_lost" if ii < 2 else "in_working", object_version=100 + ii,
+                claimed_by="lost-worker", claimed_at=claimed_at,
+            )
+
+        # One task for the object whose claim expired (not for the one still being processed)
+        with patch.object(process_stripe_event, "apply_async") as apply_async:
+            self.assertEqual(requeue_stripe_events(), 1)
+        self.assertEqual(apply_async.call_count, 1)
+        queued = StripeWebhookEvent.objects.get(id=apply_async.call_args.kwargs["args"][0])
+        self.assertEqual(queued.object_id, "in_lost")
+
+    def test_retried_while_reconciling(self):
+        event = StripeWebhookEvent.objects.create(
+            event_type="charge.updated", event_id="evt_reconciling", object_type="charge", object_id="ch_reconciling",
+            object_version=100,
+        )
+        claimed = webhook_service.claim(StripeWebhookEvent.objects.filter(id=event.id))
+
+        # The reconcile task does not run the event handlers, so the task tries again later
+        with self.assertRaises(Retry):
+            process_stripe_event(event.id)
+
+        webhook_service.release_events(claimed, refreshed=True)
+        with patch.object(webhook_service, "stripe_model_refresh", return_value=True):
+            process_stripe_event(event.id)
+        event.refresh_from_db()
+        self.assertTrue(event.processed)
+
+    @override_settings(STRIPE_EVENT_CLAIM_SECONDS=120)
+    def test_claim_waits_not_counted_as_errors(self):
+        event = StripeWebhookEvent.objects.create(
+            event_type="charge.updated", event_id="evt_waiting", object_type="charge", object_id="ch_waiting",
+            object_version=100,
+        )
+        webhook_service.claim(StripeWebhookEvent.objects.filter(id=event.id))
+
+        # After all its error retries, the task still waits (up to when the claim expires) for another worker
+        with patch.object(webhook_service, "claim_events", wraps=webhook_service.claim_events) as claim_events:
+            result = process_stripe_event.apply(args=[event.id], retries=3)
+        self.assertEqual(claim_events.call_count, 4)
+        self.assertIsInstance(result.result, MaxRetriesExceededError)
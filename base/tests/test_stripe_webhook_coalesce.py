@@ -0,0 +1,53 @@
+from django.test import TestCase, override_settings
+from base_stripe.models.events import StripeWebhookEvent
+from base_stripe.services import webhook_service
+from the_hangar_hub.tasks import process_stripe_event
+
+
+def charge_event(event_id, version, object_id="ch_unit"):
+    return StripeWebhookEvent.objects.create(
+        event_type="charge.updated", event_id=event_id, object_type="charge", object_id=object_id,
+        object_version=version,
+    )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-coalesce"}},
+    STRIPE_WEBHOOK_DEBOUNCE_SECONDS=5,
+)
+class StripeWebhookCoalesceTestCase(TestCase):
+
+    def test_one_task_per_object(self):
+        first = charge_event("evt_1", 100)
+        self.assertEqual(webhook_service.debounce(first), 5)
+        self.assertIsNone(webhook_service.debounce(charge_event("evt_2", 101)))
+
+        # Other objects get their own task
+        self.assertEqual(webhook_service.debounce(charge_event("evt_3", 100, "ch_other")), 5)
+
+        # Once the task starts, new events queue another task
+        self.assertEqual(len(webhook_service.claim_events(first)), 2)
+        self.assertEqual(webhook_service.debounce(charge_event("evt_4", 102)), 5)
+
+    def test_not_debounced_without_redis(self):
+        tiered = {"BACKEND": "base.backends.tiered_cache.TieredCache", "LOCATION": "redis://127.0.0.1:1/3", "OPTIONS": {
+            "RETRY_SECONDS": 60, "SHARED_OPTIONS": {"SOCKET_CONNECT_TIMEOUT": 0.1},
+        }}
+        with self.settings(CACHES={"default": tiered}), self.assertLogs("base", level="WARNING"):
+            # The worker could not clear a key saved in this process only
+            self.assertEqual(webhook_service.debounce(charge_event("evt_1", 100)), 0)
+            self.assertEqual(webhook_service.debounce(charge_event("evt_2", 101)), 0)
+
+    def test_processed_together(self):
+        latest = charge_event("evt_2", 200)
+        first = charge_event("evt_1", 100)
+        other = charge_event("evt_3", 100, "ch_other")
+
+        result = process_stripe_event(first.id)
+        self.assertIn("1 syncs saved", result)
+        self.assertEqual(StripeWebhookEvent.objects.filter(processed=True).count(), 2)
+
+        latest.refresh_from_db()
+        other.refresh_from_db()
+        self.assertTrue(latest.processed)
+        self.assertFalse(other.processed)
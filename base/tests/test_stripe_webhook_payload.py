@@ -0,0 +1,105 @@
+from django.test import TestCase, RequestFactory, override_settings
+from unittest.mock import patch
+from base_stripe.models.events import StripeWebhookEvent
+from base_stripe.models.product_models import StripeProduct
+from base_stripe.services import webhook_service
+from stripe._stripe_response import StripeResponse
+import stripe
+import hashlib
+import hmac
+import json
+import time
+
+secret = "whsec_unit_test"
+
+
+def signed_request(event_data):
+    payload = json.dumps(event_data)
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return RequestFactory().post(
+        "/stripe/webhook", data=payload, content_type="application/json",
+        HTTP_STRIPE_SIGNATURE=f"t={timestamp},v1={signature}",
+    )
+
+
+def product_event(event_type="product.updated", updated=1761751341):
+    return {
+        "id": "evt_unit_1", "object": "event", "created": 1761751345, "type": event_type,
+        "data": {"object": {
+            "id": "prod_unit", "object": "product", "name": "Hangar Rent", "active": True, "updated": updated,
+        }},
+    }
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET=secret)
+class StripeWebhookPayloadTestCase(TestCase):
+
+    def test_object_saved_with_event(self):
+        whe = StripeWebhookEvent.receive(signed_request(product_event()))
+        self.assertEqual(whe.object_version, 1761751341)
+        self.assertEqual(whe.object_data["name"], "Hangar Rent")
+
+        whe = StripeWebhookEvent.receive(signed_request(product_event("product.deleted", updated=None)))
+        self.assertEqual(whe.object_version, 1761751345)
+        self.assertTrue(whe.object_data["deleted"])
+
+    def test_sync_from_event(self):
+        whe = StripeWebhookEvent.receive(signed_request(product_event()))
+        product = StripeProduct(stripe_id="prod_unit")
+
+        with patch.object(StripeProduct, "sync", return_value=True) as sync:
+            # Event data is newer than the model's: applied without calling the API
+            product.synced_as_of = whe.object_version - 10
+            self.assertTrue(webhook_service.sync_from_event(product, whe))
+            self.assertEqual(sync.call_args.args[0]["name"], "Hangar Rent")
+            self.assertEqual(sync.call_args.kwargs, {"as_of": whe.object_version})
+
+            # Same second: the API is used
+            product.synced_as_of = whe.object_version
+            webhook_service.sync_from_event(product, whe)
+            self.assertEqual(sync.call_args.args, ())
+
+            # Model already has newer data: nothing to do
+            sync.reset_mock()
+            product.synced_as_of = whe.object_version + 10
+            self.assertTrue(webhook_service.sync_from_event(product, whe))
+            sync.assert_not_called()
+
+    def test_same_version_uses_api(self):
+        # Events created in the same second, for an object without an "updated" time
+        StripeWebhookEvent.receive(signed_request(product_event(updated=None)))
+        StripeWebhookEvent.receive(signed_request(product_event(updated=None)))
+        event = webhook_service.latest_event(webhook_service.claim(StripeWebhookEvent.objects.all()))
+        product = StripeProduct(stripe_id="prod_unit", synced_as_of=100)
+
+        with patch.object(StripeProduct, "sync", return_value=True) as sync:
+            self.assertTrue(webhook_service.sync_from_event(product, event))
+            self.assertEqual(sync.call_args.args, ())
+
+    def test_event_applied_by_sync(self):
+        whe = StripeWebhookEvent.receive(signed_request(product_event()))
+        product = StripeProduct.objects.create(
+            stripe_id="prod_unit", name="Hangar", active=False, synced_as_of=whe.object_version - 10
+        )
+        self.assertTrue(webhook_service.sync_from_event(product, whe))
+        product.refresh_from_db()
+        self.assertEqual((product.name, product.active), ("Hangar Rent", True))
+        self.assertEqual(product.synced_as_of, whe.object_version)
+
+    def test_api_data_uses_stripe_time(self):
+        # Retrieved 9 seconds after the event's update, by Stripe's clock (this server's clock is an hour ahead)
+        response = StripeResponse("{}", 200, {"Date": "Wed, 29 Oct 2025 15:22:30 GMT"})
+        api_data = stripe.StripeObject.construct_from(
+            {"id": "prod_unit", "object": "product", "name": "Hangar", "active": True}, None, last_response=response
+        )
+        product = StripeProduct.objects.create(stripe_id="prod_unit", name="Hangar", active=True)
+        with patch.object(StripeProduct, "api_data", return_value=api_data):
+            with patch("base_stripe.services.config_service.time.time", return_value=time.time() + 3600):
+                self.assertTrue(product.sync())
+        self.assertEqual(product.synced_as_of, 1761751350)
+
+        # So a later event is still applied
+        whe = StripeWebhookEvent.receive(signed_request(product_event(updated=1761751360)))
+        self.assertTrue(webhook_service.sync_from_event(product, whe))
+        self.assertEqual(StripeProduct.objects.get(pk=product.pk).name, "Hangar Rent")
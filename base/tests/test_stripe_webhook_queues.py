@@ -0,0 +1,25 @@
+from django.test import TestCase
+from base_stripe.models.events import StripeWebhookEvent
+from base_stripe.services import webhook_service
+
+
+def charge_event(event_id, version, object_id="ch_unit"):
+    return StripeWebhookEvent.objects.create(
+        event_type="charge.updated", event_id=event_id, object_type="charge", object_id=object_id,
+        object_version=version,
+    )
+
+
+class StripeWebhookQueuesTestCase(TestCase):
+
+    def test_event_queue(self):
+        with self.settings(STRIPE_EVENT_QUEUES=4):
+            queues = {webhook_service.event_queue(charge_event(f"evt_{nn}", nn, f"ch_{nn}")) for nn in range(50)}
+            self.assertEqual(queues, {f"stripe_events_{nn}" for nn in range(4)})
+
+            # Always the same queue for the same object
+            first = charge_event("evt_a", 1)
+            self.assertEqual(webhook_service.event_queue(first), webhook_service.event_queue(charge_event("evt_b", 2)))
+
+        with self.settings(STRIPE_EVENT_QUEUES=0):
+            self.assertEqual(webhook_service.event_queue(first), "celery")
@@ -0,0 +1,73 @@
+from django.test import SimpleTestCase
+from base.backends.tiered_cache import TieredCache
+import fakeredis
+
+
+def tiered_cache(location, **options):
+    """A TieredCache backed by fakeredis (a single server shared by every cache created with it)"""
+    server = fakeredis.FakeServer()
+    shared_options = {
+        "CLIENT_CLASS": "django_redis.client.DefaultClient",
+        "CONNECTION_POOL_KWARGS": {"connection_class": fakeredis.FakeConnection, "server": server},
+    }
+    options = dict({"LOCAL_TIMEOUT": 60, "SHARED_OPTIONS": shared_options}, **options)
+    return TieredCache(location, {"VERSION": 1, "OPTIONS": options})
+
+
+class TieredCacheTestCase(SimpleTestCase):
+
+    def test_read_from_local_then_shared(self):
+        cache = tiered_cache("redis://tiered-unit-1/0")
+        cache.set("key", {"value": 1})
+        self.assertEqual(cache.get("key"), {"value": 1})
+        self.assertEqual(cache.stats["local_hits"], 1)
+
+        # Another process (empty LRU) reads the value from redis
+        cache._local_clear()
+        self.assertEqual(cache.get("key"), {"value": 1})
+        self.assertEqual(cache.stats["shared_hits"], 1)
+
+        cache.delete("key")
+        self.assertIsNone(cache.get("key"))
+
+    def test_local_copy_is_not_shared(self):
+        cache = tiered_cache("redis://tiered-unit-2/0")
+        cache.set("key", ["a"])
+        cache.get("key").append("b")
+        self.assertEqual(cache.get("key"), ["a"])
+
+    def test_versioned_keys(self):
+        cache = tiered_cache("redis://tiered-unit-3/0")
+        cache.set("key", "v1")
+        self.assertIsNone(cache.get("key", version=2))
+        self.assertEqual(cache.get("key", version=1), "v1")
+
+    def test_lru_eviction(self):
+        cache = tiered_cache("redis://tiered-unit-4/0", LOCAL_MAX_ENTRIES=2)
+        for kk in ["a", "b", "c"]:
+            cache.set(kk, kk)
+        self.assertEqual(len(cache._local), 2)
+        self.assertEqual(cache.get("a"), "a", "Evicted locally, but still in redis")
+
+    def test_incr_is_shared(self):
+        cache = tiered_cache("redis://tiered-unit-5/0")
+        cache.set("counter", 1)
+        self.assertEqual(cache.incr("counter"), 2)
+        self.assertEqual(cache.incr("counter", 5), 7)
+        self.assertEqual(cache.get("counter"), 7)
+
+        # A missing counter is not a shared-cache failure
+        with self.assertRaises(ValueError):
+            cache.incr("missing")
+        self.assertTrue(cache.shared_available)
+
+    def test_fallback_when_redis_unavailable(self):
+        cache = TieredCache("redis://127.0.0.1:1/0", {"OPTIONS": {
+            "RETRY_SECONDS": 60,
+            "SHARED_OPTIONS": {"SOCKET_CONNECT_TIMEOUT": 0.1},
+        }})
+        with self.assertLogs("base", level="WARNING"):
+            cache.set("key", "value")
+        self.assertFalse(cache.shared_available)
+        cache._local_clear()
+        self.assertEqual(cache.get("key"), "value", "Served by the local-memory fallback")
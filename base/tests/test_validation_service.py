@@ -0,0 +1,47 @@
+from django.test import SimpleTestCase
+from base.services import validation_service
+import time
+
+
+class ContainsScriptTestCase(SimpleTestCase):
+
+    def test_scripts_detected(self):
+        for value in [
+            "<script>alert(1)</script>",
+            "< SCRIPT src='x.js'>",
+            "<iframe src='https://example.com'>",
+            "<img src=\"javascript:alert(1)\">",
+            "<img src='x.png' onerror='alert(1)'>",
+            "<p>hello</p><b onmouseover=\"alert(1)\">",
+        ]:
+            self.assertTrue(validation_service.contains_script(value), value)
+
+    def test_safe_values(self):
+        for value in [
+            None,
+            "",
+            "Plain text about onions and sources",
+            "Subscription = 'monthly'",
+            "<p>The <a href=\"/airport\">airport</a> is open</p>",
+            "<img src=\"hangar.jpg\">\nThis script is a screenplay",
+            "onclick='x' is on a line without a tag\n<p>",
+        ]:
+            self.assertFalse(validation_service.contains_script(value), value)
+
+    def test_large_single_line_field(self):
+        # Many attributes on one long line (quadratic for the previous patterns)
+        value = '<td src="x" data-on="y">onion soup, source code</td>' * 20000
+        started = time.perf_counter()
+        self.assertFalse(validation_service.contains_script(value))
+        self.assertLess(time.perf_counter() - started, 1)
+
+    def test_long_attribute_names(self):
+        # Event attribute names of any length are detected (as by on\w+)
+        self.assertTrue(validation_service.contains_script(f"<a on{'x' * 60}='alert(1)'>"))
+        self.assertTrue(validation_service.contains_script(f"<a data-{'x' * 60}onload='alert(1)'>"))
+
+        # A long word that repeats "on" is still scanned in linear time
+        value = f"<a {'on' * 100000}x='1'>"
+        started = time.perf_counter()
+        self.assertTrue(validation_service.contains_script(value))
+        self.assertLess(time.perf_counter() - started, 1)
@@ -0,0 +1,27 @@
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+from base.models.utility.xss_attempt import XssAttempt
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "unit-xss"}})
+class XssLockoutTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def attempt(self):
+        return XssAttempt.objects.create(app_code="UNIT", user_username="pilot", path="/", parameter_name="q")
+
+    def test_counter(self):
+        self.attempt()
+        self.assertEqual(XssAttempt.unreviewed_count("pilot"), 1)
+
+        # Cached, and incremented when an attempt is created
+        second = self.attempt()
+        with self.assertNumQueries(0):
+            self.assertEqual(XssAttempt.unreviewed_count("pilot"), 2)
+
+        # Reviewing resets the counter (recounted from the database)
+        second.reviewer_username = "admin"
+        second.save()
+        self.assertEqual(XssAttempt.unreviewed_count("pilot"), 1)
+        self.assertEqual(XssAttempt.unreviewed_count("someone_else"), 0)
@@ -4,7 +4,7 @@ from base.classes.util.env_helper import EnvHelper, Log
 from base.classes.util.date_helper import DateHelper
 from base.classes.auth.session import Auth
 from base.services import utility_service, message_service, auth_service
-from base.decorators import require_authority, report_errors, require_authentication
+from base.decorators import require_authority, report_errors, require_authentication, rate_limit
 from base.models.utility.error import Error
 from base.models.utility.enhancement_requests import EnhancementRequest, EnhancementVote
 from django.core.paginator import Paginator
@@ -55,6 +55,7 @@ def enhancement_requests(request):
 
 @report_errors()
 @require_authentication()
+@rate_limit(per_minute=5, per_hour=20)
 def submit_enhancement_request(request):
     # Get parameters
     request_type_code = request.POST.get("request_type_code")
@@ -91,6 +92,7 @@ def submit_enhancement_request(request):
 
 @report_errors()
 @require_authentication()
+@rate_limit(per_second=2, per_minute=30)
 def enhancement_vote(request):
     # Get parameters
     enhancement_id = request.POST.get("enhancement_id")
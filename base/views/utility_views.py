@@ -1,5 +1,7 @@
 from django.shortcuts import render
-from base.services import date_service
+from base.services import date_service, cache_service
+from base.backends import session_store
+from django.conf import settings
 import time
 from datetime import datetime, timezone
 from base.classes.util.app_data import Log, EnvHelper, AppData
@@ -29,6 +31,8 @@ def status_page(request):
             'server_time': datetime.now(timezone.utc),
             'session_data': session_data,
             'installed_plugins': env.installed_plugins,
+            'cache_stats': cache_service.stats(),
+            'session_stats': session_store.stats() if settings.SESSION_ENGINE == session_store.__name__ else {},
         }
     )
 
@@ -7,6 +7,17 @@ log = Log()
 
 # Default settings
 _DEFAULTS = {
+    # Webhook events for the same object within this many seconds are processed together (0 to disable)
+    "STRIPE_WEBHOOK_DEBOUNCE_SECONDS": 5,
+
+    # A claimed webhook event is given to another worker if not processed within this many seconds
+    "STRIPE_EVENT_CLAIM_SECONDS": 30 * 60,
+
+    # Reconciliation of webhook events that were not refreshed when received (base_stripe.tasks)
+    "STRIPE_RECONCILE_AFTER_SECONDS": 10 * 60,     # Leave newer events to their own task
+    "STRIPE_RECONCILE_BATCH_SIZE": 1000,           # Events per run
+    "STRIPE_RECONCILE_MAX_PAGES": 20,              # List requests per object type and account
+
     # Admin Menu Items
     "BASE_STRIPE_ADMIN_LINKS": [
         {
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base_stripe', '0017_alter_stripesubscription_payment_expire_ym'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stripecheckoutsession',
+            name='synced_as_of',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stripeconnectedaccount',
+            name='synced_as_of',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stripecustomer',
+            name='synced_as_of',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stripeinvoice',
+            name='synced_as_of',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stripeprice',
+            name='synced_as_of',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stripeproduct',
+            name='synced_as_of',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stripesubscription',
+            name='synced_as_of',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stripewebhookevent',
+            name='object_version',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stripewebhookevent',
+            name='payload',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
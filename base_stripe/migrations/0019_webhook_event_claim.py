@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base_stripe', '0018_webhook_payload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stripewebhookevent',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='stripewebhookevent',
+            name='claimed_by',
+            field=models.CharField(blank=True, db_index=True, max_length=32, null=True),
+        ),
+    ]
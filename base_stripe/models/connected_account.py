@@ -1,7 +1,9 @@
 from django.db import models
 from base.models.utility.error import EnvHelper, Log, Error
-import stripe
-from base_stripe.services.config_service import set_stripe_api_key
+from base.classes.util.lazy_import import lazy_import
+from base_stripe.services.config_service import set_stripe_api_key, stripe_time
+
+stripe = lazy_import("stripe")
 
 log = Log()
 env = EnvHelper()
@@ -18,6 +20,8 @@ class StripeConnectedAccount(models.Model):
     last_updated = models.DateTimeField(auto_now=True)
     stripe_id = models.CharField(max_length=60, db_index=True)
     deleted = models.BooleanField(default=False, db_index=True)
+    # Epoch time of the Stripe data last applied (webhook event time, or Stripe's time of the API response)
+    synced_as_of = models.IntegerField(null=True, blank=True)
 
     name = models.CharField(max_length=80, null=True, blank=True)
     charges_enabled = models.BooleanField(default=False)
@@ -60,7 +64,7 @@ class StripeConnectedAccount(models.Model):
         except Exception as ee:
             Error.record(ee, self)
 
-    def sync(self, api_data=None):
+    def sync(self, api_data=None, as_of=None, save=True):
         """
         Sync local (model) data with Stripe (API) data
         """
@@ -71,6 +75,8 @@ class StripeConnectedAccount(models.Model):
 
             if not api_data:
                 api_data = self.api_data()
+                as_of = stripe_time(api_data)
+            self.synced_as_of = as_of or stripe_time(api_data)
 
             if api_data.get("deleted"):
                 self.deleted = True
@@ -83,7 +89,8 @@ class StripeConnectedAccount(models.Model):
                 if capabilities:
                     self.card_payments_enabled = capabilities.get("card_payments") == "active"
                     self.transfers_enabled = capabilities.get("transfers") == "active"
-            self.save()
+            if save:
+                self.save()
             return True
         except Exception as ee:
             Error.record(ee)
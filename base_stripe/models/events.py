@@ -2,7 +2,10 @@ from django.db import models
 from base.classes.util.env_helper import EnvHelper, Log
 from base.models.utility.error import Error
 import json
-import stripe
+import zlib
+from base.classes.util.lazy_import import lazy_import
+
+stripe = lazy_import("stripe")
 
 log = Log()
 env = EnvHelper()
@@ -22,6 +25,33 @@ class StripeWebhookEvent(models.Model):
     refreshed = models.BooleanField(default=False)
     processed = models.BooleanField(default=False)
 
+    # Set (atomically) by the worker processing the event, so concurrent workers never process it twice
+    claimed_by = models.CharField(max_length=32, null=True, blank=True, db_index=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    # The event's data.object (zlib-compressed JSON), so models can be updated without calling the API
+    payload = models.BinaryField(null=True, blank=True)
+
+    # Epoch time of the object data in this event (object's "updated", or when the event was created)
+    object_version = models.IntegerField(null=True, blank=True, db_index=True)
+
+    @property
+    def object_data(self):
+        """
+        The object as it was when the event was sent (StripeObject, like an API response), or None
+        """
+        if not self.payload:
+            return None
+        try:
+            data = json.loads(zlib.decompress(bytes(self.payload)))
+            # An object's final state is sent with its deleted event, but without the "deleted" flag
+            if self.event_type.endswith(".deleted"):
+                data["deleted"] = True
+            return stripe.StripeObject.construct_from(data, None)
+        except Exception as ee:
+            log.error(f"Could not read payload of webhook event {self.event_id}: {ee}")
+            return None
+
     @classmethod
     def get(cls, xx):
         try:
@@ -141,7 +171,7 @@ class StripeWebhookEvent(models.Model):
         object_data = payload_data.get('data').get('object')
         object_type = object_data.get("object")
         object_id = object_data.get("id")
-        account_id = event.get('account')
+        account_id = payload_data.get('account')
         log.info(f"Event: <{event_type}: {event_id}> Account: {account_id}")
 
         if not object_id:
@@ -157,7 +187,9 @@ class StripeWebhookEvent(models.Model):
             event_id=event_id,
             object_type=object_type,
             object_id=object_id,
-            account_id=event.get('account')
+            account_id=account_id,
+            payload=zlib.compress(json.dumps(object_data, separators=(",", ":")).encode()),
+            object_version=object_data.get("updated") or payload_data.get("created"),
         )
 
         return whe
\ No newline at end of file
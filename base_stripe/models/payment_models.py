@@ -6,7 +6,7 @@ from base.models.utility.error import Error
 from base_stripe.services import config_service
 from base.services import utility_service
 from base.classes.auth.session import Auth
-import stripe
+from base.classes.util.lazy_import import lazy_import
 from base_stripe.services.config_service import set_stripe_api_key
 from base.services import date_service
 from datetime import datetime, timezone, timedelta
@@ -14,10 +14,22 @@ import calendar
 from base.classes.util.date_helper import DateHelper
 from base_stripe.models.connected_account import StripeConnectedAccount
 
+stripe = lazy_import("stripe")
+
 log = Log()
 env = EnvHelper()
 
 
+def is_expanded(api_data, *path):
+    """
+    Whether the (optional) object at the given path is included in the data, rather than only its ID
+    """
+    value = api_data
+    for key in path:
+        value = value.get(key) if value else None
+    return not isinstance(value, str)
+
+
 """
     CUSTOMER
     - Tracks the most important elements of a Stripe Customer
@@ -28,6 +40,8 @@ class StripeCustomer(models.Model):
     last_updated = models.DateTimeField(auto_now=True)
     stripe_id = models.CharField(max_length=60, unique=True, db_index=True)
     deleted = models.BooleanField(default=False, db_index=True)
+    # Epoch time of the Stripe data last applied (webhook event time, or Stripe's time of the API response)
+    synced_as_of = models.IntegerField(null=True, blank=True)
 
     # Customers belong to connected accounts, or the HH account
     stripe_account = models.ForeignKey(
@@ -76,14 +90,17 @@ class StripeCustomer(models.Model):
         except Exception as ee:
             Error.record(ee, self)
 
-    def sync(self, api_data=None):
+    def sync(self, api_data=None, as_of=None, save=True):
         try:
             if self.deleted:
                 # Cannot sync a deleted object
                 return False
 
-            # Given api_data cannot be used because invoice settings must be expanded
-            api_data = self.api_data(expand=["invoice_settings.default_payment_method"])
+            # Given api_data (i.e. from a webhook) can only be used if it includes the default payment method
+            if not (api_data and is_expanded(api_data, "invoice_settings", "default_payment_method")):
+                api_data = self.api_data(expand=["invoice_settings.default_payment_method"])
+                as_of = config_service.stripe_time(api_data)
+            self.synced_as_of = as_of or config_service.stripe_time(api_data)
 
             if api_data.get("deleted"):
                 self.deleted = True
@@ -102,25 +119,24 @@ class StripeCustomer(models.Model):
                 self.default_source = api_data.get("default_source")
                 self.default_payment_method = dpm.get("type")
 
-                # Expand upon payment method when possible
+                # Describe the (expanded) payment method when possible
                 if self.default_payment_method:
                     try:
-                        pm_id = dpm.get("id")
-                        pm = self.stripe_api().retrieve_payment_method(self.stripe_id, pm_id)
                         payment_type = self.default_payment_method
                         if payment_type == "card":
-                            card = pm.get("card")
+                            card = dpm.get("card")
                             exp = f'exp. {card.get("exp_month")}/{card.get("exp_year")}'
                             self.default_payment_method = f'{card.get("brand")} ****{card.get("last4")} {exp}'
                         elif payment_type == "us_bank_account":
-                            acct = pm.get("us_bank_account")
+                            acct = dpm.get("us_bank_account")
                             self.default_payment_method = f'{acct.get("bank_name")} ****{acct.get("last4")}'
                         elif payment_type == "link":
                             self.default_payment_method = "Managed via Link.com"
                     except Exception as ee:
                         Error.record(ee)
 
-                self.save()
+                if save:
+                    self.save()
                 return True
         except Exception as ee:
             Error.record(ee, self.stripe_id)
@@ -343,6 +359,8 @@ class StripeInvoice(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
     deleted = models.BooleanField(default=False, db_index=True)
+    # Epoch time of the Stripe data last applied (webhook event time, or Stripe's time of the API response)
+    synced_as_of = models.IntegerField(null=True, blank=True)
 
     stripe_id = models.CharField(max_length=60, unique=True, db_index=True)
     customer = models.ForeignKey("base_stripe.StripeCustomer", models.CASCADE, related_name="customer_invoices", db_index=True)
@@ -389,14 +407,17 @@ class StripeInvoice(models.Model):
                 return {"deleted": True}
             Error.record(ee, self)
 
-    def sync(self):
+    def sync(self, api_data=None, as_of=None, save=True):
         """
-        Update data from Stripe API
+        Update data from Stripe API (or given api_data, which includes the invoice lines)
         """
         if self.status == "deleted":
             return False
         try:
-            api_data = self.api_data(expand=["lines"])
+            if not api_data:
+                api_data = self.api_data(expand=["lines"])
+                as_of = config_service.stripe_time(api_data)
+            self.synced_as_of = as_of or config_service.stripe_time(api_data)
             if api_data.get("deleted"):
                 self.deleted = True
             else:
@@ -420,7 +441,8 @@ class StripeInvoice(models.Model):
                                     self.subscription = StripeSubscription.from_stripe_id(subscription_id, self.stripe_account)
                 except Exception as ee:
                     log.error(f"Error in ChatGPT-created code: {ee}")
-            self.save()
+            if save:
+                self.save()
             return True
         except Exception as ee:
             Error.record(ee, self.stripe_id)
@@ -531,6 +553,8 @@ class StripeSubscription(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
     deleted = models.BooleanField(default=False, db_index=True)
+    # Epoch time of the Stripe data last applied (webhook event time, or Stripe's time of the API response)
+    synced_as_of = models.IntegerField(null=True, blank=True)
 
     customer = models.ForeignKey("base_stripe.StripeCustomer", models.CASCADE, related_name="invoices", db_index=True)
     stripe_id = models.CharField(max_length=60, unique=True, db_index=True)
@@ -629,16 +653,20 @@ class StripeSubscription(models.Model):
         except Exception as ee:
             Error.record(ee, self)
 
-    def sync(self, api_data=None):
+    def sync(self, api_data=None, as_of=None, save=True):
         """
         Update data from Stripe API
+
+        Given api_data (i.e. from a webhook) can only be used if it includes the default payment method
         """
         log.trace()
         if self.status == "deleted":
             return False
         try:
-            if not api_data:
+            if not (api_data and is_expanded(api_data, "default_payment_method")):
                 api_data = self.api_data(expand=['default_payment_method'])
+                as_of = config_service.stripe_time(api_data)
+            self.synced_as_of = as_of or config_service.stripe_time(api_data)
 
             if api_data.get("deleted"):
                 self.deleted = True
@@ -678,7 +706,8 @@ class StripeSubscription(models.Model):
                 except Exception as ee:
                     Error.record(ee)
 
-            self.save()
+            if save:
+                self.save()
             return True
         except Exception as ee:
             Error.record(ee, self.stripe_id)
@@ -830,6 +859,8 @@ class StripeCheckoutSession(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
     deleted = models.BooleanField(default=False, db_index=True)
+    # Epoch time of the Stripe data last applied (webhook event time, or Stripe's time of the API response)
+    synced_as_of = models.IntegerField(null=True, blank=True)
 
     customer = models.ForeignKey("base_stripe.StripeCustomer", models.CASCADE, related_name="checkout_sessions", db_index=True)
     stripe_id = models.CharField(max_length=60, unique=True, db_index=True)
@@ -878,17 +909,19 @@ class StripeCheckoutSession(models.Model):
         except Exception as ee:
             Error.record(ee, self)
 
-    def sync(self, api_data=None):
+    def sync(self, api_data=None, as_of=None, save=True):
         """
         Update data from Stripe API
 
-        if Stripe data was just obtained (from creation for example), skip the API call
+        if Stripe data was just obtained (from creation or a webhook for example), skip the API call
         """
         if self.status == "deleted":
             return False
         try:
             if not api_data:
                 api_data = self.api_data()
+                as_of = config_service.stripe_time(api_data)
+            self.synced_as_of = as_of or config_service.stripe_time(api_data)
 
             if api_data.get("deleted"):
                 self.deleted = True
@@ -898,7 +931,8 @@ class StripeCheckoutSession(models.Model):
                 self.url = api_data.url
                 self.expiration_date = date_service.string_to_date(api_data.expires_at) if api_data.expires_at else None
                 self.customer = StripeCustomer.from_stripe_id(api_data.customer, self.stripe_account)
-            self.save()
+            if save:
+                self.save()
             return True
         except Exception as ee:
             Error.record(ee, self.stripe_id)
@@ -6,9 +6,11 @@ from base.services import utility_service, message_service
 from base_stripe.services import config_service
 from base_stripe.models.connected_account import StripeConnectedAccount
 from base_stripe.services.config_service import set_stripe_api_key
-import stripe
+from base.classes.util.lazy_import import lazy_import
 import json
 
+stripe = lazy_import("stripe")
+
 log = Log()
 env = EnvHelper()
 
@@ -22,6 +24,8 @@ class StripeProduct(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
     deleted = models.BooleanField(default=False, db_index=True)
+    # Epoch time of the Stripe data last applied (webhook event time, or Stripe's time of the API response)
+    synced_as_of = models.IntegerField(null=True, blank=True)
     stripe_id = models.CharField(max_length=60, unique=True, db_index=True)
     stripe_account = models.ForeignKey(
         "base_stripe.StripeConnectedAccount", on_delete=models.CASCADE,
@@ -42,7 +46,7 @@ class StripeProduct(models.Model):
     def prices_for_display(self):
         return self.prices.filter(display=True)
 
-    def sync(self, api_data=None):
+    def sync(self, api_data=None, as_of=None, save=True):
         """
         Update data from Stripe API
         """
@@ -52,6 +56,8 @@ class StripeProduct(models.Model):
             log.info(f"Sync {self} ({self.stripe_id})")
             if not api_data:
                 api_data = self.api_data()
+                as_of = config_service.stripe_time(api_data)
+            self.synced_as_of = as_of or config_service.stripe_time(api_data)
             if api_data.get("deleted"):
                 self.deleted = True
             else:
@@ -59,7 +65,8 @@ class StripeProduct(models.Model):
                 self.name = api_data.get("name")
                 self.description = api_data.get("description")
                 self.metadata = api_data.get("metadata")
-            self.save()
+            if save:
+                self.save()
             return True
         except Exception as ee:
             Error.record(ee, self.stripe_id)
@@ -245,6 +252,8 @@ class StripePrice(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
     deleted = models.BooleanField(default=False, db_index=True)
+    # Epoch time of the Stripe data last applied (webhook event time, or Stripe's time of the API response)
+    synced_as_of = models.IntegerField(null=True, blank=True)
     stripe_id = models.CharField(max_length=60, unique=True, db_index=True)
     stripe_account = models.ForeignKey(
         "base_stripe.StripeConnectedAccount",
@@ -298,7 +307,7 @@ class StripePrice(models.Model):
     def features_json(self):
         return json.dumps(self.features or [], indent=4)
 
-    def sync(self, api_data=None):
+    def sync(self, api_data=None, as_of=None, save=True):
         """
         Update data from Stripe API
         """
@@ -308,6 +317,8 @@ class StripePrice(models.Model):
             log.info(f"Sync {self} ({self.stripe_id})")
             if not api_data:
                 api_data = self.api_data()
+                as_of = config_service.stripe_time(api_data)
+            self.synced_as_of = as_of or config_service.stripe_time(api_data)
             if api_data.get("deleted"):
                 self.deleted = True
             else:
@@ -318,7 +329,8 @@ class StripePrice(models.Model):
                 self.metadata = api_data.get("metadata")
                 self.unit_amount = api_data.get("unit_amount")
                 self.type = api_data.get("type")
-            self.save()
+            if save:
+                self.save()
             return True
         except Exception as ee:
             Error.record(ee, self.stripe_id)
@@ -1,12 +1,14 @@
 from base.models.utility.error import EnvHelper, Log, Error
 from base.classes.auth.session import Auth
-import stripe
+from base.classes.util.lazy_import import lazy_import
 from decimal import Decimal
 from django.urls import reverse
 from base.services import message_service, utility_service
 from base_stripe.services.config_service import set_stripe_api_key, get_stripe_address_dict
 from base_stripe.models.connected_account import StripeConnectedAccount
 
+stripe = lazy_import("stripe")
+
 log = Log()
 env = EnvHelper()
 
@@ -1,7 +1,11 @@
 from csv import excel
 
 from base.models.utility.error import EnvHelper, Log, Error
-import stripe
+from base.classes.util.lazy_import import lazy_import
+from email.utils import parsedate_to_datetime
+import time
+
+stripe = lazy_import("stripe")
 
 
 log = Log()
@@ -10,6 +14,22 @@ env = EnvHelper()
 def set_stripe_api_key():
     stripe.api_key = env.get_setting("STRIPE_KEY")
 
+
+def stripe_time(api_data=None):
+    """
+    Epoch time (by Stripe's clock) when the given data was retrieved from the API, from the response's Date header.
+    This can be compared with event and object times even if this server's clock is off.
+    Data that did not come from an API response (i.e. sent with a webhook) uses this server's clock.
+    """
+    try:
+        headers = api_data.last_response.headers
+        date = headers.get("Date") or headers.get("date")
+        if date:
+            return int(parsedate_to_datetime(date).timestamp())
+    except Exception:
+        pass
+    return int(time.time())
+
 def create_customer_portal_configs():
     """
     ToDo: Think about how to handle HH cancellations.
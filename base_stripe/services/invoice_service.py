@@ -1,8 +1,10 @@
 from base.models.utility.error import EnvHelper, Log, Error
-import stripe
+from base.classes.util.lazy_import import lazy_import
 from base_stripe.models import StripeCustomer, StripeInvoice
 from base_stripe.services.config_service import set_stripe_api_key
 
+stripe = lazy_import("stripe")
+
 log = Log()
 env = EnvHelper()
 
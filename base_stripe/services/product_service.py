@@ -1,10 +1,12 @@
 from base.models.utility.error import EnvHelper, Log, Error
-import stripe
+from base.classes.util.lazy_import import lazy_import
 from base_stripe.services.config_service import set_stripe_api_key
 from base_stripe.classes.price import Price
 from base_stripe.models.product_models import StripeProduct, StripePrice
 from base_stripe.models.connected_account import StripeConnectedAccount
 
+stripe = lazy_import("stripe")
+
 
 log = Log()
 env = EnvHelper()
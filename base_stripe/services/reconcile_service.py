@@ -0,0 +1,263 @@
+from base.classes.util.env_helper import Log, EnvHelper
+from base.models.utility.error import Error
+from base_stripe.models.events import StripeWebhookEvent
+from base_stripe.models.payment_models import StripeInvoice, StripeCustomer, StripeSubscription, StripeCheckoutSession
+from base_stripe.models.payment_models import is_expanded
+from base_stripe.models.product_models import StripeProduct, StripePrice
+from base_stripe.models.connected_account import StripeConnectedAccount
+from base_stripe.services import webhook_service
+from base_stripe.services.config_service import set_stripe_api_key, stripe_time
+from django.utils import timezone
+from datetime import timedelta
+import time
+
+log = Log()
+env = EnvHelper()
+
+# Object types tracked locally: (model, parameters for the Stripe list endpoint, field that must be expanded)
+tracked_types = {
+    "customer": (
+        StripeCustomer, {"expand": ["data.invoice_settings.default_payment_method"]},
+        ("invoice_settings", "default_payment_method")
+    ),
+    "invoice": (StripeInvoice, {}, None),
+    "subscription": (
+        StripeSubscription, {"status": "all", "expand": ["data.default_payment_method"]}, ("default_payment_method",)
+    ),
+    "checkout.session": (StripeCheckoutSession, {}, None),
+    "product": (StripeProduct, {}, None),
+    "price": (StripePrice, {}, None),
+    "account": (StripeConnectedAccount, {}, None),
+}
+
+
+def reconcile(limit=None, progress=None):
+    """
+    Refresh the models for webhook events that were not refreshed when received (i.e. their task failed or was lost)
+
+    Events are grouped by object type and account, and each group is handled in bulk:
+        - existing models are loaded with one query
+        - objects are updated from the webhook data when it is current, otherwise found with the Stripe
+          list endpoint (100 per request), and only retrieved individually when not found in the list
+        - models are written with bulk_update (only the fields changed by sync), or bulk_create
+
+    Claimed events are only refreshed. If a webhook task finds them claimed, it tries again later and runs the
+    event handlers itself.
+
+    limit: Maximum number of events (STRIPE_RECONCILE_BATCH_SIZE)
+    progress: Function called with the metrics after each group
+
+    Returns metrics (counts of events, objects, list requests and retrieved objects). sync() may make other API
+    requests (i.e. for related objects), which are not counted.
+    """
+    started = time.perf_counter()
+    metrics = {
+        "events": 0, "ignored": 0, "groups": 0, "objects": 0, "current": 0,
+        "from_webhook": 0, "listed": 0, "retrieved": 0, "list_requests": 0,
+        "updated": 0, "created": 0, "failed": 0, "seconds": 0,
+    }
+
+    # Recent events are left for their (debounced) task
+    received_before = timezone.now() - timedelta(seconds=env.get_setting("STRIPE_RECONCILE_AFTER_SECONDS", 10 * 60))
+    pending = StripeWebhookEvent.objects.filter(refreshed=False, date_created__lt=received_before)
+
+    # Objects that are not tracked locally do not need to be refreshed
+    metrics["ignored"] = pending.exclude(object_type__in=tracked_types).update(refreshed=True)
+
+    limit = limit or env.get_setting("STRIPE_RECONCILE_BATCH_SIZE", 1000)
+    ids = pending.filter(object_type__in=tracked_types).order_by("id").values_list("id", flat=True)[:limit]
+    events = webhook_service.claim(StripeWebhookEvent.objects.filter(id__in=list(ids), refreshed=False))
+    metrics["events"] = len(events)
+
+    # Most recent event for each object, by object type and account
+    by_object = {}
+    for event in events:
+        by_object.setdefault((event.object_type, event.account_id, event.object_id), []).append(event)
+    groups = {}
+    for (object_type, account_id, object_id), object_events in by_object.items():
+        groups.setdefault((object_type, account_id), {})[object_id] = webhook_service.latest_event(object_events)
+
+    refreshed = set()
+    for (object_type, account_id), latest in groups.items():
+        metrics["groups"] += 1
+        metrics["objects"] += len(latest)
+        try:
+            refreshed.update((object_type, account_id, stripe_id) for stripe_id in _reconcile_group(
+                object_type, account_id, latest, metrics
+            ))
+        except Exception as ee:
+            Error.record(ee, f"Reconciling {object_type} events for account {account_id}")
+        if progress:
+            progress(dict(metrics, seconds=round(time.perf_counter() - started, 1)))
+
+    # Release the claims (events that could not be refreshed will be tried again next time)
+    done = [ee.id for ee in events if (ee.object_type, ee.account_id, ee.object_id) in refreshed]
+    StripeWebhookEvent.objects.filter(id__in=done).update(refreshed=True)
+    if events:
+        StripeWebhookEvent.objects.filter(claimed_by=events[0].claimed_by).update(claimed_by=None, claimed_at=None)
+
+    metrics["seconds"] = round(time.perf_counter() - started, 1)
+    log.info(f"Reconciled Stripe webhook events: {metrics}")
+    return metrics
+
+
+def _reconcile_group(object_type, account_id, latest, metrics):
+    """
+    Update the models for one object type and account from {stripe_id: most recent event}
+    Returns the stripe_ids that were refreshed
+    """
+    model_class, list_params, expanded = tracked_types[object_type]
+    is_account = model_class is StripeConnectedAccount
+    account = None if is_account else StripeConnectedAccount.get(account_id)
+
+    models = {mm.stripe_id: mm for mm in model_class.objects.filter(stripe_id__in=latest)}
+    loaded = {stripe_id: _field_values(mm) for stripe_id, mm in models.items()}
+    for stripe_id in latest:
+        if stripe_id not in models:
+            models[stripe_id] = model_class(stripe_id=stripe_id) if is_account else model_class(
+                stripe_id=stripe_id, stripe_account=account
+            )
+
+    # Use the webhook data when it is newer than the model's (see webhook_service.sync_from_event)
+    current = set()
+    updates = {}
+    need_api = []
+    for stripe_id, event in latest.items():
+        version, as_of = event.object_version, models[stripe_id].synced_as_of
+        if version and as_of and version < as_of:
+            metrics["current"] += 1
+            current.add(stripe_id)
+            continue
+        api_data = event.object_data if version and (not as_of or version > as_of) else None
+        if api_data is not None and (not expanded or is_expanded(api_data, *expanded)):
+            metrics["from_webhook"] += 1
+            updates[stripe_id] = (api_data, version)
+        else:
+            need_api.append(stripe_id)
+
+    # Otherwise, find the objects with the list endpoint
+    if len(need_api) > 1:
+        found = _list_objects(model_class, list_params, account, need_api, latest, metrics)
+        metrics["listed"] += len(found)
+        updates.update(found)
+
+    synced = []
+    for stripe_id in latest:
+        if stripe_id in current:
+            continue
+        model = models[stripe_id]
+        try:
+            if stripe_id in updates:
+                api_data, as_of = updates[stripe_id]
+                success = model.sync(api_data, as_of=as_of, save=False)
+            else:
+                # A single object, or one not found in the list (i.e. deleted), is retrieved
+                metrics["retrieved"] += 1
+                success = model.sync(save=False)
+        except Exception as ee:
+            Error.record(ee, stripe_id)
+            success = False
+
+        if success:
+            synced.append(model)
+        else:
+            metrics["failed"] += 1
+
+    return list(current) + _save(model_class, synced, loaded, metrics)
+
+
+def _list_objects(model_class, list_params, account, stripe_ids, latest, metrics):
+    """
+    Page through the Stripe list endpoint (newest first) until all the given objects are found
+    Returns {stripe_id: (api_data, Stripe's time of the response)}
+    """
+    wanted = set(stripe_ids)
+    params = dict(list_params, limit=100)
+    if account:
+        params["stripe_account"] = account.stripe_id
+
+    # The webhook data includes when each object was created, so older objects need not be listed
+    created = [(latest[stripe_id].object_data or {}).get("created") for stripe_id in stripe_ids]
+    if all(created):
+        params["created"] = {"gte": min(created)}
+
+    found = {}
+    try:
+        set_stripe_api_key()
+        page = model_class.stripe_api().list(**params)
+        for page_number in range(env.get_setting("STRIPE_RECONCILE_MAX_PAGES", 20)):
+            metrics["list_requests"] += 1
+            as_of = stripe_time(page)
+            for api_data in page.data:
+                if api_data.id in wanted:
+                    found[api_data.id] = (api_data, as_of)
+            if len(found) == len(wanted) or not page.has_more:
+                break
+            page = page.next_page()
+    except Exception as ee:
+        Error.record(ee, f"Listing {model_class.__name__} objects")
+    return found
+
+
+def _field_values(model):
+    return {ff.name: getattr(model, ff.attname) for ff in model._meta.concrete_fields}
+
+
+def _save(model_class, models, loaded, metrics):
+    """
+    Write synced models with one query per 100 (or one at a time, if that fails)
+
+    Existing models only have the fields changed by sync() written (loaded has their values before the sync),
+    and are skipped if they were updated with newer Stripe data meanwhile (i.e. by a webhook task)
+    Returns the stripe_ids that were saved (or already had newer data)
+    """
+    now = timezone.now()
+    existing = [mm for mm in models if mm.pk]
+    new = [mm for mm in models if not mm.pk]
+
+    # Re-check just before writing
+    as_of = {mm.pk: mm.synced_as_of or 0 for mm in existing}
+    in_database = model_class.objects.filter(pk__in=as_of, synced_as_of__isnull=False).values_list("pk", "synced_as_of")
+    newer = {pk for pk, synced_as_of in in_database if synced_as_of > as_of[pk]}
+    skipped = [mm for mm in existing if mm.pk in newer]
+    metrics["current"] += len(skipped)
+
+    # Group the models by the fields that changed, so other fields are not overwritten
+    changed = {}
+    for model in existing:
+        if model.pk in newer:
+            continue
+        # auto_now is not applied by bulk_update
+        model.last_updated = now
+        before = loaded[model.stripe_id]
+        fields = tuple(name for name, value in _field_values(model).items() if value != before[name])
+        changed.setdefault(fields, []).append(model)
+
+    batches = [(rows, fields, "updated") for fields, rows in changed.items()]
+    batches.append((new, None, "created"))
+
+    saved = list(skipped)
+    for rows, fields, counter in batches:
+        if not rows:
+            continue
+        try:
+            if fields:
+                model_class.objects.bulk_update(rows, fields, batch_size=100)
+            else:
+                model_class.objects.bulk_create(rows, batch_size=100)
+            saved.extend(rows)
+            metrics[counter] += len(rows)
+            continue
+        except Exception as ee:
+            log.warning(f"Could not bulk save {len(rows)} {model_class.__name__} models: {ee}")
+
+        for row in rows:
+            try:
+                row.save(update_fields=fields)
+                saved.append(row)
+                metrics[counter] += 1
+            except Exception as ee:
+                Error.record(ee, row.stripe_id)
+                metrics["failed"] += 1
+
+    return [mm.stripe_id for mm in saved]
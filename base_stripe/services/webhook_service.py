@@ -4,6 +4,13 @@ from base.models.utility.error import Error
 from base_stripe.models.payment_models import StripeInvoice, StripeCustomer, StripeSubscription, StripeCheckoutSession
 from base_stripe.models.product_models import StripeProduct, StripePrice
 from base_stripe.models.connected_account import StripeConnectedAccount
+from base.services import cache_service
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+from datetime import timedelta
+import uuid
+import zlib
 
 
 log = Log()
@@ -12,6 +19,111 @@ env = EnvHelper()
 # ToDo: Error Handling/Messages
 
 
+def coalesce_key(webhook_event_instance):
+    return ":".join([
+        "stripe_webhook",
+        str(webhook_event_instance.account_id), webhook_event_instance.object_type, webhook_event_instance.object_id
+    ])
+
+
+def event_queue(webhook_event_instance):
+    """
+    The Celery queue for an event, selected by a hash of its object ID (settings.STRIPE_EVENT_QUEUES)
+
+    Each queue is consumed by a single worker process, so events for the same object are always processed in order,
+    while events for other objects are processed in parallel from the other queues
+    """
+    partitions = env.get_setting("STRIPE_EVENT_QUEUES", 0)
+    if not partitions:
+        return "celery"
+    return f"stripe_events_{zlib.crc32(webhook_event_instance.object_id.encode()) % partitions}"
+
+
+def debounce(webhook_event_instance):
+    """
+    Events for the same object that arrive within STRIPE_WEBHOOK_DEBOUNCE_SECONDS are processed by one task,
+    with a single sync of the object (i.e. invoice.created, invoice.finalized, invoice.paid)
+
+    Returns the countdown for a new task, or None if a task is already waiting to process this object
+    """
+    seconds = env.get_setting("STRIPE_WEBHOOK_DEBOUNCE_SECONDS", 5)
+    if not seconds:
+        return 0
+    try:
+        # Key outlives the countdown, in case the workers are behind
+        added = cache.add(coalesce_key(webhook_event_instance), webhook_event_instance.id, timeout=max(10 * seconds, 60))
+
+        # When Redis is down the key is only in this process's fallback cache, and the worker could not clear it
+        # (later events for the object would never be queued), so every event gets its own task
+        if not getattr(cache, "shared_available", True):
+            return 0
+        return seconds if added else None
+    except Exception as ee:
+        log.warning(f"Unable to debounce webhook event {webhook_event_instance.event_id}: {ee}")
+        return 0
+
+
+def claim(events):
+    """
+    Claim the unclaimed events in the given queryset, and return them (oldest data first)
+
+    Events are claimed with a single conditional UPDATE, so when several workers are handed the same events
+    (retries, duplicate deliveries, concurrent workers) only one of them gets each event. Claims left by a
+    worker that died are taken over after STRIPE_EVENT_CLAIM_SECONDS.
+    """
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    expired = now - timedelta(seconds=env.get_setting("STRIPE_EVENT_CLAIM_SECONDS", 30 * 60))
+    events.filter(Q(claimed_by__isnull=True) | Q(claimed_at__lt=expired)).update(claimed_by=token, claimed_at=now)
+    return list(
+        StripeWebhookEvent.objects.filter(claimed_by=token).order_by(F("object_version").asc(nulls_first=True), "id")
+    )
+
+
+def claim_events(webhook_event_instance):
+    """
+    Claim all unprocessed events for the same object as the given event (oldest data first)
+
+    Returns an empty list if there is nothing (left) to process. Any event received after this is called
+    will queue a new task.
+    """
+    cache_service.delete(coalesce_key(webhook_event_instance))
+    return claim(StripeWebhookEvent.objects.filter(
+        processed=False,
+        account_id=webhook_event_instance.account_id,
+        object_type=webhook_event_instance.object_type,
+        object_id=webhook_event_instance.object_id,
+    ))
+
+
+def latest_event(events):
+    """
+    The event with the most recent object data, from claimed events (oldest data first), or None
+
+    Objects without an "updated" time (i.e. invoices, subscriptions, customers) are versioned by when the event was
+    created, so several events can have the same version, and it is not known which of them has the latest data.
+    The version of the returned event is then cleared, so the object is synced from the API (see sync_from_event)
+    """
+    if not events:
+        return None
+    event = events[-1]
+    if len(events) > 1 and event.object_version and events[-2].object_version == event.object_version:
+        log.info(f"{len(events)} events for {event.object_type} {event.object_id} have the same version")
+        event.object_version = None
+    return event
+
+
+def release_events(events, refreshed=False, processed=False):
+    """
+    Record the outcome of claimed events, and release the claim so unprocessed events can be tried again
+    """
+    if not events:
+        return 0
+    return StripeWebhookEvent.objects.filter(id__in=[ee.id for ee in events], claimed_by=events[0].claimed_by).update(
+        refreshed=refreshed, processed=processed, claimed_by=None, claimed_at=None, last_updated=timezone.now()
+    )
+
+
 def stripe_model_refresh(webhook_event_instance):
     """
     From a stripe object-type and ID, create or refresh the Django model representation of the object
@@ -48,6 +160,27 @@ def stripe_model_refresh(webhook_event_instance):
     return refreshed
 
 
+def sync_from_event(model, event):
+    """
+    Update a model with the object data sent in the webhook event, rather than fetching it from the API.
+
+    Events may arrive (or be processed) out of order, so the event's data is compared to the model's synced_as_of:
+        - older: the model already has newer data, so there is nothing to do
+        - same second, or no data saved with the event: fetch the current data from the API
+        - newer: apply the event's data (the model will still call the API if it needs expanded fields)
+    """
+    version = event.object_version
+    as_of = model.synced_as_of
+    if version and as_of and version < as_of:
+        log.info(f"{model} has data newer than event {event.event_id}")
+        return True
+
+    api_data = event.object_data if version and (not as_of or version > as_of) else None
+    if api_data is None:
+        return model.sync()
+    return model.sync(api_data, as_of=version)
+
+
 def _handle_customer_event(event):
     # If a customer was deleted
     if event.event_type == "deleted":
@@ -61,7 +194,7 @@ def _handle_customer_event(event):
     # Refresh customer with latest data
     else:
         model = StripeCustomer.from_stripe_id(event.object_id, event.account_id)
-        return model.sync()
+        return sync_from_event(model, event)
 
 
 def _handle_invoice_event(event):
@@ -76,7 +209,7 @@ def _handle_invoice_event(event):
     # Refresh invoice with latest data
     else:
         model = StripeInvoice.from_stripe_id(event.object_id, event.account_id)
-        return model.sync()
+        return sync_from_event(model, event)
 
 
 def _handle_subscription_event(event):
@@ -88,7 +221,7 @@ def _handle_subscription_event(event):
             del_obj.save()
         return True
     model = StripeSubscription.from_stripe_id(event.object_id, event.account_id)
-    return model.sync()
+    return sync_from_event(model, event)
 
 
 def _handle_checkout_session_event(event):
@@ -100,7 +233,7 @@ def _handle_checkout_session_event(event):
             del_obj.save()
         return True
     co = StripeCheckoutSession.from_stripe_id(event.object_id, event.account_id)
-    return co.sync()
+    return sync_from_event(co, event)
 
 def _handle_product_event(event):
     if event.event_type == "product.deleted":
@@ -111,7 +244,7 @@ def _handle_product_event(event):
             del_obj.save()
         return True
     model = StripeProduct.from_stripe_id(event.object_id, event.account_id)
-    return model.sync()
+    return sync_from_event(model, event)
 
 def _handle_price_event(event):
     if event.event_type == "price.deleted":
@@ -122,7 +255,7 @@ def _handle_price_event(event):
             del_obj.save()
         return True
     model = StripePrice.from_stripe_id(event.object_id, event.account_id)
-    return model.sync()
+    return sync_from_event(model, event)
 
 def _handle_account_event(event):
     if event.event_type == "account.deleted":
@@ -133,159 +266,4 @@ def _handle_account_event(event):
             del_obj.save()
         return True
     model = StripeConnectedAccount.from_stripe_id(event.object_id)
-    return model.sync()
-
-
-
-
-
-
-# ToDo: Should not be needed anymore:
-def react_to_events():
-    """
-    Webhook events get recorded to the Django database.
-    This endpoint refreshes any models tied to the objects in those events
-    (customers, subscriptions, and invoices)
-    """
-    webhook_events = StripeWebhookEvent.objects.filter(refreshed=False)
-    processed_object_ids = []
-    processed_events = []
-
-    # Some objects are currently not being tracked locally
-    ignore = [
-        "payment_intent", "invoiceitem", "credit_note",
-        "setup_intent", "charge", "payment_method",
-        "checkout.session", "capability",
-    ]
-
-    for event in webhook_events:
-        object_type = event.object_type
-        parts = event.event_type.split(".")
-        event_type = parts[len(parts)-1]
-
-        # Some objects are currently not being tracked locally
-        if object_type in ignore:
-            processed_events.append(event)
-            continue
-
-        """
-        INVOICES
-        """
-        if object_type == "invoice":
-            # If a new invoice was created, insert a local record to track it
-            if event_type == "created":
-                if StripeInvoice.from_stripe_id(event.object_id, event.account_id):
-                    processed_object_ids.append(event.object_id)
-                    processed_events.append(event)
-                continue
-
-            # If a draft invoice was deleted
-            elif event_type == "deleted":
-                del_inv = StripeInvoice.get(event.object_id)
-                if del_inv:
-                    log.info(f"Invoice #{del_inv.id} was deleted in Stripe: {event.object_id}")
-                    del_inv.status = "deleted"
-                    del_inv.save()
-                    processed_object_ids.append(event.object_id)
-                    processed_events.append(event)
-                continue
-
-            # If object processed as insert or delete, data is current and does not need to be updated
-            elif event.object_id in processed_object_ids:
-                processed_events.append(event)
-                continue
-
-            # Refresh invoice with latest data
-            else:
-                # The create function will return an existing record, or create if needed
-                inv = StripeInvoice.from_stripe_id(event.object_id, event.account_id)
-                if inv.sync():
-                    processed_object_ids.append(event.object_id)
-                    processed_events.append(event)
-                continue
-
-
-        """
-        CUSTOMERS
-        """
-        if object_type == "customer":
-            # If a new customer was created, insert a local record to track it
-            if event_type == "created":
-                if StripeCustomer.obtain(stripe_id=event.object_id):
-                    processed_object_ids.append(event.object_id)
-                    processed_events.append(event)
-                continue
-
-            # If a customer was deleted
-            elif event_type == "deleted":
-                cust = StripeCustomer.get(event.object_id)
-                if cust:
-                    log.info(f"Deleting customer #{cust.id}: {event.object_id}")
-                    cust.status = "deleted"
-                    cust.save()
-                    processed_object_ids.append(event.object_id)
-                    processed_events.append(event)
-                continue
-
-            # If object processed as insert or delete, data is current and does not need to be updated
-            elif event.object_id in processed_object_ids:
-                processed_events.append(event)
-                continue
-
-            # Refresh customer with latest data
-            else:
-                cust = StripeCustomer.obtain(stripe_id=event.object_id)
-                if cust.sync():
-                    processed_object_ids.append(event.object_id)
-                    processed_events.append(event)
-                continue
-
-
-        """
-        SUBSCRIPTIONS
-        """
-        if object_type == "subscription":
-
-            # If a new subscription was created, insert a local record to track it
-            if event_type == "created":
-                if StripeSubscription.from_stripe_id(event.object_id, event.account_id):
-                    processed_object_ids.append(event.object_id)
-                    processed_events.append(event)
-                continue
-
-            # If object processed as insert, data is current and does not need to be updated
-            elif event.object_id in processed_object_ids:
-                processed_events.append(event)
-                continue
-
-            # Refresh subscription with latest data
-            else:
-                sub = StripeSubscription.from_stripe_id(event.object_id, event.account_id)
-                if sub.sync():
-                    processed_object_ids.append(event.object_id)
-                    processed_events.append(event)
-                continue
-
-        """
-        CONNECTED_ACCOUNTS
-        """
-        if object_type == "account":
-            ca = StripeConnectedAccount.from_stripe_id(event.object_id, event.account_id)
-            if ca and ca.sync():
-                processed_object_ids.append(event.object_id)
-                processed_events.append(event)
-            continue
-
-    # Mark Webhook Events as "refreshed"
-    try:
-        if processed_events:
-            for whe in processed_events:
-                whe.refreshed = True
-            StripeWebhookEvent.objects.bulk_update(processed_events, ['refreshed'])
-    except Exception as ee:
-        Error.record(ee)
-
-    return {
-        "processed_events": len(processed_events),
-    }
-
+    return sync_from_event(model, event)
@@ -0,0 +1,23 @@
+from celery import shared_task
+from base_stripe.services import reconcile_service
+from base.classes.util.log import Log
+
+log = Log()
+
+
+@shared_task(bind=True)
+def reconcile_stripe_events(self, limit=None):
+    """
+    Refresh the models for webhook events that were not refreshed when received (see reconcile_service.reconcile)
+
+    Scheduled by celery beat (settings.CELERY_BEAT_SCHEDULE). Progress is reported as the task's state
+    (PROGRESS, with the metrics so far), and the final metrics are the task's result.
+    """
+    def progress(metrics):
+        if self.request.id:
+            try:
+                self.update_state(state="PROGRESS", meta=metrics)
+            except Exception as ee:
+                log.warning(f"Could not report reconciliation progress: {ee}")
+
+    return reconcile_service.reconcile(limit, progress)
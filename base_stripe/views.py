@@ -4,12 +4,15 @@ from base.models.utility.error import Error
 from base.classes.util.env_helper import Log, EnvHelper
 from base_stripe.services import product_service
 from django.views.decorators.csrf import csrf_exempt
-import stripe
+from base.classes.util.lazy_import import lazy_import
 from base_stripe.models.events import StripeWebhookEvent
 from base_stripe.services import webhook_service, config_service
-from the_hangar_hub.tasks import process_stripe_event
+from the_hangar_hub.tasks import queue_stripe_event
+from base_stripe.tasks import reconcile_stripe_events
 from base_stripe.models.connected_account import StripeConnectedAccount
 
+stripe = lazy_import("stripe")
+
 
 log = Log()
 env = EnvHelper()
@@ -23,7 +26,7 @@ def webhook(request):
         result = StripeWebhookEvent.receive(request)
         status_code = result if str(result).isnumeric() else 200
         if status_code == 200:
-            process_stripe_event.delay(result.id)
+            queue_stripe_event(result)
         return HttpResponse(status=status_code)
     except Exception as ee:
         Error.record(ee)
@@ -32,10 +35,15 @@ def webhook(request):
 def react_to_events(request):
     """
     Webhook events get recorded to the Django database.
-    This endpoint refreshes any models tied to the objects in those events
-    (customers, subscriptions, and invoices)
+    This endpoint queues the (normally scheduled) task that refreshes any models tied to events that
+    were not refreshed when received. Progress can be followed in flower.
     """
-    return JsonResponse(webhook_service.react_to_events())
+    try:
+        result = reconcile_stripe_events.delay()
+        return JsonResponse({"task_id": result.id})
+    except Exception as ee:
+        Error.record(ee)
+        return JsonResponse({"error": "Unable to queue reconciliation task"}, status=500)
 
 def reset_sandbox(request):
     """
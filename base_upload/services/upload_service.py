@@ -1,30 +1,49 @@
 from base.classes.auth.session import Log, Auth, EnvHelper, AppData
+from base.classes.util.session_collections import SessionLRUSet
 from base.services import message_service
 from base.models.utility.error import Error
 from base_upload.models.uploaded_file import UploadedFile
 from base_upload.models.database_file import DatabaseFile
 from django.conf import settings
 import os
-import magic
+from base.classes.util.lazy_import import lazy_import
 import tempfile
 import base64
 import io
 import hashlib
 from io import BytesIO
-from PIL import Image, ExifTags
 from django.core.files.base import ContentFile
 from django.db import models
 from pathlib import Path
 
+magic = lazy_import("magic")
+Image = lazy_import("PIL.Image")
+ExifTags = lazy_import("PIL.ExifTags")
+
 log = Log()
 env = EnvHelper()
 app = AppData()
 
+# IDs of database files linked to in this session (viewable without owning the file)
+allowed_file_ids = SessionLRUSet("allowed_file_ids", max_size=500, max_age=24*60*60)
+
 
 def using_file_system():
     # Store uploaded files in filesystem (as opposed to database storage)
     return True
 
+def allow_file_link(file_id):
+    """
+    Allow the file to be viewed via the upload:linked_file view for the rest of the session
+    (only the most recently linked files are remembered)
+    """
+    return allowed_file_ids.add(file_id)
+
+
+def file_link_allowed(file_id):
+    return file_id in allowed_file_ids
+
+
 def using_s3():
     if env.is_development:
         return False
@@ -97,11 +97,7 @@ class FileLinkNode(template.Node):
             try:
                 file_url = reverse("upload:linked_file", args=[file_instance.id])
                 # In order for the link to work, the ID must exist in the session
-                allowed_files = env.get_session_variable("allowed_file_ids", [])
-                allowed_files.append(file_instance.id)
-                env.set_session_variable(
-                    "allowed_file_ids", list(set(allowed_files))
-                )
+                upload_service.allow_file_link(file_instance.id)
 
             except Exception as ee:
                 Error.record(ee, f"Could not link to file: {file_instance.id}")
@@ -204,13 +200,7 @@ class FilePreviewNode(template.Node):
                 try:
                     file_url = reverse("upload:linked_file", args=[file_instance.id])
                     # In order for the link to work, the ID must exist in the session
-                    allowed_files = env.get_session_variable(
-                        "allowed_file_ids", []
-                    )
-                    allowed_files.append(file_instance.id)
-                    env.set_session_variable(
-                        "allowed_file_ids", list(set(allowed_files))
-                    )
+                    upload_service.allow_file_link(file_instance.id)
 
                 except NoReverseMatch as ee:
                     log.warning(
@@ -1,7 +1,7 @@
 from django.http import HttpResponse, Http404, HttpResponseForbidden
 from base.classes.util.env_helper import Log, EnvHelper
 from base.classes.auth.session import Auth
-from base_upload.services import retrieval_service
+from base_upload.services import retrieval_service, upload_service
 from base_upload.models.database_file import DatabaseFile
 
 
@@ -45,8 +45,7 @@ def linked_file(request, file_id):
 
     # If not allowed via authentication, check session for specified file allowances
     if not allowed:
-        allowed_files = env.get_session_variable("allowed_file_ids", [])
-        if allowed_files and file_id in allowed_files:
+        if upload_service.file_link_allowed(file_id):
             allowed = True
 
     if not allowed:
@@ -3,6 +3,9 @@ from celery import Celery
 
 """
 celery -A the_hangar_hub worker --loglevel=info --pool=solo
+
+Stripe webhook events are routed to settings.STRIPE_EVENT_QUEUES queues (stripe_events_0, stripe_events_1, ...)
+by a hash of the Stripe object ID. A worker started without -Q (as above) consumes all of them, in order.
 """
 
 # Set default Django settings module
@@ -27,6 +30,19 @@ Development (single terminal):
     bashcelery -A yourproject worker --loglevel=info
 Development (with auto-reload on code changes):
     bashcelery -A yourproject worker --loglevel=info --pool=solo
+
+Production (parallel webhook processing):
+    Events for the same Stripe object must be applied in order, so each stripe_events_N queue is consumed by
+    exactly one single-process worker. Different objects (and connected accounts) are processed in parallel.
+        celery -A the_hangar_hub worker -Q celery --loglevel=info
+        celery -A the_hangar_hub worker -Q stripe_events_0 --concurrency=1 --prefetch-multiplier=1 -n stripe0@%h
+        celery -A the_hangar_hub worker -Q stripe_events_1 --concurrency=1 --prefetch-multiplier=1 -n stripe1@%h
+        ... (one per queue; see: python -m base.benchmarks.bench_webhook_queues)
+    Or with celery multi (4 queues):
+        celery multi start 4 -A the_hangar_hub -c 1 --prefetch-multiplier=1 \\
+            -Q:1 stripe_events_0 -Q:2 stripe_events_1 -Q:3 stripe_events_2 -Q:4 stripe_events_3
+    Scheduled tasks (settings.CELERY_BEAT_SCHEDULE), i.e. reconciling missed Stripe webhook events:
+        celery -A the_hangar_hub beat --loglevel=info
     
     
 Production (using systemd service):
@@ -0,0 +1,103 @@
+from base.classes.util.env_helper import EnvHelper, Log
+from base.classes.auth.session import Auth
+from the_hangar_hub.models.airport_manager import AirportManager
+from the_hangar_hub.models.rental_models import RentalAgreement, tenant_link_version
+from the_hangar_hub.services import tenant_s
+
+log = Log()
+env = EnvHelper()
+
+# Session flag: unlinked Tenant records have already been searched for this user (holds the tenant_link_version)
+tenant_link_checked_var = "thh-tenant-link-checked"
+
+
+class AirportContext:
+    """
+    The current user's relationships to airports, resolved once per request.
+
+    Built by the AirportMiddleware and attached to the request as request.airport_context.
+    Manager and tenant relationships are each fetched with a single query (for all airports),
+    and re-used by the decorators and context processor.
+    """
+    airport = None
+    user = None
+
+    # Airports the user actively manages
+    managed_airports = None
+
+    # Present and near-future rental agreements (at any airport)
+    rentals = None
+
+    @property
+    def is_a_manager(self):
+        return bool(self.managed_airports)
+
+    @property
+    def is_a_tenant(self):
+        return bool(self.rentals)
+
+    @property
+    def manages_this_airport(self):
+        return bool(self.airport) and self.airport.id in [ap.id for ap in self.managed_airports]
+
+    @property
+    def airport_rentals(self):
+        """Relevant rental agreements at the selected airport"""
+        if not self.airport:
+            return []
+        return [rr for rr in self.rentals if rr.airport_id == self.airport.id]
+
+    @property
+    def based_at_this_airport(self):
+        """Does the user have a PRESENT rental agreement at the selected airport"""
+        return bool([rr for rr in self.airport_rentals if rr.is_present()])
+
+    def _load_managed_airports(self):
+        self.managed_airports = []
+        if self.user and self.user.id:
+            manages = AirportManager.objects.filter(
+                user=self.user, status_code="A"
+            ).select_related("airport", "user")
+            self.managed_airports = [mgmt.airport for mgmt in manages if mgmt.is_active]
+
+    def _load_rentals(self):
+        self.rentals = []
+        if not (self.user and self.user.id):
+            return
+
+        self.rentals = list(
+            RentalAgreement.relevant_rental_agreements().filter(
+                tenant__user=self.user
+            ).select_related("airport", "tenant", "hangar__building__airport")
+        )
+
+        # Tenant records created before the user signed up are linked by email
+        # (searched again only when a Tenant or RentalAgreement has been created since the last search)
+        version = tenant_link_version()
+        if not self.rentals and env.get_session_variable(tenant_link_checked_var) != version:
+            env.set_session_variable(tenant_link_checked_var, version)
+            self.rentals = list(tenant_s.get_rental_agreements(self.user) or [])
+
+    def __init__(self, airport=None, user=None):
+        self.airport = airport
+        self.user = user if user is not None else Auth.current_user()
+        self._load_managed_airports()
+        self._load_rentals()
+
+    @classmethod
+    def get(cls, request=None):
+        """
+        Get the context built for this request (or build one if the middleware did not)
+        """
+        request = request or env.request
+        context = getattr(request, "airport_context", None)
+        if context is None:
+            context = cls(getattr(request, "airport", None))
+            request.airport_context = context
+        return context
+
+    def __str__(self):
+        return f"AirportContext: {self.airport} ({self.user})"
+
+    def __repr__(self):
+        return str(self)
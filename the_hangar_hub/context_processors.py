@@ -1,7 +1,9 @@
 from base.classes.util.app_data import Log, EnvHelper, AppData
 from base.classes.auth.session import Auth
-from the_hangar_hub.services import airport_service, tenant_s, application_service
+from the_hangar_hub.services import application_service
+from the_hangar_hub.classes.airport_context import AirportContext
 from the_hangar_hub.models.airport import Amenity
+from django.utils.functional import SimpleLazyObject
 
 
 log = Log()
@@ -10,6 +12,9 @@ app = AppData()
 
 
 def airport_data(request):
+    """
+    Values that require a lookup are lazy (only computed if the template uses them)
+    """
     if request.path.startswith("/accounts/"):
         return {}
 
@@ -20,34 +25,33 @@ def airport_data(request):
     manages_this_airport = request.manages_this_airport if hasattr(request, "manages_this_airport") else False
     based_at_this_airport = request.based_at_this_airport if hasattr(request, "based_at_this_airport") else False
 
-    # If a manager manages multiple airports, there will be admin links for each airport in the nav bar
-    managed_airports = airport_service.managed_airports()
+    # Manager/tenant relationships are resolved once for this request
+    airport_context = SimpleLazyObject(lambda: AirportContext.get(request))
 
-    # If a tenant has multiple hangars, maybe at multiple airports, they'll see links for each in their navbar
-    # Check this even if not a tenant, as there could be past rental agreements
-    rentals = tenant_s.get_rental_agreements(Auth.current_user())
+    def amenity_reviews():
+        if Auth.current_user_profile().has_authority("developer"):
+            return Amenity.objects.filter(approved=False).count()
+        return 0
 
-    # If unsubmitted application exists, there will be reminders to complete it
-    open_applications = application_service.get_active_applications()
-
-    # If an airport manager selected an application to assign a hangar to...
-    selected_application = application_service.get_selected_application()
-
-    amenity_reviews = 0
-    if Auth.current_user_profile().has_authority("developer"):
-        amenity_reviews = Amenity.objects.filter(approved=False).count()
-
-    model = {
+    return {
         "airport": airport,
-        "is_a_manager": bool(managed_airports),
+        "is_a_manager": SimpleLazyObject(lambda: airport_context.is_a_manager),
         "manages_this_airport": manages_this_airport,
-        "is_a_tenant": bool(rentals),
+        "is_a_tenant": SimpleLazyObject(lambda: airport_context.is_a_tenant),
         "based_at_this_airport": based_at_this_airport,
-        "managed_airports": managed_airports,
-        "my_rentals": rentals,
-        "open_applications": len(open_applications),
-        "selected_application": selected_application,
-        "amenity_reviews": amenity_reviews,
-    }
-    return model
 
+        # If a manager manages multiple airports, there will be admin links for each airport in the nav bar
+        "managed_airports": SimpleLazyObject(lambda: airport_context.managed_airports),
+
+        # If a tenant has multiple hangars, maybe at multiple airports, they'll see links for each in their navbar
+        # Check this even if not a tenant, as there could be past rental agreements
+        "my_rentals": SimpleLazyObject(lambda: airport_context.rentals),
+
+        # If unsubmitted application exists, there will be reminders to complete it
+        "open_applications": SimpleLazyObject(lambda: len(application_service.get_active_applications())),
+
+        # If an airport manager selected an application to assign a hangar to...
+        "selected_application": SimpleLazyObject(application_service.get_selected_application),
+
+        "amenity_reviews": SimpleLazyObject(amenity_reviews),
+    }
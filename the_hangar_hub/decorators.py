@@ -5,6 +5,7 @@ from functools import wraps
 from base.decorators import decorator_sso_redirect, decorator_redirect
 from the_hangar_hub.services import airport_service, tenant_s
 from the_hangar_hub.models.airport import Airport
+from the_hangar_hub.classes.airport_context import AirportContext
 from django.shortcuts import render, redirect
 
 log = Log()
@@ -53,7 +54,7 @@ def require_airport_manager(redirect_url='/'):
                 return decorator_sso_redirect(request)
 
             # If user is manager for the current airport, render the view
-            elif airport_service.manages_this_airport():
+            elif AirportContext.get(request).manages_this_airport:
                 return view_func(request, *args, **kwargs)
 
             # Otherwise, send somewhere else
@@ -78,8 +79,8 @@ def require_airport_tenant():
             if not request.user.is_authenticated:
                 return decorator_sso_redirect(request)
 
-            # Get tenant rentals
-            rentals = tenant_s.get_rental_agreements(Auth.current_user())
+            # Get tenant rentals (resolved once per request)
+            rentals = AirportContext.get(request).rentals
             if not rentals:
                 return render(
                     request, "the_hangar_hub/error_pages/tenants_only.html",
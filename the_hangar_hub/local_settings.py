@@ -0,0 +1,5 @@
+DEBUG = True
+SECRET_KEY = "local-test-key"
+ENVIRONMENT = "LOCAL"
+HOST_URL = "http://localhost:8000"
+ALLOWED_HOSTS = ["*"]
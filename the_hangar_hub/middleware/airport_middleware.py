@@ -5,6 +5,7 @@ from base.classes.util.app_data import Log, EnvHelper
 from the_hangar_hub.services import airport_service, tenant_s
 from the_hangar_hub.models.airport import Airport
 from the_hangar_hub.models.application import HangarApplication
+from the_hangar_hub.classes.airport_context import AirportContext
 
 log = Log()
 env = EnvHelper()
@@ -66,7 +67,7 @@ class AirportMiddleware:
         if application_id:
             ha = HangarApplication.get(application_id)
             if ha:
-                request.airport = ha.airport
+                request.airport = Airport.get(ha.airport_id)
                 airport_service.save_airport_selection(request.airport)
 
         # If an airport was found...
@@ -74,10 +75,11 @@ class AirportMiddleware:
             # Activate the airport's timezone
             request.airport.activate_timezone()
 
-            # Store airport tenant/manager status in the request
+            # Resolve the user's manager/tenant relationships once, and store them in the request
             if request.user.is_authenticated:
-                request.manages_this_airport = airport_service.manages_this_airport()
-                request.based_at_this_airport = airport_service.is_tenant()
+                request.airport_context = AirportContext(request.airport)
+                request.manages_this_airport = request.airport_context.manages_this_airport
+                request.based_at_this_airport = request.airport_context.based_at_this_airport
 
             return view_func(request, *view_args, **view_kwargs)
 
@@ -11,8 +11,8 @@ from the_hangar_hub.services import stripe_service
 from base.models.utility.error import Error, Log, EnvHelper
 from decimal import Decimal
 from datetime import datetime, timezone
-from base.services import date_service, utility_service
-from django.db.models.signals import post_delete
+from base.services import date_service, utility_service, cache_service
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from base_upload.services import retrieval_service
 from base.classes.util.date_helper import DateHelper
@@ -21,6 +21,9 @@ import os
 log = Log()
 env = EnvHelper()
 
+# Seconds to keep airport identifiers (mapped to primary keys) in the shared cache
+airport_cache_timeout = 60 * 60
+
 class Airport(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
@@ -229,18 +232,43 @@ class Airport(models.Model):
 
     @classmethod
     def get(cls, id_or_ident):
+        """
+        Get an airport by ID or identifier (case-insensitive)
+        Identifiers are mapped to primary keys in the cache, and the airport is always loaded from the database
+        (a cached instance could be saved over newer changes)
+        """
         log.trace([id_or_ident])
         try:
-            if str(id_or_ident).isnumeric():
-                return cls.objects.get(pk=id_or_ident)
-            else:
-                return cls.objects.get(identifier__iexact=id_or_ident)
+            if id_or_ident is None or str(id_or_ident).strip() == "":
+                return None
+            elif str(id_or_ident).isnumeric():
+                return cls.objects.get(pk=int(id_or_ident))
+
+            # Identifier maps to a primary key, so an identifier change cannot return the wrong airport
+            identifier = str(id_or_ident).strip().upper()
+            pk = cache_service.get(cls._identifier_cache_key(identifier), namespace="airport")
+            if pk:
+                airport = cls.objects.filter(pk=pk).first()
+                if airport and airport.identifier.upper() == identifier:
+                    return airport
+
+            airport = cls.objects.get(identifier__iexact=identifier)
+            cache_service.set(cls._identifier_cache_key(identifier), airport.pk, airport_cache_timeout)
+            return airport
+
         except cls.DoesNotExist:
             return None
         except Exception as ee:
             log.error(f"Could not get airport: {ee}")
             return None
 
+    @staticmethod
+    def _identifier_cache_key(identifier):
+        return f"airport:identifier:{str(identifier).upper()}"
+
+    def clear_cache(self):
+        cache_service.delete(self._identifier_cache_key(self.identifier))
+
     def __str__(self):
         return f"Airport: {self.identifier} ({self.id})"
 
@@ -393,6 +421,13 @@ class BlogEntry(models.Model):
             log.error(f"Could not get {cls}: {ee}")
             return None
 
+# Remove the cached identifier when the Airport is saved or deleted
+@receiver(post_save, sender=Airport)
+@receiver(post_delete, sender=Airport)
+def clear_airport_cache(sender, instance, **kwargs):
+    instance.clear_cache()
+
+
 # Delete the file from storage when the BlogEntry is deleted
 @receiver(post_delete, sender=BlogEntry)
 def delete_blog_image_on_delete(sender, instance, **kwargs):
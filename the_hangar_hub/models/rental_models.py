@@ -6,10 +6,16 @@ from datetime import datetime, timezone, timedelta
 from base_stripe.models.payment_models import StripeSubscription
 from django.db.models import Q
 from base.classes.util.date_helper import DateHelper
-from base.services import utility_service
+from base.services import utility_service, cache_service
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+import time
 
 log = Log()
 
+# Cache key: changes whenever a Tenant or RentalAgreement is saved (see AirportContext._load_rentals)
+tenant_link_version_key = "thh.tenant_link_version"
+
 
 """
 TENANT
@@ -480,4 +486,19 @@ class RentalInvoice(models.Model):
             return None
         except Exception as ee:
             log.error(f"Could not get {cls}: {ee}")
-            return None
\ No newline at end of file
+            return None
+
+
+def tenant_link_version():
+    """
+    Identifies the current state of Tenant records, so a search for unlinked Tenants can be repeated when it changes
+    """
+    return cache_service.get(tenant_link_version_key) or 0
+
+
+# A user who had no Tenant record to link to may have one now
+@receiver(post_save, sender=Tenant)
+@receiver(post_save, sender=RentalAgreement)
+def update_tenant_link_version(sender, instance, created, **kwargs):
+    if created:
+        cache_service.set(tenant_link_version_key, time.time_ns())
@@ -1,5 +1,6 @@
 import the_hangar_hub.models.infrastructure_models
 from base.classes.util.env_helper import Log, EnvHelper
+from base.classes.util.request_memo import request_memo, per_request
 from base.classes.auth.session import Auth
 from the_hangar_hub.models.airport import Airport
 from the_hangar_hub.models.airport_manager import AirportManager
@@ -11,33 +12,30 @@ from base.models.utility.error import Error
 log = Log()
 env = EnvHelper()
 
+@request_memo("airport.manages_this_airport")
 def manages_this_airport():
     """
     Does the current user manage the currently selected airport
 
     Can only be true when there is a selected airport in the request
     """
-    result = env.recall()
-    if result is None:
-        airport = env.request.airport
-        user = Auth.current_user()
-        if not airport:
-            result = False
-        elif not user.is_authenticated:
-            result = False
-        else:
-            result = is_airport_manager(user, airport)
-        env.store(result)
-    return result
+    # Already resolved by the AirportMiddleware
+    airport_context = getattr(env.request, "airport_context", None)
+    if airport_context is not None:
+        return airport_context.manages_this_airport
+
+    airport = env.request.airport
+    user = Auth.current_user()
+    if not airport:
+        return False
+    elif not user.is_authenticated:
+        return False
+    else:
+        return is_airport_manager(user, airport)
 
-def is_airport_manager(user=None, airport=None):
-    use_recall = user is None and airport is None
-    result = None
-    if use_recall:
-        result = env.recall()
-        if result is not None:
-            return result
 
+@per_request(key="airport.is_airport_manager")
+def is_airport_manager(user=None, airport=None):
     log.trace([user, airport])
     user = Auth().lookup_user(user_data=user) if user else Auth.current_user()
     if can_query_user(user):
@@ -47,8 +45,6 @@ def is_airport_manager(user=None, airport=None):
         result = bool([mgmt for mgmt in manages if mgmt.is_active])
     else:
         result = False
-    if use_recall:
-        env.store(result)
     return result
 
 
@@ -56,13 +52,8 @@ def is_tenant(user=None, airport=None):
     return bool(get_airport_tenant_rentals(user, airport))
 
 
+@per_request(key="airport.tenant_rentals")
 def get_airport_tenant_rentals(user=None, airport=None):
-    use_recall = user is None and airport is None
-    if use_recall:
-        result = env.recall()
-        if result is not None:
-            return result
-
     user = Auth().lookup_user(user) if user else Auth.current_user()
     airport = env.request.airport if not airport else airport
     if not (user and airport):
@@ -70,8 +61,6 @@ def get_airport_tenant_rentals(user=None, airport=None):
 
     try:
         result = RentalAgreement.present_rental_agreements().filter(tenant__user=user, airport=airport)
-        if use_recall:
-            env.store(result)
     except Exception as ee:
         result = None
         Error.unexpected(
@@ -89,9 +78,10 @@ def get_airport_tenant_rentals(user=None, airport=None):
 
 
 def save_airport_selection(airport):
-    env.set_session_variable(
-        "thh-selected-airport", airport.identifier if type(airport) is Airport else airport
-    )
+    selection = airport.identifier if type(airport) is Airport else airport
+    # Only modify the session when the selection changes
+    if selection != get_airport_selection():
+        env.set_session_variable("thh-selected-airport", selection)
 
 def get_airport_selection():
     return env.get_session_variable("thh-selected-airport")
@@ -160,20 +150,18 @@ def get_managed_hangar(airport_identifier, hangar_identifier, post_error=True):
     return hangar
 
 
+@per_request(key="airport.managed_airports")
 def managed_airports(user=None):
-    use_recall = user is None
-    if use_recall:
-        mas = env.recall()
-        if mas is not None:
-            return mas
+    # Current user's airports were already resolved by the AirportMiddleware
+    airport_context = getattr(env.request, "airport_context", None) if user is None else None
+    if airport_context is not None:
+        return airport_context.managed_airports
 
     manages = []
     user = Auth().lookup_user(user_data=user) if user else Auth.current_user()
     if can_query_user(user):
         manages = AirportManager.objects.filter(user=user, status_code="A").select_related("airport")
         manages = [mgmt.airport for mgmt in manages if mgmt.is_active]
-    if use_recall:
-        env.store(manages)
     return manages
 
 def managed_airport_identifiers(user=None):
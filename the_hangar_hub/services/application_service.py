@@ -1,5 +1,6 @@
 import the_hangar_hub.models.infrastructure_models
 from base.classes.util.env_helper import Log, EnvHelper
+from base.classes.util.request_memo import per_request
 from base.classes.auth.session import Auth
 from the_hangar_hub.models import Hangar
 from the_hangar_hub.models.rental_models import Tenant, RentalAgreement
@@ -13,18 +14,11 @@ log = Log()
 env = EnvHelper()
 
 
+@per_request(key="application.user_applications")
 def get_applications(user=None):
-    use_recall = user is None
-    if use_recall:
-        result = env.recall()
-        if result is not None:
-            return result
     user = Auth().lookup_user(user) if user else Auth.current_user()
     if user and user.id:
-        apps = HangarApplication.objects.filter(user=user).order_by("-last_updated")
-        if use_recall:
-            env.store(apps)
-        return apps
+        return HangarApplication.objects.filter(user=user).order_by("-last_updated")
     return []
 
 
@@ -1,13 +1,15 @@
 from django.contrib.messages import success
 
 from base.models.utility.error import EnvHelper, Log, Error
-import stripe
+from base.classes.util.lazy_import import lazy_import
 from base.services import message_service
 from base.services.message_service import post_success
 from base_stripe.services.config_service import set_stripe_api_key
 from datetime import datetime, timezone, timedelta
 from the_hangar_hub.services.rental import invoice_svc
 
+stripe = lazy_import("stripe")
+
 
 log = Log()
 env = EnvHelper()
@@ -12,12 +12,14 @@ from base.models.utility.variable import Variable
 from base.services import message_service, utility_service
 from datetime import datetime, timezone, timedelta
 from django.urls import reverse
-import stripe
+from base.classes.util.lazy_import import lazy_import
 from decimal import Decimal
 from the_hangar_hub.services.stripe import stripe_lookup_svc
 from the_hangar_hub.classes.checkout_session_helper import StripeCheckoutSessionHelper
 import random
 
+stripe = lazy_import("stripe")
+
 log = Log()
 env = EnvHelper()
 
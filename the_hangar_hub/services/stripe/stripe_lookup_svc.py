@@ -3,7 +3,9 @@ from base.models.utility.error import EnvHelper, Log, Error
 from base_stripe.services.config_service import set_stripe_api_key, get_stripe_address_dict
 from base_stripe.models.payment_models import StripeCheckoutSession, StripeSubscription, StripeCustomer
 from the_hangar_hub.models.rental_models import RentalAgreement
-import stripe
+from base.classes.util.lazy_import import lazy_import
+
+stripe = lazy_import("stripe")
 
 log = Log()
 env = EnvHelper()
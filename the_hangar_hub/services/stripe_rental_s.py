@@ -1,6 +1,6 @@
 from base.models.utility.error import EnvHelper, Log, Error
 from base.classes.auth.session import Auth
-import stripe
+from base.classes.util.lazy_import import lazy_import
 from decimal import Decimal
 from django.urls import reverse
 from base.services import message_service, utility_service, date_service
@@ -12,6 +12,8 @@ from base_stripe.models.payment_models import StripeInvoice as StripeInvoice
 from datetime import datetime, timezone, timedelta
 from the_hangar_hub.models.rental_models import RentalAgreement, RentalInvoice
 
+stripe = lazy_import("stripe")
+
 log = Log()
 env = EnvHelper()
 
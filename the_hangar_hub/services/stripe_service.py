@@ -2,7 +2,7 @@ from django.http import HttpResponseForbidden
 
 from base.models.utility.error import EnvHelper, Log, Error
 from base.classes.auth.session import Auth
-import stripe
+from base.classes.util.lazy_import import lazy_import
 from decimal import Decimal
 from django.urls import reverse
 from base.services import message_service
@@ -14,6 +14,8 @@ from base_stripe.models.payment_models import StripeCustomer
 from datetime import datetime, timezone, timedelta
 from base.models import Variable
 
+stripe = lazy_import("stripe")
+
 log = Log()
 env = EnvHelper()
 
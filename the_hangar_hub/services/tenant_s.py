@@ -1,4 +1,5 @@
 from base.classes.util.env_helper import Log, EnvHelper
+from base.classes.util.request_memo import per_request
 from the_hangar_hub.models.rental_models import Tenant, RentalAgreement
 
 log = Log()
@@ -19,21 +20,12 @@ def get_relevant_rental_agreements(tenant_data, airport=None):
     return [x for x in all_rental_agreements if not x.is_past()] if all_rental_agreements else []
 
 
+@per_request(key="tenant.rental_agreements")
 def get_rental_agreements(tenant_data, airport=None):
     tenant = get_tenant(tenant_data)
     if tenant:
-        key = f"{airport.identifier if airport else "none"}-{tenant.id}"
-        answer = env.get_page_scope(key)
-        if answer is None:
-            if airport:
-                return env.set_page_scope(
-                    key,
-                    RentalAgreement.relevant_rental_agreements().filter(tenant=tenant, airport=airport)
-                )
-            else:
-                return env.set_page_scope(
-                    key,
-                    RentalAgreement.relevant_rental_agreements().filter(tenant=tenant)
-                )
-        return answer
+        if airport:
+            return RentalAgreement.relevant_rental_agreements().filter(tenant=tenant, airport=airport)
+        else:
+            return RentalAgreement.relevant_rental_agreements().filter(tenant=tenant)
     return None
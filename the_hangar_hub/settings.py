@@ -14,6 +14,7 @@ from pathlib import Path
 import os
 from django.contrib.messages import constants as messages
 from csp.constants import SELF, UNSAFE_INLINE
+from kombu import Queue
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -229,6 +230,12 @@ SUPPORT_PHONE_NUMBER = "(503) 741-9401"
 # Session expiration
 SESSION_COOKIE_AGE = 30 * 60  # 30 minutes
 
+# Sessions are read from the cache, and written to the database in the background (see base.backends.session_store)
+SESSION_ENGINE = 'base.backends.session_store'
+SESSION_SERIALIZER = 'base.backends.session_serializer.CompactSerializer'
+SESSION_CACHE_ALIAS = 'shared'
+SESSION_WRITE_BEHIND_SECONDS = 10
+
 WSGI_APPLICATION = 'the_hangar_hub.wsgi.application'
 
 
@@ -265,21 +272,63 @@ CELERY_TIMEZONE = 'America/New_York'  # Match your TIME_ZONE setting
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes max per task
 
+# Stripe webhook events are spread over this many queues by object ID, each consumed by one worker process
+# (see the_hangar_hub/celery.py). A worker started without -Q consumes all of them.
+STRIPE_EVENT_QUEUES = int(os.environ.get('STRIPE_EVENT_QUEUES', 4))
+CELERY_TASK_DEFAULT_QUEUE = 'celery'
+CELERY_TASK_QUEUES = [Queue('celery')] + [Queue(f'stripe_events_{nn}') for nn in range(STRIPE_EVENT_QUEUES)]
+
+# Scheduled tasks (run: celery -A the_hangar_hub beat)
+CELERY_BEAT_SCHEDULE = {
+    'reconcile-stripe-events': {
+        'task': 'base_stripe.tasks.reconcile_stripe_events',
+        'schedule': 15 * 60,
+    },
+    'requeue-stripe-events': {
+        'task': 'the_hangar_hub.tasks.requeue_stripe_events',
+        'schedule': 15 * 60,
+    },
+}
+
 # For caching things (like database results)
+# Per-process LRU in front of Redis (falls back to a local-memory cache when Redis is unavailable)
+# Increase CACHE_VERSION when a release changes the structure of cached values (other deploys keep the cache)
+CACHE_VERSION = 1
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-        'LOCATION': 'django_cache',
+        'BACKEND': 'base.backends.tiered_cache.TieredCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+        'VERSION': CACHE_VERSION,
+        'OPTIONS': {
+            'LOCAL_MAX_ENTRIES': 5000,
+            'LOCAL_TIMEOUT': 5,
+            'RETRY_SECONDS': 30,
+            'SHARED_BACKEND': 'django_redis.cache.RedisCache',
+            'SHARED_OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+                'SOCKET_CONNECT_TIMEOUT': 0.5,
+                'SOCKET_TIMEOUT': 0.5,
+            },
+        }
     },
-    'redis': {
+    # For values that must be consistent across processes (no per-process tier): sessions and rate limits.
+    # If Redis is unavailable, sessions are read from the database instead, and rate limits are not applied.
+    'shared': {
         'BACKEND': 'django_redis.cache.RedisCache',
         'LOCATION': 'redis://127.0.0.1:6379/1',
+        'VERSION': CACHE_VERSION,
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'SOCKET_CONNECT_TIMEOUT': 0.5,
+            'SOCKET_TIMEOUT': 0.5,
+            'IGNORE_EXCEPTIONS': True,
         }
-    }
+    },
 }
 
+# Rate limit counters (base.services.rate_limit_service)
+RATE_LIMIT_CACHE_ALIAS = 'shared'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -351,6 +400,8 @@ if (not IS_DEPLOYED) and (not os.path.isdir('logs')):
     os.mkdir('logs')
 
 # Logging Settings
+# LOG_FORMAT=json writes one JSON object per line (with request id, path, user, and timing)
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'standard')
 if IS_DEPLOYED:
     LOGGING = {
         'version': 1,
@@ -360,6 +411,9 @@ if IS_DEPLOYED:
                 'format': "[%(asctime)s] %(levelname)s %(message)s",
                 'datefmt': "%d/%b/%Y %H:%M:%S"
             },
+            'json': {
+                '()': 'base.classes.util.log.JsonFormatter',
+            },
         },
         'handlers': {
             'null': {
@@ -369,7 +423,7 @@ if IS_DEPLOYED:
             'console': {
                 'level': 'DEBUG',
                 'class': 'logging.StreamHandler',
-                'formatter': 'standard'
+                'formatter': LOG_FORMAT
             },
         },
         'loggers': {
@@ -398,6 +452,9 @@ else:
                 'format': "[%(asctime)s] %(levelname)s %(message)s",
                 'datefmt': "%d/%b/%Y %H:%M:%S"
             },
+            'json': {
+                '()': 'base.classes.util.log.JsonFormatter',
+            },
         },
         'handlers': {
             'null': {
@@ -407,13 +464,13 @@ else:
             'console': {
                 'level': 'DEBUG',
                 'class': 'logging.StreamHandler',
-                'formatter': 'standard'
+                'formatter': LOG_FORMAT
             },
             'file': {
                 'level': 'DEBUG',
                 'class': 'logging.FileHandler',
                 'filename': 'logs/the_hangar_hub.log',
-                'formatter': 'standard'
+                'formatter': LOG_FORMAT
             },
         },
         'loggers': {
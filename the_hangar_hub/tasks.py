@@ -1,5 +1,7 @@
 from celery import shared_task
+from celery.exceptions import Retry, MaxRetriesExceededError
 from django.utils import timezone
+from datetime import timedelta
 from base_stripe.models.events import StripeWebhookEvent
 from base.models.utility.error import Error, Log, EnvHelper
 
@@ -7,7 +9,7 @@ from base_stripe.models.payment_models import StripeCustomer
 from base_stripe.models.payment_models import StripeInvoice
 from base_stripe.models.payment_models import StripeSubscription
 from base_stripe.models.payment_models import StripeCheckoutSession
-import stripe
+from base.classes.util.lazy_import import lazy_import
 
 from the_hangar_hub.models.rental_models import Tenant, RentalInvoice, RentalAgreement
 
@@ -15,12 +17,28 @@ from base_stripe.services import webhook_service
 from base_stripe.services.config_service import set_stripe_api_key
 from the_hangar_hub.models import Tenant, Airport
 
+stripe = lazy_import("stripe")
+
 log = Log()
 env = EnvHelper()
 
 
-@shared_task(bind=True, max_retries=3)
-def process_stripe_event(self, webhook_record_id):
+def queue_stripe_event(webhook_event):
+    """
+    Queue processing of a received webhook event
+
+    Events for the same object are processed together after a short delay (webhook_service.debounce),
+    and always go to the same (single worker) queue so they are processed in order (webhook_service.event_queue)
+    """
+    countdown = webhook_service.debounce(webhook_event)
+    if countdown is not None:
+        process_stripe_event.apply_async(
+            args=[webhook_event.id], countdown=countdown, queue=webhook_service.event_queue(webhook_event)
+        )
+
+
+@shared_task(bind=True, acks_late=True, max_retries=3)
+def process_stripe_event(self, webhook_record_id, claim_waits=0):
     """
     Process a Stripe webhook event
 
@@ -29,12 +47,23 @@ def process_stripe_event(self, webhook_record_id):
     Logs appear in the console running celery:
         celery -A the_hangar_hub worker --loglevel=info --pool=solo
 
+    Queue with queue_stripe_event() rather than calling delay(), so events for an object are processed in order
+
+    Events are claimed before processing, so it is safe for several workers (or retries) to run this
+    for the same event: only one of them will process it. The task is acknowledged when it finishes, so it is
+    delivered again if the worker is lost, and events left claimed by a lost worker are re-queued once their
+    claim expires (requeue_stripe_events)
+
+    claim_waits: Number of retries spent waiting for another worker's claim (not counted against max_retries,
+                 which is for errors)
+
     The returned values can be viewed via "flower"
         pip install flower
         celery -A the_hangar_hub flower
         Access at: http://localhost:5555
     """
     event = None
+    events = []
     log.debug(f"\n{'='*80}\nwebhook_record_id: {webhook_record_id}\n{'='*80}")
 
     # Objects that must be refreshed (sync) before being processed
@@ -44,14 +73,31 @@ def process_stripe_event(self, webhook_record_id):
     ]
 
     try:
-        event = StripeWebhookEvent.objects.select_for_update().get(id=webhook_record_id)
+        event = StripeWebhookEvent.objects.get(id=webhook_record_id)
 
         # Idempotency check
         if event.processed:
             log.info(f"Event {webhook_record_id} already processed, skipping")
             return f"Event {webhook_record_id} already processed"
 
-        # Sync local model with Stripe data
+        # Claim this event, and any others for the same object received while this task was waiting
+        events = webhook_service.claim_events(event)
+        if not events:
+            # Claimed by another worker, or by the reconcile task (which only refreshes the object, and does not
+            # run the handlers below). Try again once the claim has been released, or has expired
+            if StripeWebhookEvent.objects.filter(id=webhook_record_id, processed=False).exists():
+                log.info(f"Event {webhook_record_id} claimed by another worker, retrying")
+                # Wait (a minute at a time) until the claim would have expired
+                claim_seconds = env.get_setting("STRIPE_EVENT_CLAIM_SECONDS", 30 * 60)
+                errors = self.request.retries - claim_waits
+                raise self.retry(
+                    kwargs={"claim_waits": claim_waits + 1}, countdown=60, max_retries=errors + claim_seconds // 60 + 1
+                )
+            log.info(f"Event {webhook_record_id} processed by another worker, skipping")
+            return f"Event {webhook_record_id} processed by another worker"
+        event = webhook_service.latest_event(events)
+
+        # Sync local model with Stripe data (from the most recent event)
         refreshed = webhook_service.stripe_model_refresh(event)
 
         # Some objects do not require any additional processing
@@ -70,7 +116,7 @@ def process_stripe_event(self, webhook_record_id):
             processed = False
 
         else:
-            log.info(f"Processing event {webhook_record_id} of type {event.event_type}")
+            log.info(f"Processing event {event.id} of type {event.event_type}")
 
             # Route to appropriate handler
             processed = False
@@ -87,23 +133,57 @@ def process_stripe_event(self, webhook_record_id):
 
             # Add more event types as needed
 
-        # Record refreshed/processed state
-        event.refreshed = refreshed or False
-        event.processed = processed or False
-        event.save()
-        
-        log.info(f"Processed event {webhook_record_id}")
-        return f"Processed event {webhook_record_id}"
+        # Record refreshed/processed state of all claimed events
+        webhook_service.release_events(events, refreshed=refreshed or False, processed=processed or False)
+
+        # Each event used to sync the object (calling the API) separately
+        saved = len(events) - 1
+        log.info(f"Processed {len(events)} events for {event.object_type} {event.object_id} ({saved} syncs saved)")
+        return f"Processed {len(events)} events for {event.object_type} {event.object_id} ({saved} syncs saved)"
 
     except StripeWebhookEvent.DoesNotExist:
         log.error(f"Event {webhook_record_id} not found")
         return f"Event {webhook_record_id} not found"
 
+    except Retry:
+        raise
+
+    except MaxRetriesExceededError:
+        # Waited longer than a claim lasts (STRIPE_EVENT_CLAIM_SECONDS)
+        log.error(f"Event {webhook_record_id} is still claimed by another worker, giving up")
+        raise
+
     except Exception as exc:
         log.error(f"Error processing event {webhook_record_id}: {str(exc)}")
 
+        # Release the claim, so the retry can process the events
+        webhook_service.release_events(events)
+
         # Retry with exponential backoff
-        raise self.retry(exc=exc, countdown=60 * (2 ** self.request.retries))
+        errors = self.request.retries - claim_waits
+        raise self.retry(exc=exc, countdown=60 * (2 ** errors), max_retries=self.max_retries + claim_waits)
+
+
+@shared_task
+def requeue_stripe_events():
+    """
+    Queue processing of events whose claim has expired (i.e. the worker processing them was lost)
+
+    Scheduled by celery beat (settings.CELERY_BEAT_SCHEDULE). Returns the number of objects queued
+    """
+    expired = timezone.now() - timedelta(seconds=env.get_setting("STRIPE_EVENT_CLAIM_SECONDS", 30 * 60))
+    events = StripeWebhookEvent.objects.filter(processed=False, claimed_by__isnull=False, claimed_at__lt=expired)
+
+    # One task per object (it claims all of the object's events)
+    latest = {}
+    for event in events.order_by("id"):
+        latest[webhook_service.coalesce_key(event)] = event
+    for event in latest.values():
+        queue_stripe_event(event)
+
+    if latest:
+        log.info(f"Re-queued {len(latest)} Stripe objects with expired event claims")
+    return len(latest)
 
 
 def handle_customer_event(event):
@@ -25,13 +25,14 @@ import re
 from datetime import datetime, timezone
 from base.models.contact.contact import Contact
 from the_hangar_hub.decorators import require_airport, require_airport_manager
-import stripe
+from base.classes.util.lazy_import import lazy_import
 from base.models.utility.error import Error
 from base_stripe.services import checkout_service
 from the_hangar_hub.models.airport_manager import AirportManager
 from base_upload.services import retrieval_service
 from base_upload.services import upload_service
 from the_hangar_hub.services.stripe import stripe_creation_svc
+stripe = lazy_import("stripe")
 log = Log()
 env = EnvHelper()
 